@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import UserProfile
+from .models import RecommendationSnapshot, UserProfile
 
 
 @admin.register(UserProfile)
@@ -8,3 +8,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'education_level', 'years_experience', 'updated_at')
     search_fields = ('user__email', 'education_level', 'current_role')
     readonly_fields = ('updated_at',)
+
+
+@admin.register(RecommendationSnapshot)
+class RecommendationSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('user', 'catalog_version', 'computed_at')
+    search_fields = ('user__email', 'catalog_version')
+    readonly_fields = ('computed_at',)
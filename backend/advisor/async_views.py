@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from typing import Dict
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+from .authentication import CachedTokenAuthentication
+from .snapshots import acurrent_snapshot, ascore, snapshot_depth
+from .views import (
+    apply_validators,
+    conditional_response,
+    entity_tag,
+    parse_page,
+    profile_changes,
+    profile_validators,
+    recommendation_validators,
+    save_profile_changes,
+    serialize_profile,
+    serialize_user,
+    session_validators,
+)
+
+
+def json_response(data: Dict[str, object], status: int = status.HTTP_200_OK) -> HttpResponse:
+    # Rendered by the configured DRF renderer, so both view flavours return identical bodies.
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+class AsyncTokenView(View):
+    """Base for async views that require a token, mirroring DRF's 401 responses.
+
+    Used instead of ``APIView`` when the app is served over ASGI with ``ADVISOR_ASYNC_VIEWS``,
+    so the request runs on the event loop. Async ORM calls still run on the request's
+    ``sync_to_async`` thread, which a request waiting on the database keeps busy.
+    """
+
+    authentication = CachedTokenAuthentication()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            authenticated = await self.authentication.aauthenticate(request)
+        except exceptions.AuthenticationFailed as exc:
+            return self.unauthorized(exc.detail)
+        if authenticated is None:
+            return self.unauthorized(exceptions.NotAuthenticated.default_detail)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def unauthorized(self, detail) -> HttpResponse:
+        response = json_response({'detail': str(detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = self.authentication.authenticate_header(None)
+        return response
+
+
+class AsyncSessionView(AsyncTokenView):
+    async def get(self, request):
+        user, profile = request.user, await request.aprofile()
+        return conditional_response(
+            request,
+            session_validators(user, profile),
+            lambda: json_response({'user': serialize_user(user), 'profile': serialize_profile(profile)}),
+        )
+
+
+class AsyncProfileView(AsyncTokenView):
+    async def get(self, request):
+        profile = await request.aprofile()
+        return conditional_response(
+            request,
+            profile_validators(profile),
+            lambda: json_response({'profile': serialize_profile(profile)}),
+        )
+
+    async def post(self, request):
+        return await self.update(request, allow_operations=False)
+
+    async def patch(self, request):
+        return await self.update(request, allow_operations=True)
+
+    async def update(self, request, allow_operations: bool):
+        if request.body and request.content_type != 'application/json':
+            return json_response(
+                {'detail': f'Unsupported media type "{request.content_type}" in request.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            return json_response({'detail': f'JSON parse error - {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(data, dict):
+            return json_response({'error': 'Expected an object.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = await request.aprofile()
+        try:
+            changes = profile_changes(profile, data, allow_operations)
+        except ValueError as exc:
+            return json_response({'errors': exc.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        await sync_to_async(save_profile_changes)(profile, changes)
+        return json_response({'profile': serialize_profile(profile), 'changed': list(changes)})
+
+
+class AsyncRecommendationsView(AsyncTokenView):
+    async def get(self, request):
+        try:
+            limit, offset = parse_page(request.GET)
+        except ValueError as exc:
+            return json_response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        depth = offset + limit
+        snapshot = profile = None
+        if depth <= snapshot_depth():
+            snapshot = await acurrent_snapshot(request.user.pk, request.aprofile)
+            updated_at = snapshot.profile_updated_at
+        else:
+            profile = await request.aprofile()
+            updated_at = profile.updated_at
+
+        etag = entity_tag(recommendation_validators(request.user.pk, updated_at, limit, offset))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if snapshot is not None:
+                recommendations = snapshot.recommendations[offset:depth]
+            else:
+                recommendations = await ascore(profile, limit=limit, offset=offset)
+            response = json_response({'recommendations': recommendations})
+        return apply_validators(response, etag)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import copy
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from .cache import LocalLRUBackend
+from .metrics import register_collector
+from .models import UserProfile
+
+
+class TokenCache:
+    """Per-process token -> (user, token) cache with a TTL and bounded LRU size.
+
+    Entries record the user's version stamp, kept in a shared Django cache and replaced
+    whenever the user or one of their tokens changes, so a logout in one worker is seen
+    by every worker on its next lookup. A per-process cache alias could not carry the
+    stamps to other workers, so it disables the cache and every lookup is a miss.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 10000, alias: str = 'advisor-shared'):
+        self.ttl = ttl
+        self.entries = LocalLRUBackend(max_entries)
+        self.stamps = caches[alias]
+        self.enabled = not isinstance(self.stamps, (LocMemCache, DummyCache))
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Tuple[object, object]]:
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        return self._validate(key, entry, self._stamp(entry[2].pk))
+
+    async def aget(self, key: str) -> Optional[Tuple[object, object]]:
+        """``get`` for async callers: the shared stamp is read without blocking the event loop."""
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        return self._validate(key, entry, await self._astamp(entry[2].pk))
+
+    def set(self, key: str, user, token) -> None:
+        if self.enabled:
+            self._store(key, user, token, self._stamp(user.pk))
+
+    async def aset(self, key: str, user, token) -> None:
+        if self.enabled:
+            self._store(key, user, token, await self._astamp(user.pk))
+
+    def _lookup(self, key: str):
+        entry = self.entries.get(key) if self.enabled else None
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        return entry
+
+    def _validate(self, key: str, entry, stamp: int) -> Optional[Tuple[object, object]]:
+        _, cached_stamp, user, token = entry
+        if cached_stamp != stamp:
+            self._drop(key)
+            return None
+        self.hits += 1
+        # Hand out copies so per-request state (cached relations) never leaks between requests.
+        return copy.copy(user), token
+
+    def _drop(self, key: str) -> None:
+        self.entries.delete(key)
+        self.invalidations += 1
+        self.misses += 1
+
+    def _store(self, key: str, user, token, stamp: int) -> None:
+        stored = copy.copy(user)
+        # Drop related objects loaded with the user (such as the profile) so they are never
+        # served from the cache; only the user row itself is cached.
+        stored._state.fields_cache = {}
+        stored_token = copy.copy(token)
+        stored_token._state.fields_cache = {}
+        self.entries.set(key, (time.monotonic() + self.ttl, stamp, stored, stored_token))
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.stamps.set(_stamp_key(user_id), _new_stamp(), None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'size': len(self.entries),
+            'hitRate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _stamp(self, user_id: int) -> int:
+        stamp_key = _stamp_key(user_id)
+        stamp = self.stamps.get(stamp_key)
+        if stamp is None:
+            # A stamp the shared cache evicted comes back as a new value rather than a
+            # default, so entries cached under the evicted one can never match again.
+            self.stamps.add(stamp_key, _new_stamp(), None)
+            stamp = self.stamps.get(stamp_key)
+        return stamp
+
+    async def _astamp(self, user_id: int) -> int:
+        stamp_key = _stamp_key(user_id)
+        stamp = await self.stamps.aget(stamp_key)
+        if stamp is None:
+            await self.stamps.aadd(stamp_key, _new_stamp(), None)
+            stamp = await self.stamps.aget(stamp_key)
+        return stamp
+
+
+def _stamp_key(user_id: int) -> str:
+    return f'advisor:auth-stamp:{user_id}'
+
+
+def _new_stamp() -> int:
+    return time.time_ns()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in TokenAuthentication that skips the Token/User lookup for recently seen keys.
+
+    Also attaches ``request.profile``. On a cache miss the profile is fetched in the same
+    query as the token and user; on a hit it is loaded lazily, on first access.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            user = result[0]
+            request.profile = SimpleLazyObject(lambda: load_profile(user))
+        return result
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user', 'user__profile').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        return _accept_token(key, token)
+
+    async def aauthenticate(self, request) -> Optional[Tuple[object, object]]:
+        """Async counterpart of ``authenticate`` for plain Django async views.
+
+        Attaches ``request.user``, ``request.auth`` and an awaitable ``request.aprofile()``
+        instead of the lazy ``request.profile``, which would query synchronously.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+        cached = await get_token_cache().aget(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user', 'user__profile').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            _check_active(token)
+            await get_token_cache().aset(key, token.user, token)
+            cached = token.user, token
+
+        user, token = cached
+        request.user, request.auth = user, token
+        request.aprofile = lambda: aload_profile(user)
+        return user, token
+
+
+def _accept_token(key: str, token) -> Tuple[object, object]:
+    _check_active(token)
+    get_token_cache().set(key, token.user, token)
+    return token.user, token
+
+
+def _check_active(token) -> None:
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+
+def load_profile(user) -> UserProfile:
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        # Accounts that predate eager profile creation.
+        return UserProfile.objects.get_or_create(user=user)[0]
+
+
+async def aload_profile(user) -> UserProfile:
+    if type(user).profile.is_cached(user):
+        try:
+            return user.profile
+        except UserProfile.DoesNotExist:
+            pass
+    return (await UserProfile.objects.aget_or_create(user=user))[0]
+
+
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    global _token_cache
+    if _token_cache is None:
+        config = getattr(settings, 'ADVISOR_TOKEN_CACHE', {})
+        _token_cache = TokenCache(
+            ttl=config.get('TTL', 60),
+            max_entries=config.get('MAX_ENTRIES', 10000),
+            alias=config.get('ALIAS', 'advisor-shared'),
+        )
+    return _token_cache
+
+
+@register_collector
+def _token_cache_metrics():
+    if _token_cache is None:
+        return {}
+    labels = (('cache', 'token'),)
+    return {
+        ('advisor_cache_hits_total', labels): [_token_cache.hits],
+        ('advisor_cache_misses_total', labels): [_token_cache.misses],
+        ('advisor_cache_invalidations_total', labels): [_token_cache.invalidations],
+        ('advisor_cache_evictions_total', labels): [_token_cache.entries.evictions],
+        ('advisor_cache_entries', labels): [len(_token_cache.entries)],
+    }
+
+
+@receiver(setting_changed)
+def _reset_token_cache(sender, setting, **kwargs):
+    global _token_cache
+    if setting in ('ADVISOR_TOKEN_CACHE', 'CACHES'):
+        _token_cache = None
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import contextlib
+import gc
+import math
+import platform
+import random
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+from django.test.utils import override_settings
+
+from . import engine, services
+from .catalog import CareerDefinition
+from .models import UserProfile
+
+CATALOG_SIZES = (53, 1000, 100000)
+SKILL_COUNTS = (0, 10, 100, 500)
+EDUCATION_LEVELS = ('associates', 'bachelors', 'masters', 'mba', 'phd', 'bootcamp', 'certifications')
+ROLES = ('', 'Data Analyst', 'Senior Software Engineer', 'Registered Nurse', 'Product Manager', 'Chef')
+
+# Scoring engines by name, as the settings that select them.
+ENGINES: Dict[str, Dict[str, object]] = {
+    'python': {'ADVISOR_SCORING_ENGINE': 'python', 'ADVISOR_RETRIEVAL_MODE': 'off'},
+    'numpy': {'ADVISOR_SCORING_ENGINE': 'numpy', 'ADVISOR_RETRIEVAL_MODE': 'off'},
+    'tfidf': {'ADVISOR_SCORING_ENGINE': 'python', 'ADVISOR_RETRIEVAL_MODE': 'tfidf', 'ADVISOR_RETRIEVAL_INDEX_DIR': ''},
+}
+
+
+def synthetic_catalog(size: int, seed: int = 0) -> List[CareerDefinition]:
+    """``size`` careers whose term frequencies are skewed like a real catalog (a few very common skills)."""
+    rng = random.Random(f'catalog-{seed}-{size}')
+    skills, topics = _vocabulary('skill', max(200, size // 20)), _vocabulary('topic', max(40, size // 200))
+    skill_weights = [1 / (rank + 1) for rank in range(len(skills))]
+    words = ('data', 'software', 'clinical', 'product', 'marketing', 'financial', 'research', 'design', 'operations')
+    kinds = ('analyst', 'engineer', 'manager', 'specialist', 'scientist', 'designer', 'nurse', 'consultant')
+    return [
+        CareerDefinition(
+            slug=f'career-{index}',
+            title=f'{rng.choice(words).title()} {rng.choice(kinds).title()}',
+            description=f'Works on {rng.choice(words)} problems with {rng.choice(words)} teams.',
+            required_skills=list(dict.fromkeys(rng.choices(skills, skill_weights, k=rng.randint(3, 8)))),
+            interests=rng.sample(topics, rng.randint(1, 4)),
+            education_levels=rng.sample(EDUCATION_LEVELS, rng.randint(0, 3)),
+            average_salary='$75,000',
+            growth_rate='5%',
+            demand_index=rng.randint(1, 5),
+            min_experience=rng.randint(0, 10),
+        )
+        for index in range(size)
+    ]
+
+
+def synthetic_profiles(count: int, skills: int, catalog_size: int, seed: int = 0) -> List[UserProfile]:
+    """``count`` unsaved profiles with ``skills`` skills each, drawn from the catalog's vocabulary."""
+    rng = random.Random(f'profiles-{seed}-{catalog_size}-{skills}')
+    skill_vocabulary = _vocabulary('skill', max(200, catalog_size // 20, skills))
+    topics = _vocabulary('topic', max(40, catalog_size // 200))
+    return [
+        UserProfile(
+            skills=rng.sample(skill_vocabulary, skills),
+            interests=rng.sample(topics, rng.randint(0, 5)),
+            education_level=rng.choice(EDUCATION_LEVELS + ('',)),
+            years_experience=rng.choice([*services.EXPERIENCE_BUCKETS, '']),
+            current_role=rng.choice(ROLES),
+        )
+        for _ in range(count)
+    ]
+
+
+@contextlib.contextmanager
+def catalog_installed(careers: Sequence[CareerDefinition]) -> Iterator[None]:
+    """Serve ``careers`` as the live catalog, restoring the configured catalog afterwards."""
+    services.CAREER_LIBRARY = careers
+    services._snapshot = None
+    services.build_indexes()
+    try:
+        yield
+    finally:
+        services.load_catalog()
+
+
+def available_engines() -> List[str]:
+    return [name for name in ENGINES if name != 'numpy' or engine.np is not None]
+
+
+def run(
+    engines: Sequence[str] = ('python',),
+    catalog_sizes: Sequence[int] = CATALOG_SIZES,
+    skill_counts: Sequence[int] = SKILL_COUNTS,
+    calls: int = 20,
+    limit: int = 10,
+    seed: int = 0,
+    progress=None,
+) -> Dict[str, object]:
+    """Time ``generate_recommendations`` for every engine x catalog size x profile skill count.
+
+    Each case scores ``calls`` distinct profiles after one warm-up call, then scores one more
+    under tracemalloc for its peak allocation, so tracing never skews the latencies.
+    """
+    cases: Dict[str, Dict[str, float]] = {}
+    for size in catalog_sizes:
+        with catalog_installed(synthetic_catalog(size, seed)):
+            for name in engines:
+                with override_settings(**ENGINES[name]):
+                    for skills in skill_counts:
+                        key = case_key(name, size, skills)
+                        cases[key] = measure(synthetic_profiles(calls + 2, skills, size, seed), limit)
+                        if progress is not None:
+                            progress(key, cases[key])
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'numpy': getattr(engine.np, '__version__', None),
+            'calls': calls,
+            'limit': limit,
+            'seed': seed,
+        },
+        'cases': cases,
+    }
+
+
+def measure(profiles: Sequence[UserProfile], limit: int) -> Dict[str, float]:
+    warmup, traced, timed = profiles[0], profiles[1], profiles[2:]
+    services.generate_recommendations(warmup, limit=limit)
+
+    latencies = []
+    gc.collect()
+    started = time.perf_counter()
+    for profile in timed:
+        call_started = time.perf_counter()
+        services.generate_recommendations(profile, limit=limit)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        services.generate_recommendations(traced, limit=limit)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'calls_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'peak_kib': peak / 1024,
+    }
+
+
+def percentile(ordered: Sequence[float], rank: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(len(ordered) * rank / 100) - 1)]
+
+
+def compare(results: Mapping[str, object], baseline: Mapping[str, object], margin: float) -> List[str]:
+    """Cases whose median latency is more than ``margin`` (a fraction) slower than the baseline."""
+    regressions = []
+    for key, case in results['cases'].items():
+        reference: Optional[Mapping[str, float]] = baseline['cases'].get(key)
+        if reference is None or not reference['p50_ms']:
+            continue
+        ratio = case['p50_ms'] / reference['p50_ms']
+        if ratio > 1 + margin:
+            regressions.append(f'{key}: p50 {case["p50_ms"]:.3f}ms vs baseline {reference["p50_ms"]:.3f}ms ({ratio - 1:+.0%})')
+    return regressions
+
+
+def case_key(engine_name: str, catalog_size: int, skills: int) -> str:
+    return f'{engine_name}/careers={catalog_size}/skills={skills}'
+
+
+def _vocabulary(prefix: str, size: int) -> List[str]:
+    return [f'{prefix} {index}' for index in range(size)]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import services
+from .metrics import register_collector
+from .models import UserProfile
+
+CacheEntry = Tuple[int, List[Dict[str, object]]]
+
+
+class LocalLRUBackend:
+    """Bounded in-process store that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DjangoCacheBackend:
+    """Shares entries across workers through a configured Django cache alias.
+
+    Eviction and size limits are those of the underlying cache (``MAX_ENTRIES`` /
+    ``maxmemory``), so point ``ALIAS`` at a cache dedicated to recommendations. Keys carry
+    a generation stamp stored in the same cache; ``clear`` replaces the stamp, which
+    orphans only this backend's entries (the cache evicts them in time) instead of
+    flushing everything else stored under the alias.
+    """
+
+    def __init__(self, alias: str = 'default', timeout: Optional[int] = None, key_prefix: str = 'advisor:recs:'):
+        self.cache = caches[alias]
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self.generation_key = key_prefix + 'generation'
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self.cache.get(self._key(key))
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.cache.set(self._key(key), entry, self.timeout)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(self._key(key))
+
+    def clear(self) -> None:
+        self.cache.set(self.generation_key, time.time_ns(), None)
+
+    def _key(self, key: str) -> str:
+        # An evicted generation is replaced by a new one, never by an earlier value.
+        generation = self.cache.get_or_set(self.generation_key, time.time_ns, None)
+        return f'{self.key_prefix}{generation}:{key}'
+
+
+class RecommendationCache:
+    """Content-addressed cache of ranked recommendations.
+
+    Entries are keyed by the normalized scoring inputs of a profile plus the catalog
+    version, so users with identical profiles share one entry. Each entry keeps the
+    ranking up to the deepest page requested so far.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get_recommendations(self, profile: UserProfile, limit: int = 3, offset: int = 0) -> List[Dict[str, object]]:
+        key = profile_cache_key(profile)
+        depth = offset + limit
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] >= depth:
+            self.hits += 1
+            return entry[1][offset:depth]
+
+        self.misses += 1
+        recommendations = services.generate_recommendations(profile, limit=depth)
+        self.backend.set(key, (depth, recommendations))
+        return recommendations[offset:]
+
+    def invalidate(self, profile: UserProfile) -> None:
+        self.backend.delete(profile_cache_key(profile))
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {'hits': self.hits, 'misses': self.misses}
+        if isinstance(self.backend, LocalLRUBackend):
+            stats.update({'size': len(self.backend), 'evictions': self.backend.evictions})
+        return stats
+
+
+def profile_cache_key(profile: UserProfile) -> str:
+    payload = json.dumps(
+        [
+            services.catalog_version(),
+            sorted({skill.lower() for skill in profile.skills}),
+            sorted({interest.lower() for interest in profile.interests}),
+            profile.education_level,
+            profile.years_experience,
+            (profile.current_role or '').lower(),
+        ]
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_recommendation_cache: Optional[RecommendationCache] = None
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    global _recommendation_cache
+    if _recommendation_cache is None:
+        config = getattr(settings, 'ADVISOR_RECOMMENDATION_CACHE', {})
+        if config.get('BACKEND', 'local') == 'django':
+            backend = DjangoCacheBackend(config.get('ALIAS', 'default'), config.get('TIMEOUT'))
+        else:
+            backend = LocalLRUBackend(config.get('MAX_ENTRIES', 2048))
+        _recommendation_cache = RecommendationCache(backend)
+    return _recommendation_cache
+
+
+@register_collector
+def _recommendation_cache_metrics():
+    if _recommendation_cache is None:
+        return {}
+    labels = (('cache', 'recommendations'),)
+    stats = _recommendation_cache.stats()
+    values = {
+        ('advisor_cache_hits_total', labels): [stats['hits']],
+        ('advisor_cache_misses_total', labels): [stats['misses']],
+    }
+    if 'size' in stats:
+        values[('advisor_cache_evictions_total', labels)] = [stats['evictions']]
+        values[('advisor_cache_entries', labels)] = [stats['size']]
+    return values
+
+
+@receiver(setting_changed)
+def _reset_recommendation_cache(sender, setting, **kwargs):
+    global _recommendation_cache
+    if setting in ('ADVISOR_RECOMMENDATION_CACHE', 'ADVISOR_SCORING_ENGINE'):
+        _recommendation_cache = None
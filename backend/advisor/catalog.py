@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import mmap
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SNAPSHOT_MAGIC = b'ADVCAT01'
+LIST_FIELDS = ('required_skills', 'interests', 'education_levels')
+INT_FIELDS = ('demand_index', 'min_experience')
+
+
+@dataclass(frozen=True)
+class CareerDefinition:
+    slug: str
+    title: str
+    description: str
+    required_skills: Sequence[str]
+    interests: Sequence[str]
+    education_levels: Sequence[str]
+    average_salary: str
+    growth_rate: str
+    demand_index: int  # 1 (stable) - 5 (hot demand)
+    min_experience: int  # in years
+
+
+@dataclass
+class Postings:
+    """Careers x vocabulary incidence matrix in CSC form: ``indices[indptr[t]:indptr[t + 1]]``
+    are the careers containing term ``t`` and ``data`` holds the match multiplicity."""
+
+    vocabulary: List[str]
+    indptr: Sequence[int]
+    indices: Sequence[int]
+    data: Sequence[int]
+
+
+@dataclass
+class CatalogColumns:
+    """Column-oriented view of a catalog, shared by the snapshot format and the vector engine."""
+
+    size: int
+    skills: Postings
+    interests: Postings
+    education: Postings
+    title_keywords: Postings
+    skill_totals: Sequence[int]
+    interest_totals: Sequence[int]
+    education_open: Sequence[int]
+    min_experience: Sequence[int]
+    demand_index: Sequence[int]
+
+
+def catalog_hash(careers: Iterable[CareerDefinition]) -> str:
+    return _records_hash(_encode_career(career) for career in careers)
+
+
+def title_keywords(title: str) -> Tuple[str, ...]:
+    lowered = title.lower()
+    return (lowered, *lowered.split())
+
+
+def load_source(path: Path) -> List[CareerDefinition]:
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with path.open(newline='', encoding='utf-8') as handle:
+            rows = [_parse_csv_row(row) for row in csv.DictReader(handle)]
+    else:
+        with path.open(encoding='utf-8') as handle:
+            rows = json.load(handle)
+    return [_career_from_dict(row) for row in rows]
+
+
+def build_columns(careers: Sequence[CareerDefinition]) -> CatalogColumns:
+    return CatalogColumns(
+        size=len(careers),
+        skills=build_postings((career.required_skills for career in careers), str.lower),
+        interests=build_postings((career.interests for career in careers), str.lower),
+        education=build_postings(career.education_levels for career in careers),
+        title_keywords=build_postings(title_keywords(career.title) for career in careers),
+        skill_totals=[len(career.required_skills) for career in careers],
+        interest_totals=[len(career.interests) for career in careers],
+        education_open=[int(not career.education_levels) for career in careers],
+        min_experience=[career.min_experience for career in careers],
+        demand_index=[career.demand_index for career in careers],
+    )
+
+
+def build_postings(rows: Iterable[Iterable[str]], normalize: Optional[Callable[[str], str]] = None) -> Postings:
+    columns: Dict[str, Dict[int, int]] = {}
+    for position, values in enumerate(rows):
+        # Distinct raw values that normalize to the same term each count as a match,
+        # mirroring the matched sets built by the Python scorer.
+        for value in set(values):
+            term = normalize(value) if normalize else value
+            column = columns.setdefault(term, {})
+            column[position] = column.get(position, 0) + 1
+
+    indptr = [0]
+    indices: List[int] = []
+    data: List[int] = []
+    for column in columns.values():
+        indices.extend(column.keys())
+        data.extend(column.values())
+        indptr.append(len(indices))
+    return Postings(list(columns), indptr, indices, data)
+
+
+def write_snapshot(careers: Sequence[CareerDefinition], path: Path) -> str:
+    """Write a memory-mappable snapshot of ``careers`` and return its catalog version.
+
+    Layout: magic, a little header (JSON) with section offsets, then 8-byte aligned
+    sections holding int64 arrays, JSON vocabularies and the per-career metadata records.
+    """
+    columns = build_columns(careers)
+    records = [_encode_career(career) for career in careers]
+    record_offsets = [0]
+    for record in records:
+        record_offsets.append(record_offsets[-1] + len(record))
+
+    sections: Dict[str, Tuple[str, bytes]] = {}
+    for name in ('skills', 'interests', 'education', 'title_keywords'):
+        postings: Postings = getattr(columns, name)
+        sections[f'{name}.vocabulary'] = ('json', json.dumps(postings.vocabulary).encode('utf-8'))
+        for part in ('indptr', 'indices', 'data'):
+            sections[f'{name}.{part}'] = ('q', array('q', getattr(postings, part)).tobytes())
+    for name in ('skill_totals', 'interest_totals', 'education_open', 'min_experience', 'demand_index'):
+        sections[name] = ('q', array('q', getattr(columns, name)).tobytes())
+    sections['record_offsets'] = ('q', array('q', record_offsets).tobytes())
+    sections['records'] = ('bytes', b''.join(records))
+
+    version = _records_hash(records)
+    layout: Dict[str, List[object]] = {}
+    offset = 0
+    for name, (kind, payload) in sections.items():
+        layout[name] = [offset, len(payload), kind]
+        offset += _aligned(len(payload))
+    header = json.dumps(
+        {'version': version, 'size': len(careers), 'byteorder': sys.byteorder, 'sections': layout}
+    ).encode('utf-8')
+    body_start = _aligned(len(SNAPSHOT_MAGIC) + 8 + len(header))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    with temporary.open('wb') as handle:
+        handle.write(SNAPSHOT_MAGIC)
+        handle.write(body_start.to_bytes(4, 'little'))
+        handle.write(len(header).to_bytes(4, 'little'))
+        handle.write(header)
+        handle.write(b'\0' * (body_start - handle.tell()))
+        for _, payload in sections.values():
+            handle.write(payload)
+            handle.write(b'\0' * (_aligned(len(payload)) - len(payload)))
+    # Replace atomically so running workers keep their mapping of the previous file.
+    temporary.replace(path)
+    return version
+
+
+class CatalogSnapshot:
+    """Read-only view over a snapshot file written by ``write_snapshot``.
+
+    Opening maps the file and parses only the header; arrays are exposed as zero-copy
+    memoryviews and career records are decoded on access, so every worker shares the
+    same pages through the OS page cache.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open('rb') as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError(f'{self.path} is not a career catalog snapshot.')
+        body_start = int.from_bytes(buffer[8:12], 'little')
+        header_length = int.from_bytes(buffer[12:16], 'little')
+        header = json.loads(bytes(buffer[16:16 + header_length]))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f'{self.path} was written on a {header["byteorder"]}-endian machine.')
+
+        self.version: str = header['version']
+        self.size: int = header['size']
+        self._buffer = buffer
+        self._body_start = body_start
+        self._sections: Dict[str, List[object]] = header['sections']
+        self.careers = SnapshotCareers(self)
+
+    def section(self, name: str):
+        offset, length, kind = self._sections[name]
+        start = self._body_start + offset
+        view = self._buffer[start:start + length]
+        if kind == 'q':
+            return view.cast('q')
+        if kind == 'json':
+            return json.loads(bytes(view))
+        return view
+
+    def columns(self) -> CatalogColumns:
+        def postings(name: str) -> Postings:
+            return Postings(
+                self.section(f'{name}.vocabulary'),
+                self.section(f'{name}.indptr'),
+                self.section(f'{name}.indices'),
+                self.section(f'{name}.data'),
+            )
+
+        return CatalogColumns(
+            size=self.size,
+            skills=postings('skills'),
+            interests=postings('interests'),
+            education=postings('education'),
+            title_keywords=postings('title_keywords'),
+            skill_totals=self.section('skill_totals'),
+            interest_totals=self.section('interest_totals'),
+            education_open=self.section('education_open'),
+            min_experience=self.section('min_experience'),
+            demand_index=self.section('demand_index'),
+        )
+
+
+class SnapshotCareers(Sequence):
+    """Lazily decoded CareerDefinition sequence backed by a snapshot's record section."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._offsets = snapshot.section('record_offsets')
+        self._records = snapshot.section('records')
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('career index out of range')
+        record = bytes(self._records[self._offsets[index]:self._offsets[index + 1]])
+        return _career_from_dict(json.loads(record))
+
+    def __iter__(self) -> Iterator[CareerDefinition]:
+        for position in range(len(self)):
+            yield self[position]
+
+
+def _encode_career(career: CareerDefinition) -> bytes:
+    values = {field: getattr(career, field) for field in CareerDefinition.__dataclass_fields__}
+    for field in LIST_FIELDS:
+        values[field] = list(values[field])
+    return json.dumps(values, sort_keys=True).encode('utf-8')
+
+
+def _records_hash(records: Iterable[bytes]) -> str:
+    digest = hashlib.sha256()
+    for record in records:
+        digest.update(record)
+        digest.update(b'\n')
+    return digest.hexdigest()[:16]
+
+
+def _career_from_dict(row: Dict[str, object]) -> CareerDefinition:
+    values = {field: row[field] for field in CareerDefinition.__dataclass_fields__}
+    for field in LIST_FIELDS:
+        values[field] = list(values[field])
+    for field in INT_FIELDS:
+        values[field] = int(values[field])
+    return CareerDefinition(**values)
+
+
+def _parse_csv_row(row: Dict[str, str]) -> Dict[str, object]:
+    parsed: Dict[str, object] = dict(row)
+    for field in LIST_FIELDS:
+        parsed[field] = [value.strip() for value in row[field].split(';') if value.strip()]
+    return parsed
+
+
+def _aligned(length: int) -> int:
+    return (length + 7) // 8 * 8
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; services falls back to the pure Python scorer
+    np = None
+
+from .catalog import CareerDefinition, CatalogColumns, Postings, build_columns
+
+# Upper bound on profiles x careers cells materialized at once by rank_many.
+MAX_BATCH_CELLS = 1 << 20
+
+
+class VectorEngine:
+    """Scores one profile against the whole catalog with column-wise array operations.
+
+    Skills, interests, education levels and title keywords are stored as sparse
+    incidence matrices in CSC form (one postings slice of career ids per term), so
+    matching a profile costs a ``bincount`` over the postings of its own terms.
+    """
+
+    def __init__(self, columns: CatalogColumns, experience_buckets: Mapping[str, int]):
+        if np is None:
+            raise RuntimeError('The vector scoring engine requires numpy.')
+        self.size = columns.size
+        self.experience_buckets = dict(experience_buckets)
+
+        self.skills = _Incidence(self.size, columns.skills)
+        self.interests = _Incidence(self.size, columns.interests)
+        self.education = _Incidence(self.size, columns.education)
+        self.title_keywords = _Incidence(self.size, columns.title_keywords)
+        self.title_keyword_length = max(map(len, self.title_keywords.vocabulary), default=0)
+
+        self.skill_totals = np.asarray(columns.skill_totals, dtype=np.int64).astype(np.float64)
+        self.interest_totals = np.asarray(columns.interest_totals, dtype=np.int64).astype(np.float64)
+        self.education_open = np.asarray(columns.education_open, dtype=np.int64).astype(bool)
+        self.min_experience = np.asarray(columns.min_experience, dtype=np.int64)
+        self.demand = np.asarray(columns.demand_index, dtype=np.int64) / 5
+
+    @classmethod
+    def from_careers(cls, careers: Sequence[CareerDefinition], experience_buckets: Mapping[str, int]) -> VectorEngine:
+        return cls(build_columns(careers), experience_buckets)
+
+    def score(
+        self,
+        skills: Iterable[str],
+        interests: Iterable[str],
+        education_level: str,
+        years_experience: str,
+        current_role: str | None,
+    ) -> 'np.ndarray':
+        return self.score_many([(skills, interests, education_level, years_experience, current_role)])[0]
+
+    def score_many(self, queries: Sequence[Tuple]) -> 'np.ndarray':
+        """Profiles x careers score matrix for ``(skills, interests, education_level,
+        years_experience, current_role)`` queries; term matching is one sparse product per field."""
+        skill_matches = self.skills.counts_many([query[0] for query in queries])
+        interest_matches = self.interests.counts_many([query[1] for query in queries])
+
+        skill_score = _ratio(skill_matches, self.skill_totals)
+        interest_score = _ratio(interest_matches, self.interest_totals)
+        education_score = self._education_alignment([query[2] for query in queries])
+        experience_score = self._experience_alignment([query[3] for query in queries])
+        role_bonus = self._role_alignment([query[4] for query in queries])
+
+        weighted_score = (
+            (skill_score * 0.5)
+            + (interest_score * 0.2)
+            + (education_score * 0.1)
+            + (experience_score * 0.1)
+            + (self.demand * 0.1)
+            + role_bonus
+        )
+        variance = (skill_matches * 1.7) + (interest_matches * 1.1)
+        return np.clip(np.trunc((weighted_score * 100) + variance), 28, 98).astype(np.int64)
+
+    def rank_many(self, queries: Sequence[Tuple], limit: int) -> List[List[int]]:
+        rows_per_chunk = max(1, MAX_BATCH_CELLS // max(self.size, 1))
+        ranked: List[List[int]] = []
+        for start in range(0, len(queries), rows_per_chunk):
+            for scores in self.score_many(queries[start:start + rows_per_chunk]):
+                ranked.append(self.top(scores, limit))
+        return ranked
+
+    def top(self, scores: 'np.ndarray', limit: int) -> List[int]:
+        """Positions of the best ``limit`` scores, ties broken by catalog order."""
+        if limit <= 0 or not self.size:
+            return []
+        keys = (98 - scores) * self.size + np.arange(self.size, dtype=np.int64)
+        if limit < self.size:
+            keys = keys[np.argpartition(keys, limit - 1)[:limit]]
+        return [int(key % self.size) for key in np.sort(keys)]
+
+    def ranking(self, scores: 'np.ndarray') -> List[int]:
+        """All positions ordered by score, ties broken by catalog order."""
+        keys = (98 - scores) * self.size + np.arange(self.size, dtype=np.int64)
+        return np.argsort(keys).tolist()
+
+    def _education_alignment(self, user_levels: Sequence[str]) -> 'np.ndarray':
+        accepted = self.education.counts_many([[level] if level else [] for level in user_levels]) > 0
+        has_level = np.array([bool(level) for level in user_levels])[:, None]
+        return np.where(self.education_open | accepted, 1.0, np.where(has_level, 0.6, 0.4))
+
+    def _experience_alignment(self, user_years: Sequence[str]) -> 'np.ndarray':
+        user_values = np.array([self.experience_buckets.get(years, 2) for years in user_years], dtype=np.int64)
+        gap = self.min_experience - user_values[:, None]
+        partial = np.maximum(0.3, 1 - (gap / 10))
+        return np.where((self.min_experience <= 0) | (gap <= 0), 1.0, partial)
+
+    def _role_alignment(self, current_roles: Sequence[str | None]) -> 'np.ndarray':
+        hits = self.title_keywords.counts_many([self._role_substrings(role) for role in current_roles])
+        return np.where(hits > 0, 0.05, 0.0)
+
+    def _role_substrings(self, current_role: str | None) -> Set[str]:
+        if not current_role:
+            return set()
+        current = current_role.lower()
+        # Every keyword contained in the role is one of its substrings, so probing those is
+        # bounded by the role length rather than the size of the keyword vocabulary.
+        longest = self.title_keyword_length
+        return {''} | {
+            current[start:end]
+            for start in range(len(current))
+            for end in range(start + 1, min(len(current), start + longest) + 1)
+        }
+
+
+class _Incidence:
+    """Careers x vocabulary incidence matrix stored column-wise (CSC)."""
+
+    def __init__(self, size: int, postings: Postings):
+        self.size = size
+        self.vocabulary: Dict[str, int] = {term: column for column, term in enumerate(postings.vocabulary)}
+        # Snapshot-backed postings are int64 memoryviews, which numpy wraps without copying.
+        self.indptr = np.asarray(postings.indptr, dtype=np.int64)
+        self.indices = np.asarray(postings.indices, dtype=np.int64)
+        self.data = np.asarray(postings.data, dtype=np.int64).astype(np.float64)
+
+    def counts(self, terms: Iterable[str]) -> 'np.ndarray':
+        return self.counts_many([terms])[0]
+
+    def counts_many(self, term_lists: Sequence[Iterable[str]]) -> 'np.ndarray':
+        """Sparse (queries x vocabulary) @ (vocabulary x careers) product as a dense matrix."""
+        rows: List[int] = []
+        columns: List[int] = []
+        for row, terms in enumerate(term_lists):
+            term_ids = sorted({self.vocabulary[term] for term in terms if term in self.vocabulary})
+            rows.extend([row] * len(term_ids))
+            columns.extend(term_ids)
+        if not columns:
+            return np.zeros((len(term_lists), self.size))
+        slices = _column_slices(self.indptr, columns)
+        lengths = self.indptr[np.asarray(columns) + 1] - self.indptr[columns]
+        cells = np.repeat(np.asarray(rows, dtype=np.int64), lengths) * self.size + self.indices[slices]
+        counts = np.bincount(cells, weights=self.data[slices], minlength=len(term_lists) * self.size)
+        return counts.reshape(len(term_lists), self.size)
+
+
+def _column_slices(indptr: 'np.ndarray', columns: Sequence[int]) -> 'np.ndarray':
+    starts = indptr[columns]
+    lengths = indptr[np.asarray(columns) + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(int(lengths.sum()), dtype=np.int64)
+
+
+def _ratio(numerator: 'np.ndarray', denominator: 'np.ndarray') -> 'np.ndarray':
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
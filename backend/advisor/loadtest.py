@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .benchmarks import percentile
+
+# Share of requests per operation; roughly what a logged-in dashboard produces.
+DEFAULT_MIX: Dict[str, int] = {
+    'recommendations': 80,
+    'session': 6,
+    'profile': 6,
+    'profile_update': 4,
+    'login': 2,
+    'signup': 2,
+}
+SKILLS = ('python', 'sql', 'communication', 'design', 'research', 'excel', 'leadership', 'javascript', 'statistics')
+INTERESTS = ('data', 'people', 'finance', 'health', 'technology', 'education', 'art')
+
+
+class HTTPConnection:
+    """Minimal HTTP/1.1 client over one keep-alive asyncio connection (reopened when the server closes it)."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: object = None,
+        token: Optional[str] = None,
+        accept: str = 'application/json',
+    ) -> Tuple[int, bytes]:
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Accept: {accept}']
+        if token:
+            lines.append(f'Authorization: Token {token}')
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        lines.append(f'Content-Length: {len(payload)}')
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload
+
+        reused = self.writer is not None
+        try:
+            return await self._exchange(message, method)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; retry once on a fresh one.
+            return await self._exchange(message, method)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+    async def _exchange(self, message: bytes, method: str) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(message)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed before a response.')
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304) or method == 'HEAD':
+            body = b''
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if not size:
+                await self.reader.readline()
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+
+class VirtualUser:
+    """One simulated client: signs up once, then issues operations drawn from the mix."""
+
+    def __init__(self, url: str, run_id: str, index: int, rng: random.Random):
+        self.connection = HTTPConnection(url)
+        self.rng = rng
+        self.name = f'load-{run_id}-{index}'
+        self.email = f'{self.name}@loadtest.invalid'
+        self.password = f'load-{run_id}-password'
+        self.token: Optional[str] = None
+        self._signups = itertools.count()
+
+    async def health(self):
+        return await self.connection.request('GET', '/health/')
+
+    async def signup(self):
+        # Signups after the first register throwaway accounts, keeping this user's identity.
+        email = self.email if self.token is None else f'{self.name}-{next(self._signups)}@loadtest.invalid'
+        status, body = await self.connection.request(
+            'POST', '/auth/signup/', {'name': 'Load Test', 'email': email, 'password': self.password}
+        )
+        if status == 201 and self.token is None:
+            self.token = json.loads(body)['token']
+        return status, body
+
+    async def login(self):
+        status, body = await self.connection.request('POST', '/auth/login/', {'email': self.email, 'password': self.password})
+        if status == 200:
+            self.token = json.loads(body)['token']
+        return status, body
+
+    async def session(self):
+        return await self.connection.request('GET', '/auth/session/', token=self.token)
+
+    async def profile(self):
+        return await self.connection.request('GET', '/profile/', token=self.token)
+
+    async def profile_update(self):
+        profile = {
+            'skills': self.rng.sample(SKILLS, self.rng.randint(1, 5)),
+            'interests': self.rng.sample(INTERESTS, self.rng.randint(1, 3)),
+            'educationLevel': self.rng.choice(['bachelors', 'masters', '']),
+            'yearsExperience': self.rng.choice(['0', '1', '3', '6', '11']),
+        }
+        return await self.connection.request('POST', '/profile/', profile, token=self.token)
+
+    async def recommendations(self):
+        return await self.connection.request('GET', '/recommendations/', token=self.token)
+
+    async def recommendations_page(self):
+        return await self.connection.request('GET', f'/recommendations/?k=10&offset={self.rng.choice([0, 10, 20])}', token=self.token)
+
+    async def preview(self):
+        edit = {'skills': {'add': [self.rng.choice(SKILLS)]}}
+        return await self.connection.request('POST', '/recommendations/preview/?k=10', edit, token=self.token)
+
+    async def stream(self):
+        return await self.connection.request('GET', '/recommendations/stream/?k=20', token=self.token, accept='application/x-ndjson')
+
+
+OPERATIONS = (
+    'health',
+    'signup',
+    'login',
+    'session',
+    'profile',
+    'profile_update',
+    'recommendations',
+    'recommendations_page',
+    'preview',
+    'stream',
+)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Counter = Counter()
+
+    async def call(self, name: str, operation) -> None:
+        started = time.perf_counter()
+        try:
+            status, _ = await operation()
+            failed = status >= 400
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            failed = True
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if failed:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        rows = {}
+        everything = []
+        for name, latencies in sorted(self.latencies.items()):
+            everything.extend(latencies)
+            rows[name] = _row(latencies, self.errors[name], elapsed)
+        rows['total'] = _row(everything, sum(self.errors.values()), elapsed)
+        return rows
+
+
+def _row(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'error_rate': errors / len(ordered) if ordered else 0.0,
+        'rps': len(ordered) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+    }
+
+
+async def run(
+    url: str,
+    users: int,
+    duration: float,
+    mix: Mapping[str, int] = DEFAULT_MIX,
+    think_time: float = 0.0,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Drive ``users`` concurrent clients against the API at ``url`` for ``duration`` seconds.
+
+    Every client signs up first (recorded, but outside the measured window), then loops over
+    operations picked from ``mix`` until the deadline. Returns per-operation request counts,
+    error rates, throughput and latency percentiles for the measured window.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    clients = [VirtualUser(url, run_id, index, random.Random(seed + index)) for index in range(users)]
+    setup = Recorder()
+    setup_started = time.perf_counter()
+    await asyncio.gather(*(setup.call('signup', client.signup) for client in clients))
+    setup_elapsed = time.perf_counter() - setup_started
+
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def drive(client: VirtualUser) -> None:
+        while time.perf_counter() < deadline:
+            name = client.rng.choices(names, weights)[0]
+            await recorder.call(name, getattr(client, name))
+            if think_time:
+                await asyncio.sleep(client.rng.expovariate(1 / think_time))
+
+    await asyncio.gather(*(drive(client) for client in clients if client.token is not None))
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*(client.connection.close() for client in clients))
+    return {
+        'url': url,
+        'users': users,
+        'ready_users': sum(client.token is not None for client in clients),
+        'duration_s': elapsed,
+        'setup': setup.summary(setup_elapsed)['signup'] if setup.latencies else None,
+        'endpoints': recorder.summary(elapsed),
+    }
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """``"recommendations=80,session=20"`` -> ``{'recommendations': 80, 'session': 20}``."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f'Unknown operation {name!r}; choose from {", ".join(OPERATIONS)}.')
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f'Weight for {name} must be an integer.') from None
+        if mix[name] < 0:
+            raise ValueError(f'Weight for {name} must not be negative.')
+    if not any(mix.values()):
+        raise ValueError('The mix needs at least one positive weight.')
+    return mix
+
+
+async def wait_until_ready(url: str, timeout: float) -> None:
+    connection = HTTPConnection(url)
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            status, _ = await connection.request('GET', '/health/')
+            if status == 200:
+                await connection.close()
+                return
+        except OSError:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f'{url} did not become healthy within {timeout:.0f}s.')
+        await asyncio.sleep(0.2)
+
+
+def worker_memory(master_pid: int) -> List[Dict[str, float]]:
+    """RSS, PSS and unique (USS) memory in MiB of each child of ``master_pid``, read from /proc.
+
+    PSS charges every shared page to its sharers in equal parts and USS counts only the pages
+    no other process maps, so they show what copy-on-write sharing saves where RSS cannot.
+    Empty where /proc is unavailable.
+    """
+    children = []
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # "pid (comm) state ppid ...", where comm may itself contain spaces or parentheses.
+            fields = stat.read_text().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == master_pid:
+            children.append(int(stat.parent.name))
+
+    workers = []
+    for pid in sorted(children):
+        try:
+            rollup = Path(f'/proc/{pid}/smaps_rollup').read_text()
+        except OSError:
+            continue
+        kib = {}
+        for line in rollup.splitlines()[1:]:
+            name, _, value = line.partition(':')
+            kib[name] = int(value.split()[0])
+        workers.append({
+            'pid': pid,
+            'rss_mib': kib['Rss'] / 1024,
+            'pss_mib': kib['Pss'] / 1024,
+            'uss_mib': (kib['Private_Clean'] + kib['Private_Dirty']) / 1024,
+        })
+    return workers
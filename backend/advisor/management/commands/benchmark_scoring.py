@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from advisor import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark generate_recommendations on seeded synthetic catalogs and profiles, reporting '
+        'latency percentiles, throughput and peak memory. Optionally save the results as a baseline '
+        'or fail when a case is slower than a saved baseline by more than --max-regression.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', default=['python'], help=f'Engines to run: {", ".join(benchmarks.ENGINES)}.')
+        parser.add_argument('--careers', nargs='+', type=int, default=list(benchmarks.CATALOG_SIZES), help='Catalog sizes.')
+        parser.add_argument('--skills', nargs='+', type=int, default=list(benchmarks.SKILL_COUNTS), help='Skills per profile.')
+        parser.add_argument('--calls', type=int, default=20, help='Timed calls per case.')
+        parser.add_argument('--limit', type=int, default=10, help='Recommendations requested per call.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a baseline JSON file.')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare against this baseline JSON file.')
+        parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed p50 slowdown against the baseline (0.25 = 25%%).')
+
+    def handle(self, *args, **options):
+        unknown = set(options['engines']) - set(benchmarks.available_engines())
+        if unknown:
+            raise CommandError(f'Unavailable engines: {", ".join(sorted(unknown))}.')
+        if options['calls'] < 1:
+            raise CommandError('--calls must be positive.')
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Could not read baseline {options["baseline"]}: {exc}') from exc
+
+        self.stdout.write(f'{"case":<40} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"calls/s":>9} {"peak KiB":>9}')
+        results = benchmarks.run(
+            engines=options['engines'],
+            catalog_sizes=options['careers'],
+            skill_counts=options['skills'],
+            calls=options['calls'],
+            limit=options['limit'],
+            seed=options['seed'],
+            progress=self._report,
+        )
+
+        if options['save_baseline']:
+            path = Path(options['save_baseline'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+            self.stdout.write(f'Saved baseline to {path}.')
+        if baseline is not None:
+            regressions = benchmarks.compare(results, baseline, options['max_regression'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS(f'No case is more than {options["max_regression"]:.0%} slower than the baseline.'))
+
+    def _report(self, key, case):
+        self.stdout.write(
+            f'{key:<40} {case["p50_ms"]:>9.3f} {case["p95_ms"]:>9.3f} {case["p99_ms"]:>9.3f} '
+            f'{case["calls_per_s"]:>9.0f} {case["peak_kib"]:>9.0f}'
+        )
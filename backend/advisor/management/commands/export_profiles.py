@@ -0,0 +1,64 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from advisor.views import PROFILE_FIELDS, TERM_FIELDS
+
+User = get_user_model()
+
+USER_FIELDS = ('email', 'first_name', 'last_name', 'password')
+
+
+class Command(BaseCommand):
+    help = (
+        'Write every account and its profile as JSONL, one object per line in the import_profiles '
+        'format. Users are streamed from the database in chunks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="File to write, or '-' for stdout (progress then goes to stderr).")
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per database fetch.')
+        parser.add_argument(
+            '--with-password-hashes',
+            action='store_true',
+            help='Include passwordHash so import_profiles can recreate the accounts with their passwords.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        to_stdout = options['output'] == '-'
+        log = self.stderr if to_stdout else self.stdout
+        profile_columns = [f'profile__{attribute}' for attribute in PROFILE_FIELDS.values()]
+        rows = User.objects.order_by('pk').values_list(*USER_FIELDS, *profile_columns).iterator(chunk_size=chunk_size)
+
+        started = time.perf_counter()
+        exported = 0
+        handle = self.stdout if to_stdout else open(options['output'], 'w', encoding='utf-8')
+        try:
+            for row in rows:
+                handle.write(json.dumps(export_row(row, options['with_password_hashes'])) + '\n')
+                exported += 1
+                if exported % chunk_size == 0:
+                    log.write(f'{exported} exported ({exported / (time.perf_counter() - started):.0f} rows/s)')
+        finally:
+            if not to_stdout:
+                handle.close()
+
+        elapsed = time.perf_counter() - started
+        log.write(self.style.SUCCESS(f'Exported {exported} accounts in {elapsed:.1f}s ({exported / elapsed:.0f} rows/s).'))
+
+
+def export_row(row, with_password_hash):
+    email, first_name, last_name, password, *profile = row
+    data = {'email': email, 'name': f'{first_name} {last_name}'.strip() or email.split('@')[0]}
+    if with_password_hash:
+        data['passwordHash'] = password
+    for field, value in zip(PROFILE_FIELDS, profile):
+        # Accounts without a profile row export the profile defaults.
+        data[field] = value if value is not None else ([] if field in TERM_FIELDS else '')
+    return data
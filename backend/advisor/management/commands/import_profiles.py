@@ -0,0 +1,171 @@
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from rest_framework.authtoken.models import Token
+
+from advisor.models import UserProfile
+from advisor.views import PROFILE_FIELDS, TERM_FIELDS
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Create accounts, profiles and tokens from a JSONL file with one signup per line: '
+        'name, email, password (or passwordHash from export_profiles) and optional profile fields. '
+        'Lines are read and inserted in batches, each in its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSONL file to import, or '-' for stdin.")
+        parser.add_argument('--batch-size', type=int, default=500, help='Lines per bulk insert and transaction.')
+        parser.add_argument('--hash-workers', type=int, default=0, help='Password hashing processes (0 hashes in-process).')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        hash_workers = options['hash_workers']
+        if batch_size < 1 or hash_workers < 0:
+            raise CommandError('--batch-size must be positive and --hash-workers must not be negative.')
+
+        self.started = time.perf_counter()
+        self.imported = self.skipped = 0
+        executor = None
+        if hash_workers:
+            # Forked workers must not inherit open database connections. The pool only forks on
+            # its first task, so start it now, before the first batch reopens the connection.
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=hash_workers, initializer=_init_worker)
+            executor.submit(int).result()
+        handle = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        try:
+            lines = enumerate(handle, start=1)
+            while True:
+                batch = list(islice(lines, batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, executor)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.imported} accounts and skipped {self.skipped} lines in {elapsed:.1f}s '
+                f'({self.imported / elapsed:.0f} rows/s).'
+            )
+        )
+        if self.imported:
+            self.stdout.write('Run recompute_recommendations to build their recommendation snapshots ahead of first read.')
+
+    def _import_batch(self, batch, executor):
+        rows = []
+        for number, line in batch:
+            if not line.strip():
+                continue
+            try:
+                row = parse_row(json.loads(line))
+            except ValueError as exc:
+                self._skip(number, exc)
+                continue
+            row['line'] = number
+            rows.append(row)
+
+        existing = set(User.objects.filter(username__in=[row['email'] for row in rows]).values_list('username', flat=True))
+        accepted, seen = [], set()
+        for row in rows:
+            if row['email'] in existing or row['email'] in seen:
+                self._skip(row['line'], f'an account with {row["email"]} already exists')
+                continue
+            seen.add(row['email'])
+            accepted.append(row)
+        if not accepted:
+            return
+
+        plain = [row for row in accepted if 'password' in row]
+        hashes = (executor.map if executor is not None else map)(make_password, [row.pop('password') for row in plain])
+        for row, encoded in zip(plain, hashes):
+            row['passwordHash'] = encoded
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([new_user(row) for row in accepted])
+            if any(user.pk is None for user in users):
+                # Backends that cannot return primary keys from bulk inserts.
+                ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            UserProfile.objects.bulk_create([new_profile(user, row) for user, row in zip(users, accepted)])
+            Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+
+        self.imported += len(users)
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'{self.imported} imported, {self.skipped} skipped ({self.imported / elapsed:.0f} rows/s)')
+
+    def _skip(self, number, reason):
+        self.skipped += 1
+        self.stderr.write(f'Line {number}: {reason}')
+
+
+def parse_row(data):
+    """Validate one import line the way SignupView validates a signup; raises ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError('expected an object')
+    name = str(data.get('name') or '').strip()
+    email = str(data.get('email') or '').strip().lower()
+    row = {'name': name, 'email': email}
+    if not name:
+        raise ValueError('name is required')
+    if not email:
+        raise ValueError('email is required')
+    if data.get('passwordHash'):
+        if not str(data['passwordHash']).startswith(UNUSABLE_PASSWORD_PREFIX):
+            identify_hasher(data['passwordHash'])
+        row['passwordHash'] = data['passwordHash']
+    else:
+        password = str(data.get('password') or '').strip()
+        if len(password) < 6:
+            raise ValueError('password must be at least 6 characters')
+        row['password'] = password
+
+    for field in PROFILE_FIELDS:
+        value = data.get(field)
+        if value is None:
+            continue
+        valid = (
+            isinstance(value, list) and all(isinstance(term, str) for term in value)
+            if field in TERM_FIELDS
+            else isinstance(value, str)
+        )
+        if not valid:
+            raise ValueError(f'{field} must be a {"list of strings" if field in TERM_FIELDS else "string"}')
+        row[field] = value
+    return row
+
+
+def new_user(row):
+    first_name, last_name = (row['name'].split(' ', 1) + [''])[:2]
+    return User(
+        username=row['email'],
+        email=row['email'],
+        password=row['passwordHash'],
+        first_name=first_name,
+        last_name=last_name,
+    )
+
+
+def new_profile(user, row):
+    return UserProfile(user=user, **{attribute: row[field] for field, attribute in PROFILE_FIELDS.items() if field in row})
+
+
+def _init_worker():
+    django.setup()
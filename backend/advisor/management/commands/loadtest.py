@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from advisor import loadtest
+
+SERVERS = {
+    'wsgi': ['core.wsgi:application'],
+    'asgi': ['core.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the API with concurrent async clients and report p50/p95/p99 latency, requests '
+        'per second and error rate per endpoint. Targets --url, or starts gunicorn itself with '
+        '--serve for each --workers count. The database must be migrated; test accounts are left behind.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api', help='API root of a running server.')
+        parser.add_argument('--serve', choices=sorted(SERVERS), help='Start gunicorn (sync or uvicorn workers) for each run.')
+        parser.add_argument('--workers', nargs='+', type=int, default=[2], help='Gunicorn worker counts to compare with --serve.')
+        parser.add_argument('--port', type=int, default=8765, help='Port used by --serve.')
+        parser.add_argument(
+            '--preload',
+            action='store_true',
+            help='With --serve, start gunicorn with ADVISOR_PRELOAD=True (build once in the master, then fork).',
+        )
+        parser.add_argument('--users', type=int, default=16, help='Concurrent clients.')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds per run.')
+        parser.add_argument(
+            '--mix',
+            default=','.join(f'{name}={weight}' for name, weight in loadtest.DEFAULT_MIX.items()),
+            help=f'Operation weights, from: {", ".join(loadtest.OPERATIONS)}.',
+        )
+        parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between a client\'s requests, in seconds.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', metavar='PATH', help='Also write the results to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            mix = loadtest.parse_mix(options['mix'])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive.')
+        if options['preload'] and not options['serve']:
+            raise CommandError('--preload needs --serve.')
+
+        runs = []
+        if options['serve']:
+            for workers in options['workers']:
+                url = f'http://127.0.0.1:{options["port"]}/api'
+                preload = ' with preload' if options['preload'] else ''
+                self.stdout.write(f'Starting gunicorn ({options["serve"]}, {workers} workers{preload}) on {url}.')
+                started = time.perf_counter()
+                with _server(options['serve'], workers, options['port'], options['preload']) as process:
+                    try:
+                        asyncio.run(loadtest.wait_until_ready(url, timeout=60))
+                    except TimeoutError as exc:
+                        raise CommandError(str(exc)) from exc
+                    boot = time.perf_counter() - started
+                    self.stdout.write(f'Healthy after {boot:.2f}s.')
+                    results = self._run(url, mix, options)
+                    memory = loadtest.worker_memory(process.pid)
+                    self._write_memory(memory)
+                    runs.append({
+                        'server': options['serve'],
+                        'workers': workers,
+                        'preload': options['preload'],
+                        'boot_s': boot,
+                        'worker_memory': memory,
+                        **results,
+                    })
+        else:
+            try:
+                asyncio.run(loadtest.wait_until_ready(options['url'], timeout=5))
+            except TimeoutError as exc:
+                raise CommandError(f'{exc} Start a server or pass --serve.') from exc
+            runs.append(self._run(options['url'], mix, options))
+
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(runs, indent=2) + '\n', encoding='utf-8')
+
+    def _run(self, url, mix, options):
+        results = asyncio.run(
+            loadtest.run(url, options['users'], options['duration'], mix, options['think_time'], options['seed'])
+        )
+        setup = results['setup']
+        self.stdout.write(
+            f'{results["ready_users"]}/{results["users"]} clients signed up '
+            f'(p50 {setup["p50_ms"]:.0f} ms); measured {results["duration_s"]:.1f}s:'
+        )
+        self.stdout.write(f'{"endpoint":<22} {"requests":>9} {"rps":>8} {"errors":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for name, row in results['endpoints'].items():
+            self.stdout.write(
+                f'{name:<22} {row["requests"]:>9} {row["rps"]:>8.1f} {row["error_rate"]:>7.1%} '
+                f'{row["p50_ms"]:>8.1f} {row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f}'
+            )
+        return results
+
+    def _write_memory(self, memory):
+        if not memory:
+            return
+        self.stdout.write(f'{"worker":<22} {"RSS MiB":>9} {"PSS MiB":>9} {"USS MiB":>9}')
+        for row in memory:
+            self.stdout.write(f'{row["pid"]:<22} {row["rss_mib"]:>9.1f} {row["pss_mib"]:>9.1f} {row["uss_mib"]:>9.1f}')
+        self.stdout.write(
+            f'{"total":<22} {sum(row["rss_mib"] for row in memory):>9.1f} '
+            f'{sum(row["pss_mib"] for row in memory):>9.1f} {sum(row["uss_mib"] for row in memory):>9.1f}'
+        )
+
+
+class _server:
+    """Runs gunicorn from the project directory for the duration of a ``with`` block."""
+
+    def __init__(self, mode, workers, port, preload=False):
+        self.command = [
+            sys.executable, '-m', 'gunicorn', *SERVERS[mode], '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+        ]
+        self.env = {**os.environ, 'ADVISOR_SERVER_MODE': mode, 'ADVISOR_PRELOAD': str(preload)}
+        self.metrics_dir = None
+
+    def __enter__(self):
+        if not self.env.get('ADVISOR_METRICS_DIR'):
+            # A fresh directory per run, so /api/metrics/ sums every worker of this server only.
+            self.metrics_dir = self.env['ADVISOR_METRICS_DIR'] = tempfile.mkdtemp(prefix='advisor-metrics-')
+        self.process = subprocess.Popen(
+            self.command, cwd=settings.BASE_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return self.process
+
+    def __exit__(self, *exc_info):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        if self.metrics_dir is not None:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
@@ -0,0 +1,112 @@
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from advisor import services
+from advisor.models import RecommendationSnapshot, UserProfile
+from advisor.snapshots import snapshot_depth
+
+PROFILE_FIELDS = ('user_id', 'skills', 'interests', 'education_level', 'years_experience', 'current_role', 'updated_at')
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild recommendation snapshots scored against an older catalog version. '
+        'Interrupted runs resume where they stopped, since finished users are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Scoring processes (0 scores in-process).')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Profiles per database fetch and per scoring task.')
+        parser.add_argument('--all', action='store_true', help='Also rebuild snapshots that are already current.')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        chunk_size = options['chunk_size']
+        if workers < 0 or chunk_size < 1:
+            raise CommandError('--workers must not be negative and --chunk-size must be positive.')
+
+        version = services.catalog_version()
+        depth = snapshot_depth()
+        profiles = UserProfile.objects.order_by('user_id')
+        if not options['all']:
+            profiles = profiles.exclude(
+                user__recommendation_snapshot__catalog_version=version,
+                user__recommendation_snapshot__profile_updated_at__isnull=False,
+            )
+        total = profiles.count()
+        self.stdout.write(f'Recomputing {total} snapshots against catalog {version} with {workers or "no"} worker processes.')
+        if not total:
+            return
+
+        chunks = _chunks(profiles.values_list(*PROFILE_FIELDS).iterator(chunk_size=chunk_size), chunk_size)
+        self.started = time.perf_counter()
+        self.total = total
+        self.written = 0
+        if workers == 0:
+            for rows in chunks:
+                self._write(rows, score_chunk(rows, depth), version)
+        else:
+            self._run_pool(chunks, workers, depth, version)
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(f'Recomputed {self.written} snapshots in {elapsed:.1f}s ({self.written / elapsed:.0f} profiles/s).')
+        )
+
+    def _run_pool(self, chunks, workers, depth, version):
+        # Forked workers must not inherit open database connections, so the pool is started
+        # before the profile cursor is opened.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            executor.submit(int).result()
+            pending = {}
+            for rows in chunks:
+                pending[executor.submit(score_chunk, rows, depth)] = rows
+                if len(pending) >= workers * 2:
+                    self._drain(pending, version, FIRST_COMPLETED)
+            self._drain(pending, version)
+
+    def _drain(self, pending, version, return_when=ALL_COMPLETED):
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            self._write(pending.pop(future), future.result(), version)
+
+    def _write(self, rows, rankings, version):
+        snapshots = [
+            RecommendationSnapshot(user_id=row[0], catalog_version=version, profile_updated_at=row[-1], recommendations=ranking)
+            for row, ranking in zip(rows, rankings)
+        ]
+        RecommendationSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['catalog_version', 'profile_updated_at', 'recommendations', 'computed_at'],
+        )
+        self.written += len(snapshots)
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'{self.written}/{self.total} profiles ({self.written / elapsed:.0f}/s)')
+
+
+def score_chunk(rows, depth):
+    profiles = [UserProfile(**dict(zip(PROFILE_FIELDS, row))) for row in rows]
+    return services.generate_batch_recommendations(profiles, limit=depth)
+
+
+def _init_worker():
+    django.setup()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
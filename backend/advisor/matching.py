@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+_SEPARATORS = re.compile(r'[\s_\-]+')
+# A version only counts as one after a "-"/"_" or a "v" ("Python-3.11", "python v3"), so
+# names ending in a digit ("web3", "Web 2", "es6") keep it.
+_VERSION_SUFFIX = re.compile(r'(?:\s*[_\-]\s*v?|\s+v)\d+(?:\.\d+)*$')
+MAX_MEMOIZED_TERMS = 4096
+
+
+def canonical_form(term: str, strip_version: bool = False) -> str:
+    """Lowercase and collapse separators ("Data_Analysis" -> "data analysis").
+
+    ``strip_version`` also drops a trailing version ("Python-3.11" -> "python"); it is meant for
+    profile input only, since catalog terms and synonyms are spelled deliberately.
+    """
+    lowered = term.lower().strip()
+    if strip_version:
+        lowered = _VERSION_SUFFIX.sub('', lowered) or lowered
+    return _SEPARATORS.sub(' ', lowered).strip()
+
+
+def trigrams(term: str) -> frozenset:
+    padded = f'  {term} '
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+def load_synonyms(path: Path) -> Dict[str, List[str]]:
+    with Path(path).open(encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+class TermResolver:
+    """Maps free-form profile terms onto a catalog vocabulary.
+
+    Lookup order: exact lowercase term, canonical form, synonym dictionary, the same again
+    without a version suffix, then (when a threshold is set) the closest vocabulary term by
+    trigram Dice similarity. Fuzzy candidates come from a
+    trigram postings index, so only terms sharing a trigram with the query are scored.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Mapping[str, int],
+        synonyms: Optional[Mapping[str, List[str]]] = None,
+        fuzzy_threshold: Optional[float] = None,
+    ):
+        self.vocabulary = dict(vocabulary)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.aliases: Dict[str, int] = {}
+        for term, term_id in vocabulary.items():
+            self.aliases.setdefault(canonical_form(term), term_id)
+        for canonical, aliases in (synonyms or {}).items():
+            term_id = self.vocabulary.get(canonical.lower())
+            if term_id is None:
+                continue
+            for alias in aliases:
+                self.aliases.setdefault(canonical_form(alias), term_id)
+
+        self._trigram_sizes: Dict[int, int] = {}
+        self._trigram_postings: Dict[str, List[int]] = {}
+        if fuzzy_threshold is not None:
+            for term, term_id in vocabulary.items():
+                grams = trigrams(canonical_form(term))
+                self._trigram_sizes[term_id] = len(grams)
+                for gram in grams:
+                    self._trigram_postings.setdefault(gram, []).append(term_id)
+        self._memo: Dict[str, Optional[int]] = {}
+
+    def resolve(self, term: str) -> Optional[int]:
+        lowered = term.lower()
+        if lowered in self.vocabulary:
+            return self.vocabulary[lowered]
+        if lowered in self._memo:
+            return self._memo[lowered]
+
+        canonical = canonical_form(lowered)
+        term_id = self.aliases.get(canonical)
+        if term_id is None:
+            unversioned = canonical_form(lowered, strip_version=True)
+            if unversioned != canonical:
+                term_id = self.vocabulary.get(unversioned, self.aliases.get(unversioned))
+                canonical = unversioned
+        if term_id is None and self.fuzzy_threshold is not None:
+            term_id = self._closest(canonical)
+
+        if len(self._memo) >= MAX_MEMOIZED_TERMS:
+            self._memo.clear()
+        self._memo[lowered] = term_id
+        return term_id
+
+    def _closest(self, canonical: str) -> Optional[int]:
+        grams = trigrams(canonical)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._trigram_postings.get(gram, ()))
+
+        best_id, best_score = None, 0.0
+        for term_id, overlap in shared.items():
+            score = 2 * overlap / (len(grams) + self._trigram_sizes[term_id])
+            if score > best_score or (score == best_score and term_id < best_id):
+                best_id, best_score = term_id, score
+        return best_id if best_score >= self.fuzzy_threshold else None
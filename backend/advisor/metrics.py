@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# name -> (type, help, histogram buckets)
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    'advisor_http_request_duration_seconds': ('histogram', 'Request latency by view, method and status.', LATENCY_BUCKETS),
+    'advisor_http_response_size_bytes': ('histogram', 'Response body size by view (streaming responses excluded).', SIZE_BUCKETS),
+    'advisor_db_queries_per_request': ('histogram', 'Database queries issued per request, by view.', QUERY_BUCKETS),
+    'advisor_db_query_seconds_total': ('counter', 'Time spent executing database queries, by view.', ()),
+    'advisor_scoring_seconds_total': ('counter', 'Time spent in generate_recommendations, by view.', ()),
+    'advisor_scoring_duration_seconds': ('histogram', 'Latency of single generate_recommendations calls.', LATENCY_BUCKETS),
+    'advisor_cache_hits_total': ('counter', 'Lookups answered by an in-process cache, by cache.', ()),
+    'advisor_cache_misses_total': ('counter', 'Lookups an in-process cache could not answer, by cache.', ()),
+    'advisor_cache_invalidations_total': ('counter', 'Entries dropped because their user changed, by cache.', ()),
+    'advisor_cache_evictions_total': ('counter', 'Entries evicted to stay within the size limit, by cache.', ()),
+    'advisor_cache_entries': ('gauge', 'Entries currently held by an in-process cache, by cache.', ()),
+}
+
+# Any other method is labelled "other", so clients cannot create series at will.
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+# Callables reporting values kept outside the registry (cache statistics), read whenever the
+# registry's values are, so they are published and summed across workers like the rest.
+_collectors: List[Callable[[], Dict[Key, List[float]]]] = []
+
+
+def register_collector(collector: Callable[[], Dict[Key, List[float]]]) -> Callable[[], Dict[Key, List[float]]]:
+    _collectors.append(collector)
+    return collector
+
+
+class RequestStats:
+    """Per-request accumulators, reached from DB wrappers and the scorer through a context variable."""
+
+    __slots__ = ('queries', 'query_seconds', 'scoring_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.scoring_seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar('advisor_request_stats', default=None)
+
+
+class Registry:
+    """Process-wide metric values, kept in one shard per thread.
+
+    A thread only ever writes its own shard, so recording takes no lock; a lock is taken
+    when a thread first registers its shard. Reads merge every shard. With a metrics
+    directory configured, each worker also publishes its merged values there at most every
+    FLUSH_INTERVAL seconds, and rendering sums the files of every worker (the gunicorn
+    master folds the files of exited workers into one, see ``retire_worker``).
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._reset()
+        # A forked worker starts from zero instead of re-counting its parent's values.
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._shards: List[Dict[Key, List[float]]] = []
+        self._next_flush = 0.0
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        shard = self._shard()
+        buckets = METRICS[name][2]
+        values = shard.get((name, labels))
+        if values is None:
+            # One slot per bucket, then +Inf, sum and count.
+            values = shard[(name, labels)] = [0.0] * (len(buckets) + 3)
+        values[bisect_left(buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def inc(self, name: str, labels: Labels, amount: float = 1.0) -> None:
+        shard = self._shard()
+        values = shard.get((name, labels))
+        if values is None:
+            values = shard[(name, labels)] = [0.0]
+        values[0] += amount
+
+    def values(self) -> Dict[Key, List[float]]:
+        merged: Dict[Key, List[float]] = {}
+        for shard in list(self._shards):
+            # dict.copy() is atomic, so a shard growing on another thread is never iterated.
+            for key, values in shard.copy().items():
+                _add(merged, key, values)
+        for collector in _collectors:
+            for key, values in collector().items():
+                _add(merged, key, values)
+        return merged
+
+    def collect(self) -> Dict[Key, List[float]]:
+        """Values of this process merged with those published by the other workers."""
+        merged = self.values()
+        if self.directory is not None and self.directory.is_dir():
+            for path in self.directory.glob('metrics-*.json'):
+                if path.name == f'metrics-{self._pid}.json':
+                    continue
+                # A file being replaced reads as empty; its values show up on the next scrape.
+                for key, values in _read(path).items():
+                    _add(merged, key, values)
+        return merged
+
+    def maybe_flush(self) -> None:
+        if self.directory is not None and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.directory is None:
+            return
+        self._next_flush = time.monotonic() + self.flush_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write(self.directory / f'metrics-{self._pid}.json', self.values())
+
+    def _shard(self) -> Dict[Key, List[float]]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+
+def retire_worker(directory: str, pid: int) -> None:
+    """Fold the values an exited worker published into ``metrics-exited.json``.
+
+    Called from the gunicorn master's ``child_exit`` hook, so the counts of a dead worker
+    stay in the totals, and a new worker that reuses its pid starts from an empty file
+    instead of overwriting them. Gauges describe the dead worker only and are dropped.
+    """
+    path = Path(directory) / f'metrics-{pid}.json'
+    if not path.exists():
+        return
+    archive = path.with_name('metrics-exited.json')
+    merged = _read(archive)
+    for key, values in _read(path).items():
+        if METRICS.get(key[0], ('counter',))[0] != 'gauge':
+            _add(merged, key, values)
+    _write(archive, merged)
+    path.unlink(missing_ok=True)
+
+
+def _read(path: Path) -> Dict[Key, List[float]]:
+    try:
+        entries = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return {(name, tuple(map(tuple, labels))): values for name, labels, values in entries}
+
+
+def _write(path: Path, values: Dict[Key, List[float]]) -> None:
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_text(json.dumps([[name, labels, data] for (name, labels), data in values.items()]))
+    temporary.replace(path)
+
+
+def _add(merged: Dict[Key, List[float]], key: Key, values: List[float]) -> None:
+    current = merged.get(key)
+    if current is None:
+        merged[key] = list(values)
+    else:
+        for index, value in enumerate(values):
+            current[index] += value
+
+
+def render(values: Dict[Key, List[float]]) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = sorted((labels, data) for (metric, labels), data in values.items() if metric == name)
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, data in series:
+            if kind in ('counter', 'gauge'):
+                lines.append(f'{name}{_labels(labels)} {_number(data[0])}')
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*buckets, '+Inf'), data):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {_number(cumulative)}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(data[-2])}')
+            lines.append(f'{name}_count{_labels(labels)} {_number(data[-1])}')
+    return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value) -> str:
+    if isinstance(value, str):
+        return value
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsMiddleware:
+    """Records latency, response size, database and scoring time for every request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, started = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record_request(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats, started = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        record_request(request, response, stats, time.perf_counter() - started)
+        return response
+
+
+def record_request(request, response, stats: RequestStats, elapsed: float) -> None:
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name if match else None) or 'unresolved'
+    method = request.method if request.method in HTTP_METHODS else 'other'
+    registry = get_registry()
+    registry.observe(
+        'advisor_http_request_duration_seconds',
+        (('view', view), ('method', method), ('status', str(response.status_code))),
+        elapsed,
+    )
+    if not response.streaming:
+        registry.observe('advisor_http_response_size_bytes', (('view', view),), len(response.content))
+    registry.observe('advisor_db_queries_per_request', (('view', view),), stats.queries)
+    if stats.query_seconds:
+        registry.inc('advisor_db_query_seconds_total', (('view', view),), stats.query_seconds)
+    if stats.scoring_seconds:
+        registry.inc('advisor_scoring_seconds_total', (('view', view),), stats.scoring_seconds)
+    registry.maybe_flush()
+
+
+def timed_scoring(function: Callable) -> Callable:
+    """Record each call of a scoring function in the scoring histogram and the current request."""
+    labels = (('function', function.__name__),)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            get_registry().observe('advisor_scoring_duration_seconds', labels, elapsed)
+            stats = _current.get()
+            if stats is not None:
+                stats.scoring_seconds += elapsed
+
+    return wrapper
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+_registry: Optional[Registry] = None
+
+
+def get_registry() -> Registry:
+    global _registry
+    if _registry is None:
+        config = getattr(settings, 'ADVISOR_METRICS', {})
+        _registry = Registry(config.get('DIR') or None, config.get('FLUSH_INTERVAL', 1.0))
+        atexit.register(_registry.flush)
+    return _registry
+
+
+@receiver(setting_changed)
+def _reset_registry(sender, setting, **kwargs):
+    global _registry
+    if setting == 'ADVISOR_METRICS':
+        _registry = None
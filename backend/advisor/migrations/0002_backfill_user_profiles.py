@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    user_model = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    profile_model = apps.get_model('advisor', 'UserProfile')
+    missing = user_model.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+    profile_model.objects.bulk_create(
+        [profile_model(user_id=user_id) for user_id in missing.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
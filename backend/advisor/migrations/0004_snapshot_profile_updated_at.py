@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0003_recommendation_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationsnapshot',
+            name='profile_updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -13,3 +13,22 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f'Profile for {self.user.email}'
+
+
+class RecommendationSnapshot(models.Model):
+    """A user's ranked recommendations, materialized when their profile changes."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recommendation_snapshot',
+    )
+    catalog_version = models.CharField(max_length=64)
+    # The profile's updated_at when it was scored; the view's ETag is derived from it.
+    profile_updated_at = models.DateTimeField(null=True)
+    recommendations = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Recommendations for user {self.user_id}'
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import exceptions
+
+from . import engine, services
+from .authentication import CachedTokenAuthentication
+
+PROFILE_HEADER = 'X-Advisor-Profile'
+MAX_STACK_DEPTH = 64
+
+# Server-Timing metric name -> (owner, attribute) of each probed scoring stage. Only stages
+# called a few times per request are probed: the probes are global while any request is
+# profiled, so per-career functions would slow every concurrent request and inflate
+# "ranking" with probe overhead. Where ranking spends its time shows up in the stack samples.
+STAGES: Dict[str, Tuple[object, str]] = {
+    'normalize': (services, 'normalize_profile'),
+    'retrieval': (services, '_retrieval_candidates'),
+    'match-counts': (services, '_match_counts'),
+    'ranking': (services, '_top_positions'),
+    'result-dicts': (services, '_score_career'),
+    'vector-score': (engine.VectorEngine, 'score'),
+    'vector-top': (engine.VectorEngine, 'top'),
+}
+
+_active: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar('advisor_request_profile', default=None)
+_install_lock = threading.Lock()
+_installed = 0
+_originals: Dict[str, Callable] = {}
+
+
+class RequestProfile:
+    """Stage timings and sampled stacks of one profiled request."""
+
+    def __init__(self, request, interval: float):
+        self.id = uuid.uuid4().hex
+        self.method = request.method
+        self.path = request.path
+        self.stages: Dict[str, List[float]] = {}
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def record(self, stage: str, elapsed: float) -> None:
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def __enter__(self) -> RequestProfile:
+        _install_probes()
+        self._token = _active.set(self)
+        self.sampler.start()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        self.sampler.stop()
+        _active.reset(self._token)
+        _uninstall_probes()
+
+    def server_timing(self) -> str:
+        entries = [
+            f'{stage};dur={seconds * 1000:.3f};desc="{calls} call{"" if calls == 1 else "s"}"'
+            for stage, (calls, seconds) in self.stages.items()
+        ]
+        entries.append(f'total;dur={self.elapsed * 1000:.3f}')
+        return ', '.join(entries)
+
+    def trace(self, view: Optional[str]) -> Dict[str, object]:
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'view': view,
+            'durationMs': self.elapsed * 1000,
+            'stages': {stage: {'calls': calls, 'ms': seconds * 1000} for stage, (calls, seconds) in self.stages.items()},
+            'samples': {'intervalMs': self.sampler.interval * 1000, 'stacks': dict(self.sampler.stacks.most_common())},
+        }
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer, counting identical stacks (folded format)."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='advisor-stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                names.append(f'{frame.f_globals.get("__name__", "?")}:{code.co_name}')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+
+def _probe(stage: str, function: Callable) -> Callable:
+    @functools.wraps(function)
+    def probe(*args, **kwargs):
+        profile = _active.get()
+        if profile is None:
+            # Another request is being profiled; this one only pays for the lookup.
+            return function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.record(stage, time.perf_counter() - started)
+
+    return probe
+
+
+def _install_probes() -> None:
+    """Swap the scoring stages for timing probes while at least one request is profiled."""
+    global _installed
+    with _install_lock:
+        if not _installed:
+            for stage, (owner, attribute) in STAGES.items():
+                _originals[stage] = getattr(owner, attribute)
+                setattr(owner, attribute, _probe(stage, _originals[stage]))
+        _installed += 1
+
+
+def _uninstall_probes() -> None:
+    global _installed
+    with _install_lock:
+        _installed -= 1
+        if not _installed:
+            for stage, (owner, attribute) in STAGES.items():
+                setattr(owner, attribute, _originals.pop(stage))
+
+
+def profiling_requested(request) -> bool:
+    """Profile every request when ALWAYS is set; otherwise only staff requests sending the header."""
+    return _profile_always() or (PROFILE_HEADER in request.headers and _requested_by_staff(request))
+
+
+def _profile_always() -> bool:
+    return bool(getattr(settings, 'ADVISOR_PROFILING', {}).get('ALWAYS'))
+
+
+def _requested_by_staff(request) -> bool:
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def trace_directory() -> Path:
+    config = getattr(settings, 'ADVISOR_PROFILING', {})
+    return Path(config.get('TRACE_DIR') or Path(settings.BASE_DIR) / '.advisor_cache' / 'traces')
+
+
+def save_trace(trace: Dict[str, object]) -> None:
+    """Write a trace where every worker can serve it, keeping only the newest MAX_TRACES."""
+    directory = trace_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    temporary = directory / f'{trace["id"]}.json.tmp'
+    temporary.write_text(json.dumps(trace), encoding='utf-8')
+    temporary.replace(directory / f'{trace["id"]}.json')
+
+    limit = getattr(settings, 'ADVISOR_PROFILING', {}).get('MAX_TRACES', 100)
+    traces = sorted(directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in traces[limit:]:
+        path.unlink(missing_ok=True)
+
+
+def load_trace(trace_id: str) -> Optional[Dict[str, object]]:
+    try:
+        return json.loads((trace_directory() / f'{trace_id}.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+class ProfilingMiddleware:
+    """Times scoring stages and samples stacks for requests that ask for it.
+
+    The response gets a ``Server-Timing`` header and an ``X-Advisor-Trace`` link to the
+    stored trace. Requests that are not profiled only pay for a header lookup.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not profiling_requested(request):
+            return self.get_response(request)
+        with RequestProfile(request, _interval()) as profile:
+            response = self.get_response(request)
+        return _finish(profile, request, response)
+
+    async def __acall__(self, request):
+        # Only the token lookup needs a thread; requests without the header never leave the loop.
+        requested = _profile_always() or (
+            PROFILE_HEADER in request.headers and await sync_to_async(_requested_by_staff)(request)
+        )
+        if not requested:
+            return await self.get_response(request)
+        # Samples the event loop thread; scoring moved to worker threads shows up as stage timings only.
+        with RequestProfile(request, _interval()) as profile:
+            response = await self.get_response(request)
+        return await sync_to_async(_finish)(profile, request, response)
+
+
+def _interval() -> float:
+    return getattr(settings, 'ADVISOR_PROFILING', {}).get('SAMPLE_INTERVAL', 0.005)
+
+
+def _finish(profile: RequestProfile, request, response):
+    match = getattr(request, 'resolver_match', None)
+    save_trace(profile.trace(match.view_name if match else None))
+    response['Server-Timing'] = profile.server_timing()
+    response['X-Advisor-Trace'] = reverse('advisor-profiling-trace', args=[profile.id])
+    return response
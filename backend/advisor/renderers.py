@@ -0,0 +1,137 @@
+import json
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from . import services
+
+STATIC_FIELDS = ('id', 'title', 'description', 'requiredSkills', 'interests', 'educationLevel', 'averageSalary', 'growthRate')
+RECOMMENDATION_FIELDS = (*STATIC_FIELDS, 'matchScore', 'matchedSkills', 'matchedInterests')
+_static_values = itemgetter(*STATIC_FIELDS)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON. Streaming views write their own body; this renders errors."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data) + '\n').encode(self.charset)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Server-sent events. Streaming views write their own body; this renders errors."""
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f'event: error\ndata: {json.dumps(data)}\n\n'.encode(self.charset)
+
+
+class CareerFragments:
+    """The profile-independent part of each career's recommendation, JSON-encoded once per catalog."""
+
+    def __init__(self, catalog, encode, ensure_ascii: bool):
+        self.catalog = catalog
+        self.ensure_ascii = ensure_ascii
+        self.static_values: Dict[str, Tuple] = {}
+        self.prefixes: Dict[str, str] = {}
+        self.terms: Dict[str, str] = {}
+        for career in catalog.careers:
+            fields = career.static_fields
+            slug = fields['id']
+            self.static_values[slug] = _static_values(fields)
+            members = ','.join(f'{encode(name)}:{encode(fields[name])}' for name in STATIC_FIELDS)
+            self.prefixes[slug] = '{' + members + ',"matchScore":'
+            for term in (*fields['requiredSkills'], *fields['interests']):
+                self.terms.setdefault(term, encode(term))
+
+
+class CareerJSONRenderer(JSONRenderer):
+    """JSONRenderer that splices pre-encoded career fragments into recommendation payloads.
+
+    Produces the same bytes as JSONRenderer. Only ``matchScore`` and the matched term
+    lists are encoded per response; any recommendation whose static fields differ from
+    the loaded catalog is encoded normally. Indented output falls back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encode = self.encoder_class(ensure_ascii=self.ensure_ascii, allow_nan=not self.strict, separators=(',', ':')).encode
+        fragments = _career_fragments(encode, self.ensure_ascii)
+        parts: List[str] = []
+        self._write(data, parts, encode, fragments)
+        # Same escaping as JSONRenderer: U+2028/U+2029 are valid JSON but break JavaScript.
+        return ''.join(parts).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+    def _write(self, value, parts: List[str], encode, fragments: CareerFragments) -> None:
+        if isinstance(value, dict):
+            prefix = self._fragment(value, fragments)
+            if prefix is not None:
+                parts.append(prefix)
+                parts.append(str(value['matchScore']))
+                parts.append(',"matchedSkills":')
+                self._write_terms(value['matchedSkills'], parts, encode, fragments)
+                parts.append(',"matchedInterests":')
+                self._write_terms(value['matchedInterests'], parts, encode, fragments)
+                parts.append('}')
+                return
+            if not all(isinstance(key, str) for key in value):
+                parts.append(encode(value))
+                return
+            parts.append('{')
+            for index, (key, item) in enumerate(value.items()):
+                parts.append(f'{encode(key)}:' if index == 0 else f',{encode(key)}:')
+                self._write(item, parts, encode, fragments)
+            parts.append('}')
+        elif isinstance(value, (list, tuple)):
+            parts.append('[')
+            for index, item in enumerate(value):
+                if index:
+                    parts.append(',')
+                self._write(item, parts, encode, fragments)
+            parts.append(']')
+        else:
+            parts.append(encode(value))
+
+    def _fragment(self, value: dict, fragments: CareerFragments) -> Optional[str]:
+        if tuple(value) != RECOMMENDATION_FIELDS or type(value['matchScore']) is not int:
+            return None
+        static_values = fragments.static_values.get(value['id'])
+        # Values produced from the loaded catalog are the same objects, so this is mostly identity checks.
+        if static_values is None or static_values != _static_values(value):
+            return None
+        return fragments.prefixes[value['id']]
+
+    def _write_terms(self, terms, parts: List[str], encode, fragments: CareerFragments) -> None:
+        if not isinstance(terms, list):
+            self._write(terms, parts, encode, fragments)
+            return
+        known = fragments.terms
+        parts.append('[' + ','.join(known.get(term) or encode(term) if isinstance(term, str) else encode(term) for term in terms) + ']')
+
+
+_fragments: Optional[CareerFragments] = None
+
+
+def _career_fragments(encode, ensure_ascii: bool) -> CareerFragments:
+    global _fragments
+    catalog = services.CATALOG
+    # Keyed on the catalog object: load_catalog() replaces it whenever the catalog changes.
+    if _fragments is None or _fragments.catalog is not catalog or _fragments.ensure_ascii != ensure_ascii:
+        _fragments = CareerFragments(catalog, encode, ensure_ascii)
+    return _fragments
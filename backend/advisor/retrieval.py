@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .catalog import CareerDefinition
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from in into is it of on or our the their to with your you '
+    'across through using while who what new real world'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class TfidfIndex:
+    """L2-normalized TF-IDF matrix over career titles and descriptions.
+
+    Stored as an inverted index (term -> career positions and weights), so a query
+    touches only the postings of its own terms.
+    """
+
+    def __init__(self, version: str, idf: Dict[str, float], postings: Dict[str, Tuple[List[int], List[float]]]):
+        self.version = version
+        self.idf = idf
+        self.postings = postings
+
+    @classmethod
+    def build(cls, careers: Sequence[CareerDefinition], version: str) -> TfidfIndex:
+        documents = [Counter(tokenize(f'{career.title} {career.description}')) for career in careers]
+        document_frequency: Counter = Counter()
+        for counts in documents:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        idf = {term: math.log((1 + total) / (1 + frequency)) + 1 for term, frequency in document_frequency.items()}
+
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for position, counts in enumerate(documents):
+            weights = {term: count * idf[term] for term, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                positions, values = postings.setdefault(term, ([], []))
+                positions.append(position)
+                values.append(weight / norm)
+        return cls(version, idf, postings)
+
+    @classmethod
+    def load(cls, path: Path) -> TfidfIndex:
+        with Path(path).open(encoding='utf-8') as handle:
+            payload = json.load(handle)
+        postings = {term: (positions, weights) for term, (positions, weights) in payload['postings'].items()}
+        return cls(payload['version'], payload['idf'], postings)
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Workers build the index on their first request, often at the same time, so each
+        # writes its own temporary file and the last rename wins.
+        descriptor, temporary = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=path.parent)
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as handle:
+                json.dump({'version': self.version, 'idf': self.idf, 'postings': self.postings}, handle)
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def query_vector(self, texts: Iterable[str]) -> Dict[str, float]:
+        counts = Counter(token for text in texts for token in tokenize(text) if token in self.idf)
+        weights = {term: count * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def shortlist(self, texts: Iterable[str], size: int) -> List[int]:
+        """Positions of the ``size`` careers with the highest cosine similarity to ``texts``."""
+        similarity: Dict[int, float] = {}
+        for term, query_weight in self.query_vector(texts).items():
+            positions, weights = self.postings[term]
+            for position, weight in zip(positions, weights):
+                similarity[position] = similarity.get(position, 0.0) + query_weight * weight
+        best = heapq.nsmallest(size, ((-score, position) for position, score in similarity.items()))
+        return [position for _, position in best]
+
+
+def load_or_build(careers: Sequence[CareerDefinition], version: str, directory: Optional[Path]) -> TfidfIndex:
+    """Reuse the persisted index for this catalog version, building and saving it when missing."""
+    path = Path(directory) / f'tfidf-{version}.json' if directory else None
+    if path is not None and path.exists():
+        try:
+            index = TfidfIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            index = None  # Unreadable or damaged: rebuilt and replaced below.
+        if index is not None and index.version == version:
+            return index
+    index = TfidfIndex.build(careers, version)
+    if path is not None:
+        index.save(path)
+    return index
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Sequence
+import hashlib
+import heapq
+import itertools
+import json
+from collections import Counter, namedtuple
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import engine
+from .catalog import CareerDefinition, CatalogColumns, CatalogSnapshot, Postings, catalog_hash, load_source
+from .matching import TermResolver, load_synonyms
+from .metrics import timed_scoring
 from .models import UserProfile
+from .retrieval import TfidfIndex, load_or_build
+
+DEFAULT_CATALOG_SOURCE = Path(__file__).resolve().parent / 'data' / 'careers.json'
 
 EXPERIENCE_BUCKETS = {
     '0': 0,   # entry level
@@ -14,725 +30,627 @@ EXPERIENCE_BUCKETS = {
 }
 
 
-@dataclass(frozen=True)
-class CareerDefinition:
-    slug: str
-    title: str
-    description: str
-    required_skills: Sequence[str]
-    interests: Sequence[str]
-    education_levels: Sequence[str]
-    average_salary: str
-    growth_rate: str
-    demand_index: int  # 1 (stable) - 5 (hot demand)
-    min_experience: int  # in years
-
-
-CAREER_LIBRARY: List[CareerDefinition] = [
-    CareerDefinition(
-        slug='ux-researcher',
-        title='UX Researcher',
-        description='Investigate user behavior, run studies, and translate findings into product insights.',
-        required_skills=['user research', 'interviewing', 'insight synthesis', 'usability testing'],
-        interests=['design', 'psychology', 'product'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$85k - $115k',
-        growth_rate='8% CAGR',
-        demand_index=3,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='data-analyst',
-        title='Data Analyst',
-        description='Clean, analyze, and visualize data to guide product and business decisions.',
-        required_skills=['sql', 'python', 'analytics', 'dashboards', 'storytelling'],
-        interests=['data', 'business', 'technology'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$75k - $105k',
-        growth_rate='11% CAGR',
-        demand_index=4,
-        min_experience=1,
-    ),
-    CareerDefinition(
-        slug='ai-product-manager',
-        title='AI Product Manager',
-        description='Define AI features, align cross-functional teams, and ensure responsible launches.',
-        required_skills=['roadmapping', 'stakeholder management', 'prompt design', 'model evaluation'],
-        interests=['ai', 'strategy', 'product'],
-        education_levels=['bachelors', 'mba', 'masters'],
-        average_salary='$120k - $155k',
-        growth_rate='18% CAGR',
-        demand_index=5,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='learning-experience-designer',
-        title='Learning Experience Designer',
-        description='Build engaging curricula and digital learning paths for internal upskilling.',
-        required_skills=['curriculum design', 'storyboarding', 'learning science', 'stakeholder interviews'],
-        interests=['education', 'design', 'technology'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$70k - $95k',
-        growth_rate='9% CAGR',
-        demand_index=3,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='machine-learning-engineer',
-        title='Machine Learning Engineer',
-        description='Ship ML models to production, optimize performance, and monitor real-world impact.',
-        required_skills=['python', 'ml ops', 'model deployment', 'data engineering'],
-        interests=['ai', 'automation', 'data'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$125k - $165k',
-        growth_rate='21% CAGR',
-        demand_index=5,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='product-operations-strategist',
-        title='Product Operations Strategist',
-        description='Scale product rituals, streamline experimentation, and keep roadmaps unblocked.',
-        required_skills=['process design', 'analytics', 'communication', 'program management'],
-        interests=['operations', 'product', 'strategy'],
-        education_levels=['bachelors', 'mba'],
-        average_salary='$95k - $130k',
-        growth_rate='12% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='customer-success-lead',
-        title='Customer Success Lead',
-        description='Partner with customers, drive adoption metrics, and translate insights back to product.',
-        required_skills=['relationship management', 'data storytelling', 'escalation handling', 'playbooks'],
-        interests=['people', 'business', 'enablement'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$80k - $110k',
-        growth_rate='10% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='technical-writer',
-        title='Technical Writer',
-        description='Translate complex systems into clear docs, tutorials, and enablement assets.',
-        required_skills=['technical writing', 'api literacy', 'information architecture', 'editing'],
-        interests=['communication', 'technology', 'education'],
-        education_levels=['bachelors'],
-        average_salary='$65k - $95k',
-        growth_rate='7% CAGR',
-        demand_index=2,
-        min_experience=1,
-    ),
-    CareerDefinition(
-        slug='growth-product-analyst',
-        title='Growth Product Analyst',
-        description='Instrument funnels, run experiments, and turn insights into growth playbooks.',
-        required_skills=['sql', 'experiment design', 'product analytics', 'dashboarding'],
-        interests=['data', 'product', 'experimentation'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$90k - $120k',
-        growth_rate='14% CAGR',
-        demand_index=4,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='security-operations-analyst',
-        title='Security Operations Analyst',
-        description='Monitor threats, triage incidents, and automate response workflows.',
-        required_skills=['siem', 'incident response', 'scripting', 'threat intelligence'],
-        interests=['security', 'automation', 'operations'],
-        education_levels=['bachelors', 'certifications'],
-        average_salary='$95k - $135k',
-        growth_rate='15% CAGR',
-        demand_index=5,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='marketing-automation-specialist',
-        title='Marketing Automation Specialist',
-        description='Build lifecycle journeys, personalize campaigns, and ship scoring models.',
-        required_skills=['marketing ops', 'crm', 'sql', 'copywriting'],
-        interests=['marketing', 'data', 'automation'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$70k - $105k',
-        growth_rate='9% CAGR',
-        demand_index=3,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='cloud-solutions-architect',
-        title='Cloud Solutions Architect',
-        description='Design reliable cloud platforms, advise teams on cost-performance, and guide migrations.',
-        required_skills=['aws/azure', 'infrastructure design', 'devops', 'cost optimization'],
-        interests=['cloud', 'architecture', 'automation'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$140k - $185k',
-        growth_rate='16% CAGR',
-        demand_index=5,
-        min_experience=6,
-    ),
-    CareerDefinition(
-        slug='health-informatics-analyst',
-        title='Health Informatics Analyst',
-        description='Clean EMR data, identify care gaps, and support clinicians with dashboards.',
-        required_skills=['data cleaning', 'healthcare compliance', 'visualization', 'sql'],
-        interests=['healthcare', 'data', 'impact'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$80k - $110k',
-        growth_rate='13% CAGR',
-        demand_index=4,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='full-stack-engineer',
-        title='Full-Stack Engineer',
-        description='Ship end-to-end features across modern frontends and resilient APIs.',
-        required_skills=['javascript', 'node.js', 'react', 'database design', 'devops'],
-        interests=['code', 'product', 'problem solving'],
-        education_levels=['bachelors', 'bootcamp'],
-        average_salary='$110k - $145k',
-        growth_rate='15% CAGR',
-        demand_index=5,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='cybersecurity-engineer',
-        title='Cybersecurity Engineer',
-        description='Design defenses, run red/blue team exercises, and harden infrastructure.',
-        required_skills=['network security', 'penetration testing', 'automation', 'incident response'],
-        interests=['security', 'automation', 'systems'],
-        education_levels=['bachelors', 'certifications'],
-        average_salary='$115k - $150k',
-        growth_rate='17% CAGR',
-        demand_index=5,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='product-marketing-manager',
-        title='Product Marketing Manager',
-        description='Craft positioning, launch go-to-market plans, and enable revenue teams.',
-        required_skills=['positioning', 'messaging', 'market research', 'stakeholder management'],
-        interests=['marketing', 'storytelling', 'strategy'],
-        education_levels=['bachelors', 'mba'],
-        average_salary='$105k - $140k',
-        growth_rate='9% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='financial-planning-analyst',
-        title='Financial Planning Analyst',
-        description='Model scenarios, monitor KPIs, and advise on budgeting decisions.',
-        required_skills=['financial modeling', 'excel', 'sql', 'communication'],
-        interests=['finance', 'business', 'analytics'],
-        education_levels=['bachelors', 'cfa'],
-        average_salary='$85k - $115k',
-        growth_rate='7% CAGR',
-        demand_index=3,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='supply-chain-analyst',
-        title='Supply Chain Analyst',
-        description='Forecast demand, optimize logistics, and reduce working capital.',
-        required_skills=['demand planning', 'sql', 'optimization', 'erp'],
-        interests=['operations', 'data', 'global business'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$80k - $110k',
-        growth_rate='8% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='biomedical-engineer',
-        title='Biomedical Engineer',
-        description='Prototype medical devices, run usability studies, and ensure regulatory compliance.',
-        required_skills=['biomechanics', 'cad', 'testing', 'documentation'],
-        interests=['healthcare', 'engineering', 'innovation'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$95k - $125k',
-        growth_rate='10% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='sustainability-consultant',
-        title='Sustainability Consultant',
-        description='Audit carbon footprints, design ESG roadmaps, and secure stakeholder buy-in.',
-        required_skills=['life-cycle analysis', 'data storytelling', 'policy research', 'facilitation'],
-        interests=['environment', 'policy', 'impact'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$90k - $130k',
-        growth_rate='14% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='blockchain-developer',
-        title='Blockchain Developer',
-        description='Build decentralized apps, smart contracts, and secure wallets.',
-        required_skills=['solidity', 'cryptography', 'distributed systems', 'javascript'],
-        interests=['web3', 'finance', 'innovation'],
-        education_levels=['bachelors', 'bootcamp'],
-        average_salary='$120k - $160k',
-        growth_rate='19% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='salesforce-consultant',
-        title='Salesforce Consultant',
-        description='Translate business workflows into scalable Salesforce automations.',
-        required_skills=['salesforce admin', 'process design', 'apex', 'stakeholder management'],
-        interests=['crm', 'operations', 'automation'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$95k - $125k',
-        growth_rate='12% CAGR',
-        demand_index=4,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='vr-interaction-designer',
-        title='VR Interaction Designer',
-        description='Craft immersive interactions and ensure comfort in virtual environments.',
-        required_skills=['3d design', 'unity', 'user research', 'prototyping'],
-        interests=['vr/ar', 'design', 'storytelling'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$100k - $135k',
-        growth_rate='18% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='edtech-program-manager',
-        title='EdTech Program Manager',
-        description='Coordinate large learning deployments, drive adoption, and report impact.',
-        required_skills=['project management', 'data analysis', 'facilitation', 'stakeholder alignment'],
-        interests=['education', 'operations', 'technology'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$90k - $120k',
-        growth_rate='11% CAGR',
-        demand_index=3,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='game-producer',
-        title='Game Producer',
-        description='Run cross-functional sprint rituals, manage roadmaps, and ensure polished releases.',
-        required_skills=['project management', 'communication', 'analytics', 'game pipelines'],
-        interests=['gaming', 'storytelling', 'team leadership'],
-        education_levels=['bachelors'],
-        average_salary='$85k - $125k',
-        growth_rate='9% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='data-engineering-lead',
-        title='Data Engineering Lead',
-        description='Architect pipelines, mentor engineers, and keep analytics platforms reliable.',
-        required_skills=['python', 'spark', 'data modeling', 'cloud infrastructure'],
-        interests=['data', 'architecture', 'leadership'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$135k - $180k',
-        growth_rate='16% CAGR',
-        demand_index=5,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='customer-research-strategist',
-        title='Customer Research Strategist',
-        description='Blend qual/quant methods, size markets, and inform product bets.',
-        required_skills=['survey design', 'statistical analysis', 'storytelling', 'stakeholder alignment'],
-        interests=['research', 'product', 'strategy'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$95k - $130k',
-        growth_rate='10% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='content-strategy-lead',
-        title='Content Strategy Lead',
-        description='Guide multi-channel narratives, editorial calendars, and voice governance.',
-        required_skills=['content ops', 'seo', 'analytics', 'copywriting'],
-        interests=['storytelling', 'marketing', 'leadership'],
-        education_levels=['bachelors'],
-        average_salary='$100k - $140k',
-        growth_rate='8% CAGR',
-        demand_index=3,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='operations-research-analyst',
-        title='Operations Research Analyst',
-        description='Model complex systems and recommend optimizations for cost or throughput.',
-        required_skills=['linear programming', 'python', 'simulation', 'statistics'],
-        interests=['math', 'operations', 'analytics'],
-        education_levels=['masters', 'phd'],
-        average_salary='$105k - $140k',
-        growth_rate='11% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='public-health-analyst',
-        title='Public Health Analyst',
-        description='Track population health metrics, prepare briefs, and inform policy.',
-        required_skills=['epidemiology', 'r/python', 'data visualization', 'stakeholder management'],
-        interests=['healthcare', 'policy', 'data'],
-        education_levels=['masters'],
-        average_salary='$85k - $115k',
-        growth_rate='9% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='digital-transformation-consultant',
-        title='Digital Transformation Consultant',
-        description='Assess tech stacks, align execs, and deliver modernization roadmaps.',
-        required_skills=['strategy', 'process mapping', 'cloud fluency', 'change management'],
-        interests=['consulting', 'technology', 'operations'],
-        education_levels=['bachelors', 'mba'],
-        average_salary='$135k - $185k',
-        growth_rate='13% CAGR',
-        demand_index=4,
-        min_experience=6,
-    ),
-    CareerDefinition(
-        slug='manufacturing-automation-engineer',
-        title='Manufacturing Automation Engineer',
-        description='Deploy robotics, tune PLCs, and cut downtime on production lines.',
-        required_skills=['plc programming', 'robotics', 'lean manufacturing', 'cad'],
-        interests=['hardware', 'operations', 'automation'],
-        education_levels=['bachelors'],
-        average_salary='$95k - $130k',
-        growth_rate='12% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='policy-analyst',
-        title='Policy Analyst',
-        description='Research legislation, model impact scenarios, and brief decision makers.',
-        required_skills=['policy research', 'writing', 'statistics', 'stakeholder engagement'],
-        interests=['public service', 'law', 'economics'],
-        education_levels=['masters'],
-        average_salary='$80k - $110k',
-        growth_rate='6% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='clinical-psychologist',
-        title='Clinical Psychologist',
-        description='Diagnose mental health conditions, develop treatment plans, and document progress.',
-        required_skills=['diagnostic assessment', 'cbt', 'report writing', 'empathy'],
-        interests=['healthcare', 'psychology', 'people'],
-        education_levels=['phd', 'psyd'],
-        average_salary='$95k - $130k',
-        growth_rate='11% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='school-counselor',
-        title='School Counselor',
-        description='Support students’ academic planning, social-emotional needs, and family coordination.',
-        required_skills=['counseling', 'intervention planning', 'communication', 'record keeping'],
-        interests=['education', 'youth development', 'guidance'],
-        education_levels=['masters'],
-        average_salary='$65k - $90k',
-        growth_rate='8% CAGR',
-        demand_index=4,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='healthcare-administrator',
-        title='Healthcare Administrator',
-        description='Oversee operations, staffing, and budgeting within hospitals or clinics.',
-        required_skills=['operations', 'budget management', 'regulatory compliance', 'leadership'],
-        interests=['healthcare', 'management', 'impact'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$110k - $150k',
-        growth_rate='9% CAGR',
-        demand_index=4,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='nonprofit-program-manager',
-        title='Nonprofit Program Manager',
-        description='Design community programs, manage grants, and measure social outcomes.',
-        required_skills=['program design', 'grant writing', 'stakeholder engagement', 'reporting'],
-        interests=['impact', 'community', 'leadership'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$70k - $100k',
-        growth_rate='7% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='museum-curator',
-        title='Museum Curator',
-        description='Acquire collections, plan exhibitions, and steward educational experiences.',
-        required_skills=['art history', 'research', 'storytelling', 'collection management'],
-        interests=['arts', 'history', 'education'],
-        education_levels=['masters'],
-        average_salary='$60k - $85k',
-        growth_rate='5% CAGR',
-        demand_index=2,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='hospitality-operations-manager',
-        title='Hospitality Operations Manager',
-        description='Optimize guest experiences, lead staff, and meet revenue targets for hotels or resorts.',
-        required_skills=['customer experience', 'p&l management', 'team leadership', 'vendor coordination'],
-        interests=['hospitality', 'travel', 'service'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$85k - $120k',
-        growth_rate='10% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='retail-merchandising-director',
-        title='Retail Merchandising Director',
-        description='Create assortment strategies, negotiate with vendors, and drive category performance.',
-        required_skills=['merchandising', 'forecasting', 'negotiation', 'visual storytelling'],
-        interests=['retail', 'fashion', 'business'],
-        education_levels=['bachelors'],
-        average_salary='$110k - $150k',
-        growth_rate='6% CAGR',
-        demand_index=3,
-        min_experience=6,
-    ),
-    CareerDefinition(
-        slug='logistics-coordinator',
-        title='Logistics Coordinator',
-        description='Schedule shipments, track carriers, and resolve delivery exceptions.',
-        required_skills=['planning', 'communication', 'negotiation', 'data entry'],
-        interests=['operations', 'global trade', 'problem solving'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$55k - $80k',
-        growth_rate='7% CAGR',
-        demand_index=3,
-        min_experience=2,
-    ),
-    CareerDefinition(
-        slug='public-relations-specialist',
-        title='Public Relations Specialist',
-        description='Craft narratives, pitch media, and manage reputation for brands or leaders.',
-        required_skills=['writing', 'media relations', 'crisis communication', 'storytelling'],
-        interests=['communications', 'storytelling', 'relationships'],
-        education_levels=['bachelors'],
-        average_salary='$70k - $95k',
-        growth_rate='8% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='event-producer',
-        title='Event Producer',
-        description='Design live experiences, manage vendors, and execute seamless events.',
-        required_skills=['project management', 'vendor coordination', 'budgeting', 'creative direction'],
-        interests=['events', 'storytelling', 'people'],
-        education_levels=['associates', 'bachelors'],
-        average_salary='$75k - $105k',
-        growth_rate='9% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='community-development-officer',
-        title='Community Development Officer',
-        description='Partner with municipalities, secure funding, and revitalize neighborhoods.',
-        required_skills=['stakeholder engagement', 'grant management', 'urban planning', 'communication'],
-        interests=['civic service', 'planning', 'impact'],
-        education_levels=['bachelors', 'masters'],
-        average_salary='$80k - $115k',
-        growth_rate='7% CAGR',
-        demand_index=3,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='agriculture-extension-officer',
-        title='Agriculture Extension Officer',
-        description='Train farmers on modern practices, analyze soil data, and support sustainability.',
-        required_skills=['agronomy', 'field training', 'data collection', 'reporting'],
-        interests=['agriculture', 'education', 'outdoors'],
-        education_levels=['bachelors'],
-        average_salary='$60k - $85k',
-        growth_rate='6% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='environmental-compliance-inspector',
-        title='Environmental Compliance Inspector',
-        description='Audit facilities, interpret regulations, and enforce environmental standards.',
-        required_skills=['regulatory knowledge', 'inspection', 'report writing', 'communication'],
-        interests=['environment', 'policy', 'field work'],
-        education_levels=['bachelors'],
-        average_salary='$70k - $95k',
-        growth_rate='8% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='construction-project-manager',
-        title='Construction Project Manager',
-        description='Oversee site schedules, safety, and budgets from ground-breaking to delivery.',
-        required_skills=['project scheduling', 'contract management', 'safety compliance', 'leadership'],
-        interests=['building', 'operations', 'leadership'],
-        education_levels=['bachelors'],
-        average_salary='$105k - $150k',
-        growth_rate='10% CAGR',
-        demand_index=4,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='insurance-underwriter',
-        title='Insurance Underwriter',
-        description='Assess risk profiles, price policies, and collaborate with brokers.',
-        required_skills=['risk analysis', 'excel', 'communication', 'decision making'],
-        interests=['finance', 'risk management', 'analysis'],
-        education_levels=['bachelors'],
-        average_salary='$80k - $110k',
-        growth_rate='5% CAGR',
-        demand_index=3,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='financial-advisor',
-        title='Financial Advisor',
-        description='Guide clients through investment strategies, retirement plans, and wealth goals.',
-        required_skills=['financial planning', 'communication', 'sales', 'compliance'],
-        interests=['finance', 'people', 'strategy'],
-        education_levels=['bachelors', 'certifications'],
-        average_salary='$90k - $130k',
-        growth_rate='11% CAGR',
-        demand_index=4,
-        min_experience=3,
-    ),
-    CareerDefinition(
-        slug='aviation-operations-manager',
-        title='Aviation Operations Manager',
-        description='Coordinate crews, turnaround times, and safety protocols for airline operations.',
-        required_skills=['operations planning', 'regulatory compliance', 'communication', 'crisis management'],
-        interests=['aviation', 'operations', 'leadership'],
-        education_levels=['bachelors'],
-        average_salary='$110k - $150k',
-        growth_rate='9% CAGR',
-        demand_index=4,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='sports-marketing-manager',
-        title='Sports Marketing Manager',
-        description='Develop fan engagement campaigns, manage sponsorships, and track ticketing KPIs.',
-        required_skills=['marketing strategy', 'partnerships', 'data storytelling', 'negotiation'],
-        interests=['sports', 'marketing', 'events'],
-        education_levels=['bachelors'],
-        average_salary='$95k - $130k',
-        growth_rate='10% CAGR',
-        demand_index=4,
-        min_experience=4,
-    ),
-    CareerDefinition(
-        slug='culinary-innovation-chef',
-        title='Culinary Innovation Chef',
-        description='Prototype new menus, collaborate with suppliers, and ensure consistent execution.',
-        required_skills=['menu design', 'food science', 'costing', 'team leadership'],
-        interests=['culinary', 'creativity', 'leadership'],
-        education_levels=['culinary diploma', 'associates'],
-        average_salary='$85k - $115k',
-        growth_rate='8% CAGR',
-        demand_index=3,
-        min_experience=5,
-    ),
-    CareerDefinition(
-        slug='occupational-therapist',
-        title='Occupational Therapist',
-        description='Help clients regain independence through tailored therapeutic plans.',
-        required_skills=['assessment', 'treatment planning', 'documentation', 'patient education'],
-        interests=['healthcare', 'people', 'rehabilitation'],
-        education_levels=['masters'],
-        average_salary='$90k - $120k',
-        growth_rate='13% CAGR',
-        demand_index=5,
-        min_experience=2,
-    ),
-]
-
-
-def generate_recommendations(profile: UserProfile) -> List[Dict[str, object]]:
-    scored = [_score_career(profile, career) for career in CAREER_LIBRARY]
-    scored.sort(key=lambda item: item['matchScore'], reverse=True)
-    return scored[:3]
-
-
-def _score_career(profile: UserProfile, career: CareerDefinition) -> Dict[str, object]:
-    normalized_skills = {skill.lower() for skill in profile.skills}
-    normalized_interests = {interest.lower() for interest in profile.interests}
-    matched_skills = sorted(
-        {skill for skill in career.required_skills if skill.lower() in normalized_skills}
+class CompiledCareer:
+    """Scoring-ready form of a CareerDefinition with terms interned to integer ids."""
+
+    __slots__ = (
+        'position',
+        'definition',
+        'skill_terms',
+        'interest_terms',
+        'skill_total',
+        'interest_total',
+        'education_ids',
+        'min_experience',
+        'demand_score',
+        'title_keyword_ids',
+        'static_fields',
     )
-    matched_interests = sorted(
-        {interest for interest in career.interests if interest.lower() in normalized_interests}
+
+    def __init__(self, position: int, definition: CareerDefinition, catalog: CompiledCatalog):
+        self.position = position
+        self.definition = definition
+        # (raw value, term id) for each distinct raw value, so matched lists keep catalog spelling.
+        self.skill_terms = tuple((value, catalog.intern(value.lower())) for value in set(definition.required_skills))
+        self.interest_terms = tuple((value, catalog.intern(value.lower())) for value in set(definition.interests))
+        self.skill_total = len(definition.required_skills)
+        self.interest_total = len(definition.interests)
+        self.education_ids = frozenset(catalog.intern_education(level) for level in definition.education_levels)
+        self.min_experience = definition.min_experience
+        self.demand_score = definition.demand_index / 5
+        title = definition.title.lower()
+        self.title_keyword_ids = frozenset(catalog.intern_title_keyword(keyword) for keyword in {title, *title.split()})
+        # Payload fields that do not depend on the profile; results share these lists.
+        self.static_fields = {
+            'id': definition.slug,
+            'title': definition.title,
+            'description': definition.description,
+            'requiredSkills': list(definition.required_skills),
+            'interests': list(definition.interests),
+            'educationLevel': list(definition.education_levels),
+            'averageSalary': definition.average_salary,
+            'growthRate': definition.growth_rate,
+        }
+
+
+class CompiledCatalog:
+    """Career catalog compiled once at load time: interned vocabularies, postings and records.
+
+    With ``columns`` (a snapshot's column view of ``careers``), vocabularies and postings are
+    read from the columns and each career is compiled from its record on first access, so
+    loading does not decode the whole catalog.
+    """
+
+    def __init__(
+        self,
+        careers: Sequence[CareerDefinition],
+        version: Optional[str] = None,
+        synonyms: Optional[Dict[str, List[str]]] = None,
+        fuzzy_threshold: Optional[float] = None,
+        columns: Optional[CatalogColumns] = None,
+    ):
+        self.terms: Dict[str, int] = {}
+        self.education_levels: Dict[str, int] = {}
+        self.title_keywords: Dict[str, int] = {}
+        self._columns = columns
+        self._unmatched_careers: Optional[Sequence] = None
+        if columns is None:
+            self.careers: Sequence[CompiledCareer] = [
+                CompiledCareer(position, career, self) for position, career in enumerate(careers)
+            ]
+            self.skill_postings = _index_terms(self.careers, 'skill_terms')
+            self.interest_postings = _index_terms(self.careers, 'interest_terms')
+            self.title_postings = _index_title_keywords(self.careers)
+        else:
+            self.skill_postings = _postings_by_id(columns.skills, self.intern)
+            self.interest_postings = _postings_by_id(columns.interests, self.intern)
+            self.title_postings = {
+                keyword: tuple(dict.fromkeys(positions))
+                for keyword, positions in _postings_by_id(columns.title_keywords, self.intern_title_keyword).items()
+            }
+            for level in columns.education.vocabulary:
+                self.intern_education(level)
+            self.careers = LazyCompiledCareers(self, careers)
+        self.term_names = list(self.terms)
+        self.title_keyword_length = max(map(len, self.title_keywords), default=0)
+        # (education id, experience years) -> every career ranked by its score without any
+        # skill, interest or role match, built on first use.
+        self._baselines: Dict[Tuple[Optional[int], int], Tuple[Tuple[int, int], ...]] = {}
+        self.skill_resolver = TermResolver(
+            {self.term_names[term]: term for term in self.skill_postings}, synonyms, fuzzy_threshold
+        )
+        self.interest_resolver = TermResolver(
+            {self.term_names[term]: term for term in self.interest_postings}, synonyms, fuzzy_threshold
+        )
+        # Matching configuration changes results, so it is part of the version used by caches.
+        self.version = version or catalog_hash(careers)
+        if synonyms or fuzzy_threshold is not None:
+            matching = json.dumps([self.version, synonyms, fuzzy_threshold], sort_keys=True)
+            self.version = hashlib.sha256(matching.encode('utf-8')).hexdigest()[:16]
+
+    def baseline(self, education_id: Optional[int], experience_years: int) -> Tuple[Tuple[int, int], ...]:
+        """``(-score, position)`` of every career, ascending, for a profile that matches nothing.
+
+        Those careers score from education, experience and demand alone, so one ranking per
+        (education, experience bucket) serves every profile; there are at most a few dozen.
+        """
+        key = (education_id, experience_years)
+        ranking = self._baselines.get(key)
+        if ranking is None:
+            unmatched = _Unmatched(education_id, experience_years, frozenset())
+            ranking = self._baselines[key] = tuple(sorted(
+                (-_match_score(unmatched, career, 0, 0), career.position) for career in self.unmatched_careers()
+            ))
+        return ranking
+
+    def unmatched_careers(self) -> Sequence:
+        """The per-career fields the baseline scores read, taken from the columns when loaded
+        from a snapshot so that ranking never compiles every career."""
+        if self._columns is None:
+            return self.careers
+        if self._unmatched_careers is None:
+            columns = self._columns
+            education: List[List[int]] = [[] for _ in range(columns.size)]
+            postings = columns.education
+            for level, start, end in zip(postings.vocabulary, postings.indptr, postings.indptr[1:]):
+                for position in postings.indices[start:end]:
+                    education[position].append(self.education_levels[level])
+            self._unmatched_careers = [
+                _UnmatchedCareer(
+                    position,
+                    columns.skill_totals[position],
+                    columns.interest_totals[position],
+                    frozenset(education[position]),
+                    columns.min_experience[position],
+                    columns.demand_index[position] / 5,
+                    frozenset(),
+                )
+                for position in range(columns.size)
+            ]
+        return self._unmatched_careers
+
+    def intern(self, term: str) -> int:
+        return self.terms.setdefault(term, len(self.terms))
+
+    def intern_education(self, level: str) -> int:
+        return self.education_levels.setdefault(level, len(self.education_levels))
+
+    def intern_title_keyword(self, keyword: str) -> int:
+        return self.title_keywords.setdefault(keyword, len(self.title_keywords))
+
+
+class LazyCompiledCareers(Sequence):
+    """CompiledCareer records of a snapshot catalog, each compiled from its record on first use."""
+
+    def __init__(self, catalog: CompiledCatalog, definitions: Sequence[CareerDefinition]):
+        self._catalog = catalog
+        self._definitions = definitions
+        self._compiled: List[Optional[CompiledCareer]] = [None] * len(definitions)
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        career = self._compiled[index]
+        if career is None:
+            # Every term was interned from the snapshot vocabularies, so compiling a record
+            # only looks ids up.
+            career = self._compiled[index] = CompiledCareer(index, self._definitions[index], self._catalog)
+        return career
+
+    def __iter__(self) -> Iterator[CompiledCareer]:
+        for position in range(len(self)):
+            yield self[position]
+
+
+class NormalizedProfile:
+    """Profile inputs normalized once per request against a compiled catalog."""
+
+    __slots__ = (
+        'skills',
+        'interests',
+        'skill_ids',
+        'interest_ids',
+        'education_level',
+        'education_id',
+        'years_experience',
+        'experience_years',
+        'current_role',
+        'role_keyword_ids',
     )
 
-    skill_score = _safe_ratio(len(matched_skills), len(career.required_skills))
-    interest_score = _safe_ratio(len(matched_interests), len(career.interests))
-    education_score = _education_alignment(profile.education_level, career.education_levels)
-    experience_score = _experience_alignment(profile.years_experience, career.min_experience)
-    demand_score = career.demand_index / 5
-    role_bonus = _role_alignment(profile.current_role, career.title)
+    def __init__(self, profile: UserProfile, catalog: CompiledCatalog):
+        self.skill_ids = _resolve_terms(profile.skills, catalog.skill_resolver)
+        self.interest_ids = _resolve_terms(profile.interests, catalog.interest_resolver)
+        # Canonical catalog spellings of the resolved terms, as consumed by the vector engine.
+        self.skills = frozenset(catalog.term_names[term] for term in self.skill_ids)
+        self.interests = frozenset(catalog.term_names[term] for term in self.interest_ids)
+        self.education_level = profile.education_level
+        # None means no level given; -1 is a level that no career lists.
+        self.education_id = catalog.education_levels.get(profile.education_level, -1) if profile.education_level else None
+        self.years_experience = profile.years_experience
+        self.experience_years = EXPERIENCE_BUCKETS.get(profile.years_experience, 2)
+        self.current_role = profile.current_role
+        self.role_keyword_ids = _role_keyword_ids(profile.current_role, catalog)
 
-    weighted_score = (
-        (skill_score * 0.5)
-        + (interest_score * 0.2)
-        + (education_score * 0.1)
-        + (experience_score * 0.1)
-        + (demand_score * 0.1)
-        + role_bonus
+
+class ScoreComponents:
+    """Weighted score components of one profile for every career in a catalog.
+
+    ``updated`` recomputes only the components whose inputs changed and re-combines them,
+    so a profile edit touching one field does not rescore the others. Instances are never
+    mutated; updates share the unchanged columns with the previous instance.
+    """
+
+    # Component -> the NormalizedProfile attribute it depends on.
+    INPUTS = {
+        'skills': 'skill_ids',
+        'interests': 'interest_ids',
+        'education': 'education_id',
+        'experience': 'experience_years',
+        'role': 'role_keyword_ids',
+    }
+
+    # Eight float64 columns plus the int64 scores. Without NumPy the columns are tuples of
+    # Python floats, which take several times more.
+    BYTES_PER_CAREER = 9 * 8
+
+    __slots__ = ('catalog', 'normalized', 'columns', 'scores')
+
+    def __init__(self, normalized: NormalizedProfile, catalog: CompiledCatalog, columns: Optional[Dict[str, Tuple]] = None):
+        self.catalog = catalog
+        self.normalized = normalized
+        self.columns = dict(columns or {})
+        for name in ('demand', *self.INPUTS):
+            if name not in self.columns:
+                self.columns[name] = self._column(name)
+        self.scores = self._combine()
+
+    def updated(self, normalized: NormalizedProfile) -> Tuple[ScoreComponents, List[str]]:
+        """Components for ``normalized`` and the names of the components that changed."""
+        changed = [
+            name for name, attribute in self.INPUTS.items()
+            if getattr(normalized, attribute) != getattr(self.normalized, attribute)
+        ]
+        if not changed:
+            return self, changed
+        kept = {name: column for name, column in self.columns.items() if name not in changed}
+        return ScoreComponents(normalized, self.catalog, kept), changed
+
+    def recommendations(self, limit: int, offset: int = 0) -> List[Dict[str, object]]:
+        careers = self.catalog.careers
+        if engine.np is not None:
+            keys = (98 - self.scores) * len(careers) + engine.np.arange(len(careers))
+            depth = min(offset + limit, len(careers))
+            if depth < len(careers):
+                keys = keys[engine.np.argpartition(keys, depth - 1)[:depth]] if depth else keys[:0]
+            positions = [int(key % len(careers)) for key in engine.np.sort(keys)]
+        else:
+            ranked = heapq.nsmallest(offset + limit, ((-score, position) for position, score in enumerate(self.scores)))
+            positions = [position for _, position in ranked]
+        return [_score_career(self.normalized, careers[position]) for position in positions[offset:]]
+
+    def _column(self, name: str) -> Tuple:
+        normalized, careers = self.normalized, self.catalog.careers
+        if name in ('skills', 'interests'):
+            postings, totals, weight, spread = (
+                (self.catalog.skill_postings, 'skill_total', 0.5, 1.7)
+                if name == 'skills'
+                else (self.catalog.interest_postings, 'interest_total', 0.2, 1.1)
+            )
+            # Careers without a match contribute exactly 0.0, so only the postings of the
+            # profile's own terms are visited.
+            weighted, spreads = [0.0] * len(careers), [0.0] * len(careers)
+            for position, count in _match_counts(postings, getattr(normalized, self.INPUTS[name])).items():
+                weighted[position] = _safe_ratio(count, getattr(careers[position], totals)) * weight
+                spreads[position] = count * spread
+            return _vector(weighted), _vector(spreads)
+        if name == 'education':
+            values = [_education_alignment(normalized.education_id, career.education_ids) * 0.1 for career in careers]
+        elif name == 'experience':
+            values = [_experience_alignment(normalized.experience_years, career.min_experience) * 0.1 for career in careers]
+        elif name == 'demand':
+            values = [career.demand_score * 0.1 for career in careers]
+        else:
+            values = [_role_alignment(normalized.role_keyword_ids, career.title_keyword_ids) for career in careers]
+        return (_vector(values),)
+
+    def _combine(self):
+        # Same operand order as _match_score, so scores match the full scorer bit for bit.
+        (skills, skill_spread), (interests, interest_spread) = self.columns['skills'], self.columns['interests']
+        (education,), (experience,), (demand,), (role,) = (
+            self.columns['education'], self.columns['experience'], self.columns['demand'], self.columns['role']
+        )
+        if engine.np is not None:
+            weighted = ((((skills + interests) + education) + experience) + demand) + role
+            return engine.np.clip(engine.np.trunc((weighted * 100) + (skill_spread + interest_spread)), 28, 98).astype(engine.np.int64)
+        return [
+            max(28, min(98, int((((((s + i) + e) + x) + d + r) * 100) + (sv + iv))))
+            for s, i, e, x, d, r, sv, iv in zip(skills, interests, education, experience, demand, role, skill_spread, interest_spread)
+        ]
+
+
+def _vector(values: List[float]):
+    """Component column: a float64 array when numpy is available, else the list itself."""
+    return engine.np.asarray(values, dtype=engine.np.float64) if engine.np is not None else values
+
+
+CAREER_LIBRARY: Sequence[CareerDefinition]
+CATALOG: CompiledCatalog
+_snapshot: Optional[CatalogSnapshot] = None
+_vector_engine: Optional[engine.VectorEngine] = None
+_retrieval_index: Optional[TfidfIndex] = None
+
+
+@receiver(setting_changed)
+def _reset_retrieval_index(sender, setting, **kwargs):
+    global _retrieval_index
+    if setting in ('ADVISOR_RETRIEVAL_MODE', 'ADVISOR_RETRIEVAL_INDEX_DIR'):
+        _retrieval_index = None
+
+
+def load_catalog() -> None:
+    """Load careers from the compiled snapshot when one is configured, else from the source file."""
+    global CAREER_LIBRARY, _snapshot
+    snapshot_path = getattr(settings, 'ADVISOR_CATALOG_SNAPSHOT', None)
+    if snapshot_path and Path(snapshot_path).exists():
+        _snapshot = CatalogSnapshot(snapshot_path)
+        CAREER_LIBRARY = _snapshot.careers
+    else:
+        _snapshot = None
+        CAREER_LIBRARY = load_source(getattr(settings, 'ADVISOR_CATALOG_SOURCE', None) or DEFAULT_CATALOG_SOURCE)
+    build_indexes()
+
+
+def build_indexes() -> None:
+    global CATALOG, _vector_engine, _retrieval_index
+    synonyms_path = getattr(settings, 'ADVISOR_SKILL_SYNONYMS', None)
+    CATALOG = CompiledCatalog(
+        CAREER_LIBRARY,
+        _snapshot.version if _snapshot else None,
+        synonyms=load_synonyms(synonyms_path) if synonyms_path else None,
+        fuzzy_threshold=getattr(settings, 'ADVISOR_FUZZY_MATCH_THRESHOLD', None),
+        columns=_snapshot.columns() if _snapshot else None,
     )
-    variance = (len(matched_skills) * 1.7) + (len(matched_interests) * 1.1)
-    match_score = max(28, min(98, int((weighted_score * 100) + variance)))
+    _vector_engine = None
+    _retrieval_index = None
+
 
+def catalog_version() -> str:
+    # A retrieval shortlist narrows the ranking, so cached results depend on it as well.
+    if getattr(settings, 'ADVISOR_RETRIEVAL_MODE', 'off') == 'tfidf':
+        return f'{CATALOG.version}-tfidf{settings.ADVISOR_RETRIEVAL_SHORTLIST}'
+    return CATALOG.version
+
+
+def normalize_profile(profile: UserProfile, catalog: Optional[CompiledCatalog] = None) -> NormalizedProfile:
+    return NormalizedProfile(profile, catalog or CATALOG)
+
+
+def _index_terms(careers: Sequence[CompiledCareer], attribute: str) -> Dict[int, Tuple[int, ...]]:
+    postings: Dict[int, List[int]] = {}
+    for career in careers:
+        # One entry per distinct raw value so summed postings equal the matched-set sizes
+        # computed by _score_career.
+        for _, term in getattr(career, attribute):
+            postings.setdefault(term, []).append(career.position)
+    return {term: tuple(positions) for term, positions in postings.items()}
+
+
+def _postings_by_id(postings: Postings, intern) -> Dict[int, Tuple[int, ...]]:
+    """Snapshot postings keyed by interned id, one entry per match like ``_index_terms``."""
+    indptr, indices, counts = postings.indptr, postings.indices, postings.data
     return {
-        'id': career.slug,
-        'title': career.title,
-        'description': career.description,
-        'requiredSkills': list(career.required_skills),
-        'interests': list(career.interests),
-        'educationLevel': list(career.education_levels),
-        'averageSalary': career.average_salary,
-        'growthRate': career.growth_rate,
+        intern(term): tuple(
+            position for index in range(indptr[column], indptr[column + 1]) for position in (indices[index],) * counts[index]
+        )
+        for column, term in enumerate(postings.vocabulary)
+    }
+
+
+def _index_title_keywords(careers: Sequence[CompiledCareer]) -> Dict[int, Tuple[int, ...]]:
+    postings: Dict[int, List[int]] = {}
+    for career in careers:
+        for keyword in career.title_keyword_ids:
+            postings.setdefault(keyword, []).append(career.position)
+    return {keyword: tuple(positions) for keyword, positions in postings.items()}
+
+
+def _resolve_terms(terms: Sequence[str], resolver: TermResolver) -> FrozenSet[int]:
+    resolved = (resolver.resolve(term) for term in terms)
+    return frozenset(term for term in resolved if term is not None)
+
+
+def _role_keyword_ids(current_role: str | None, catalog: CompiledCatalog) -> FrozenSet[int]:
+    if not current_role:
+        return frozenset()
+    current = current_role.lower()
+    # A title keyword matches when it occurs in the role, i.e. when it is one of the role's
+    # substrings; probing those is bounded by the role length, not the keyword vocabulary.
+    longest = catalog.title_keyword_length
+    substrings = {''} | {
+        current[start:end]
+        for start in range(len(current))
+        for end in range(start + 1, min(len(current), start + longest) + 1)
+    }
+    return frozenset(catalog.title_keywords[keyword] for keyword in substrings if keyword in catalog.title_keywords)
+
+
+def get_retrieval_index() -> Optional[TfidfIndex]:
+    global _retrieval_index
+    if getattr(settings, 'ADVISOR_RETRIEVAL_MODE', 'off') != 'tfidf':
+        return None
+    if _retrieval_index is None:
+        directory = getattr(settings, 'ADVISOR_RETRIEVAL_INDEX_DIR', None)
+        _retrieval_index = load_or_build(CAREER_LIBRARY, CATALOG.version, directory)
+    return _retrieval_index
+
+
+def get_vector_engine() -> Optional[engine.VectorEngine]:
+    global _vector_engine
+    if getattr(settings, 'ADVISOR_SCORING_ENGINE', 'python') != 'numpy' or engine.np is None:
+        return None
+    if _vector_engine is None:
+        if _snapshot is not None:
+            _vector_engine = engine.VectorEngine(_snapshot.columns(), EXPERIENCE_BUCKETS)
+        else:
+            _vector_engine = engine.VectorEngine.from_careers(CAREER_LIBRARY, EXPERIENCE_BUCKETS)
+    return _vector_engine
+
+
+@timed_scoring
+def generate_recommendations(profile: UserProfile, limit: int = 3, offset: int = 0) -> List[Dict[str, object]]:
+    catalog = CATALOG
+    normalized = normalize_profile(profile, catalog)
+
+    vector_engine = get_vector_engine()
+    if vector_engine is not None:
+        scores = vector_engine.score(*_engine_query(normalized))
+        positions = vector_engine.top(scores, offset + limit)[offset:]
+    else:
+        candidates = _retrieval_candidates(profile, normalized, offset + limit, catalog)
+        positions = _top_positions(normalized, offset + limit, catalog, candidates)[offset:]
+
+    return [_score_career(normalized, catalog.careers[position]) for position in positions]
+
+
+def iter_recommendations(profile: UserProfile, limit: Optional[int] = None) -> Iterator[Dict[str, object]]:
+    """Yield recommendations in rank order, building each result only when it is consumed."""
+    catalog = CATALOG
+    normalized = normalize_profile(profile, catalog)
+
+    vector_engine = get_vector_engine()
+    if vector_engine is not None:
+        ranked = iter(vector_engine.ranking(vector_engine.score(*_engine_query(normalized))))
+    else:
+        heap = [(-score, position) for position, score in _catalog_scores(normalized, catalog)]
+        heapq.heapify(heap)
+        ranked = (heapq.heappop(heap)[1] for _ in range(len(heap)))
+
+    for position in itertools.islice(ranked, limit):
+        yield _score_career(normalized, catalog.careers[position])
+
+
+def generate_batch_recommendations(profiles: Sequence[UserProfile], limit: int = 3) -> List[List[Dict[str, object]]]:
+    vector_engine = get_vector_engine()
+    if vector_engine is None:
+        return [generate_recommendations(profile, limit=limit) for profile in profiles]
+
+    catalog = CATALOG
+    normalized_profiles = [normalize_profile(profile, catalog) for profile in profiles]
+    ranked = vector_engine.rank_many([_engine_query(normalized) for normalized in normalized_profiles], limit)
+    return [
+        [_score_career(normalized, catalog.careers[position]) for position in positions]
+        for normalized, positions in zip(normalized_profiles, ranked)
+    ]
+
+
+def _engine_query(normalized: NormalizedProfile) -> Tuple:
+    return (
+        normalized.skills,
+        normalized.interests,
+        normalized.education_level,
+        normalized.years_experience,
+        normalized.current_role,
+    )
+
+
+def _retrieval_candidates(
+    profile: UserProfile,
+    normalized: NormalizedProfile,
+    depth: int,
+    catalog: CompiledCatalog,
+) -> Optional[Set[int]]:
+    """TF-IDF shortlist plus every career with skill or interest overlap, or None to scan all."""
+    index = get_retrieval_index()
+    if index is None:
+        return None
+    query = [*profile.skills, *profile.interests, profile.current_role or '']
+    candidates = set(index.shortlist(query, settings.ADVISOR_RETRIEVAL_SHORTLIST))
+    for term in normalized.skill_ids:
+        candidates.update(catalog.skill_postings[term])
+    for term in normalized.interest_ids:
+        candidates.update(catalog.interest_postings[term])
+    return candidates if len(candidates) >= depth else None
+
+
+def _top_positions(
+    normalized: NormalizedProfile,
+    limit: int,
+    catalog: CompiledCatalog,
+    candidates: Optional[Set[int]] = None,
+) -> List[int]:
+    """The ``limit`` best positions, ties broken by catalog order.
+
+    Without a candidate set, only careers in the postings of the profile's skills, interests
+    and role keywords are scored; they are merged with the precomputed baseline ranking of
+    the careers that match nothing, so the work grows with the matches, not the catalog.
+    """
+    if candidates is not None:
+        scores = ((-score, position) for position, score in _catalog_scores(normalized, catalog, candidates))
+        return [position for _, position in heapq.nsmallest(limit, scores)]
+
+    skill_matches = _match_counts(catalog.skill_postings, normalized.skill_ids)
+    interest_matches = _match_counts(catalog.interest_postings, normalized.interest_ids)
+    matched = set(skill_matches) | set(interest_matches)
+    for keyword in normalized.role_keyword_ids:
+        matched.update(catalog.title_postings.get(keyword, ()))
+    careers = catalog.careers
+    best_matched = heapq.nsmallest(limit, (
+        (-_match_score(normalized, careers[position], skill_matches[position], interest_matches[position]), position)
+        for position in matched
+    ))
+    best_unmatched = []
+    if limit:
+        for entry in catalog.baseline(normalized.education_id, normalized.experience_years):
+            if entry[1] not in matched:
+                best_unmatched.append(entry)
+                if len(best_unmatched) == limit:
+                    break
+    return [position for _, position in itertools.islice(heapq.merge(best_matched, best_unmatched), limit)]
+
+
+def _catalog_scores(
+    normalized: NormalizedProfile,
+    catalog: CompiledCatalog,
+    positions: Optional[Iterable[int]] = None,
+) -> Iterator[Tuple[int, int]]:
+    # Careers missing from both postings maps have no skill or interest overlap, so only the
+    # profile-wide components apply to them.
+    skill_matches = _match_counts(catalog.skill_postings, normalized.skill_ids)
+    interest_matches = _match_counts(catalog.interest_postings, normalized.interest_ids)
+    careers = catalog.careers if positions is None else (catalog.careers[position] for position in positions)
+    for career in careers:
+        position = career.position
+        yield position, _match_score(normalized, career, skill_matches[position], interest_matches[position])
+
+
+def _match_counts(postings: Dict[int, Tuple[int, ...]], term_ids: FrozenSet[int]) -> Counter:
+    counts: Counter = Counter()
+    for term in term_ids:
+        counts.update(postings.get(term, ()))
+    return counts
+
+
+def _score_career(normalized: NormalizedProfile, career: CompiledCareer) -> Dict[str, object]:
+    matched_skills = sorted(value for value, term in career.skill_terms if term in normalized.skill_ids)
+    matched_interests = sorted(value for value, term in career.interest_terms if term in normalized.interest_ids)
+    match_score = _match_score(normalized, career, len(matched_skills), len(matched_interests))
+
+    return {
+        **career.static_fields,
         'matchScore': match_score,
         'matchedSkills': matched_skills,
         'matchedInterests': matched_interests,
     }
 
 
+# The profile and career fields _match_score reads, for scoring careers that match nothing.
+_Unmatched = namedtuple('_Unmatched', 'education_id experience_years role_keyword_ids')
+_UnmatchedCareer = namedtuple(
+    '_UnmatchedCareer',
+    'position skill_total interest_total education_ids min_experience demand_score title_keyword_ids',
+)
+
+
+def _match_score(normalized: NormalizedProfile, career: CompiledCareer, skill_matches: int, interest_matches: int) -> int:
+    skill_score = _safe_ratio(skill_matches, career.skill_total)
+    interest_score = _safe_ratio(interest_matches, career.interest_total)
+    education_score = _education_alignment(normalized.education_id, career.education_ids)
+    experience_score = _experience_alignment(normalized.experience_years, career.min_experience)
+    role_bonus = _role_alignment(normalized.role_keyword_ids, career.title_keyword_ids)
+
+    weighted_score = (
+        (skill_score * 0.5)
+        + (interest_score * 0.2)
+        + (education_score * 0.1)
+        + (experience_score * 0.1)
+        + (career.demand_score * 0.1)
+        + role_bonus
+    )
+    variance = (skill_matches * 1.7) + (interest_matches * 1.1)
+    return max(28, min(98, int((weighted_score * 100) + variance)))
+
+
 def _safe_ratio(numerator: int, denominator: int) -> float:
     if denominator == 0:
         return 0.0
     return numerator / denominator
 
 
-def _education_alignment(user_level: str, accepted_levels: Sequence[str]) -> float:
+def _education_alignment(user_level: int | None, accepted_levels: FrozenSet[int]) -> float:
     if not accepted_levels:
         return 1.0
-    if not user_level:
+    if user_level is None:
         return 0.4
     return 1.0 if user_level in accepted_levels else 0.6
 
 
-def _experience_alignment(user_years: str, required_years: int) -> float:
-    user_value = EXPERIENCE_BUCKETS.get(user_years, 2)
+def _experience_alignment(user_value: int, required_years: int) -> float:
     if required_years <= 0:
         return 1.0
     if user_value >= required_years:
@@ -741,10 +659,8 @@ def _experience_alignment(user_years: str, required_years: int) -> float:
     return max(0.3, 1 - (gap / 10))
 
 
-def _role_alignment(current_role: str | None, career_title: str) -> float:
-    if not current_role:
-        return 0.0
-    current = current_role.lower()
-    keywords = {career_title.lower(), *career_title.lower().split()}
-    return 0.05 if any(keyword in current for keyword in keywords) else 0.0
+def _role_alignment(role_keyword_ids: FrozenSet[int], title_keyword_ids: FrozenSet[int]) -> float:
+    return 0.0 if role_keyword_ids.isdisjoint(title_keyword_ids) else 0.05
+
 
+load_catalog()
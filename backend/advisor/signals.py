@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import get_token_cache
+from .models import RecommendationSnapshot, UserProfile
+from .snapshots import schedule_refresh
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token_owner(sender, instance, **kwargs):
+    get_token_cache().invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sync_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # Every account gets its profile up front so authenticated reads never create one.
+        instance.profile = UserProfile.objects.create(user=instance)
+    else:
+        get_token_cache().invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_recommendations(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        # Readers recompute on a miss, so they never see the ranking of the old profile.
+        RecommendationSnapshot.objects.filter(user_id=instance.user_id).delete()
+    schedule_refresh(instance)
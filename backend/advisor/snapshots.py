@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.db.models import F
+from django.dispatch import receiver
+
+from . import services
+from .cache import LocalLRUBackend, get_recommendation_cache
+from .models import RecommendationSnapshot, UserProfile
+
+_executor: Optional[ThreadPoolExecutor] = None
+_components: Optional[LocalLRUBackend] = None
+
+
+def snapshot_depth() -> int:
+    return getattr(settings, 'ADVISOR_RECOMMENDATION_SNAPSHOTS', {}).get('DEPTH', 100)
+
+
+def refresh_snapshot(profile: UserProfile) -> RecommendationSnapshot:
+    """Recompute ``profile``'s ranking against the current catalog and store it.
+
+    The snapshot is only stored while the saved profile still has ``profile.updated_at``, so
+    a slow refresh never overwrites the snapshot of a newer save; it is returned unsaved.
+    """
+    if _get_components().get(profile.user_id) is not None:
+        # The user has been previewing edits, so only the edited components are rescored.
+        recommendations = rescore(profile, limit=snapshot_depth())
+    else:
+        recommendations = get_recommendation_cache().get_recommendations(profile, limit=snapshot_depth())
+    return _store(profile, recommendations)
+
+
+def _store(profile: UserProfile, recommendations: List[Dict[str, object]]) -> RecommendationSnapshot:
+    fields = _snapshot_fields(profile, recommendations)
+    with transaction.atomic():
+        # Locking the profile row makes a concurrent save wait, and then delete this snapshot.
+        unchanged = (
+            UserProfile.objects.select_for_update().filter(pk=profile.pk, updated_at=profile.updated_at).exists()
+        )
+        if not unchanged:
+            return RecommendationSnapshot(user_id=profile.user_id, **fields)
+        snapshot, _ = RecommendationSnapshot.objects.update_or_create(user_id=profile.user_id, defaults=fields)
+    return snapshot
+
+
+def current_snapshot(user_id: int, profile: UserProfile) -> RecommendationSnapshot:
+    """The user's snapshot, recomputed first when missing, scored against another catalog or
+    against an older version of the profile.
+
+    ``profile`` may be lazy: it is only evaluated when the snapshot has to be rebuilt.
+    """
+    snapshot = _with_profile_version(user_id).first()
+    if not is_current(snapshot, snapshot and snapshot.current_profile_updated_at):
+        snapshot = refresh_snapshot(profile)
+    return snapshot
+
+
+def is_current(snapshot: Optional[RecommendationSnapshot], profile_updated_at) -> bool:
+    return (
+        snapshot is not None
+        and snapshot.catalog_version == services.catalog_version()
+        and snapshot.profile_updated_at is not None
+        and snapshot.profile_updated_at == profile_updated_at
+    )
+
+
+def _with_profile_version(user_id: int):
+    # The profile's updated_at comes from the same query, so a read stays one round trip.
+    return RecommendationSnapshot.objects.filter(user_id=user_id).annotate(
+        current_profile_updated_at=F('user__profile__updated_at')
+    )
+
+
+async def arefresh_snapshot(profile: UserProfile) -> RecommendationSnapshot:
+    recommendations = await ascore(profile, limit=snapshot_depth())
+    return await sync_to_async(_store)(profile, recommendations)
+
+
+async def acurrent_snapshot(user_id: int, load_profile: Callable[[], Awaitable[UserProfile]]) -> RecommendationSnapshot:
+    """Async ``current_snapshot``; ``load_profile`` is awaited only when the snapshot is rebuilt."""
+    snapshot = await _with_profile_version(user_id).afirst()
+    if not is_current(snapshot, snapshot and snapshot.current_profile_updated_at):
+        snapshot = await arefresh_snapshot(await load_profile())
+    return snapshot
+
+
+async def ascore(profile: UserProfile, limit: int, offset: int = 0) -> List[Dict[str, object]]:
+    """Rank through the recommendation cache on a worker thread, keeping scoring off the event loop."""
+    return await sync_to_async(get_recommendation_cache().get_recommendations, thread_sensitive=False)(
+        profile, limit=limit, offset=offset
+    )
+
+
+def rescore(profile: UserProfile, limit: int, offset: int = 0) -> List[Dict[str, object]]:
+    """Rank ``profile``, which may hold unsaved edits, from its user's cached score components.
+
+    Only the components whose inputs differ from the user's previous call are recomputed.
+    A retrieval shortlist depends on the whole profile, so that mode always scores afresh.
+    """
+    if getattr(settings, 'ADVISOR_RETRIEVAL_MODE', 'off') == 'tfidf':
+        return services.generate_recommendations(profile, limit=limit, offset=offset)
+    catalog = services.CATALOG
+    normalized = services.normalize_profile(profile, catalog)
+    components = _get_components().get(profile.user_id)
+    if components is None or components.catalog is not catalog:
+        components = services.ScoreComponents(normalized, catalog)
+    else:
+        components, _ = components.updated(normalized)
+    _get_components().set(profile.user_id, components)
+    return components.recommendations(limit, offset)
+
+
+def _get_components() -> LocalLRUBackend:
+    global _components
+    if _components is None:
+        _components = LocalLRUBackend()
+    # One user's components grow with the catalog, so the entry limit follows its size.
+    config = getattr(settings, 'ADVISOR_RECOMMENDATION_SNAPSHOTS', {})
+    per_user = max(len(services.CATALOG.careers), 1) * services.ScoreComponents.BYTES_PER_CAREER
+    _components.max_entries = max(config.get('COMPONENT_CACHE_BYTES', 64 * 2**20) // per_user, 1)
+    return _components
+
+
+def _snapshot_fields(profile: UserProfile, recommendations: List[Dict[str, object]]) -> Dict[str, object]:
+    return {
+        'catalog_version': services.catalog_version(),
+        'profile_updated_at': profile.updated_at,
+        'recommendations': recommendations,
+    }
+
+
+def schedule_refresh(profile: UserProfile) -> None:
+    """Queue a snapshot rebuild for once the current transaction commits.
+
+    By default the rebuild runs on the worker's snapshot thread, after the response; 'inline'
+    runs it in the committing thread instead (scripts, tests).
+    """
+    config = getattr(settings, 'ADVISOR_RECOMMENDATION_SNAPSHOTS', {})
+    if config.get('REFRESH', 'background') == 'inline':
+        transaction.on_commit(lambda: refresh_snapshot(profile))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_refresh_in_background, profile.pk))
+
+
+def _refresh_in_background(profile_id: int) -> None:
+    try:
+        profile = UserProfile.objects.filter(pk=profile_id).first()
+        if profile is not None:
+            refresh_snapshot(profile)
+    finally:
+        connections.close_all()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='advisor-snapshots')
+    return _executor
+
+
+@receiver(setting_changed)
+def _reset_executor(sender, setting, **kwargs):
+    global _executor, _components
+    if setting == 'ADVISOR_RECOMMENDATION_SNAPSHOTS':
+        _components = None
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
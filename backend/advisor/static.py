@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import AsyncIterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings as django_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that also runs natively in an async middleware chain.
+
+    WhiteNoise's middleware is sync-only, which makes Django run the whole chain of an ASGI
+    request on a thread and block that thread around the async view. Here non-static
+    requests pass straight through on the event loop; static files are opened on a worker
+    thread and streamed from an async iterator.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=django_settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        response = await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        if response.file_to_stream is not None:
+            response.streaming_content = _read_chunks(response.file_to_stream, response.block_size)
+        return response
+
+
+async def _read_chunks(file, block_size: int) -> AsyncIterator[bytes]:
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await read(block_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        file.close()
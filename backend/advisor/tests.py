@@ -1,9 +1,68 @@
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from unittest import addModuleCleanup, mock, skipIf
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, LiveServerTestCase, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
+from . import benchmarks, engine, loadtest, metrics, preload, profiling, services, snapshots
+from .async_views import AsyncProfileView, AsyncRecommendationsView, AsyncSessionView
+from .authentication import TokenCache, get_token_cache
+from .cache import DjangoCacheBackend, LocalLRUBackend, RecommendationCache, get_recommendation_cache, profile_cache_key
+from .catalog import CatalogSnapshot, SnapshotCareers, build_columns, catalog_hash, load_source, write_snapshot
+from .matching import TermResolver
+from .models import RecommendationSnapshot, UserProfile
+from .profiling import ProfilingMiddleware
+from .renderers import CareerJSONRenderer
+from .retrieval import TfidfIndex, load_or_build, tokenize
+from .snapshots import refresh_snapshot
+from .static import StaticFilesMiddleware
+
+
+def setUpModule():
+    # Token revocation stamps go to the file-based 'advisor-shared' cache; keep them out of
+    # the source tree.
+    directory = tempfile.mkdtemp(prefix='advisor-shared-')
+    addModuleCleanup(shutil.rmtree, directory, ignore_errors=True)
+    shared = {**settings.CACHES['advisor-shared'], 'LOCATION': directory}
+    override = override_settings(CACHES={**settings.CACHES, 'advisor-shared': shared})
+    override.enable()
+    addModuleCleanup(override.disable)
+
+
+def update_profile(user, **fields):
+    profile = user.profile
+    for name, value in fields.items():
+        setattr(profile, name, value)
+    profile.save()
+    return profile
+
 
 class HealthEndpointTests(APITestCase):
     def test_health_endpoint_returns_ok(self):
@@ -109,3 +168,1425 @@ class ProfileAndRecommendationsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('recommendations', response.data)
         self.assertGreater(len(response.data['recommendations']), 0)
+
+    def test_recommendations_paging_parameters(self):
+        first_page = self.client.get(reverse('advisor-recommendations'), {'k': 5}, **self.auth_headers())
+        second_page = self.client.get(reverse('advisor-recommendations'), {'k': 5, 'offset': 5}, **self.auth_headers())
+        self.assertEqual(len(first_page.data['recommendations']), 5)
+        self.assertEqual(len(second_page.data['recommendations']), 5)
+        self.assertFalse(
+            {item['id'] for item in first_page.data['recommendations']}
+            & {item['id'] for item in second_page.data['recommendations']}
+        )
+
+        invalid = self.client.get(reverse('advisor-recommendations'), {'k': 'all'}, **self.auth_headers())
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        metrics.get_registry()._reset()
+        get_recommendation_cache().clear()
+        self.user = get_user_model().objects.create_user(username='metrics@example.com', email='metrics@example.com', password='testpass123')
+        update_profile(self.user, skills=['python'], interests=['data'])
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+
+    def scrape(self, **headers):
+        response = self.client.get(reverse('advisor-metrics'), **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_records_latency_queries_size_and_scoring_per_view(self):
+        with override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'DEPTH': 0}):
+            self.client.get(reverse('advisor-recommendations'), **self.headers)
+        self.client.get(reverse('advisor-profile'), **self.headers)
+        body = self.scrape()
+
+        view = 'view="advisor-recommendations"'
+        self.assertIn(f'advisor_http_request_duration_seconds_count{{{view},method="GET",status="200"}} 1', body)
+        self.assertIn(f'advisor_http_request_duration_seconds_bucket{{{view},method="GET",status="200",le="+Inf"}} 1', body)
+        self.assertIn(f'advisor_db_queries_per_request_count{{{view}}} 1', body)
+        self.assertIn(f'advisor_http_response_size_bytes_count{{{view}}} 1', body)
+        self.assertIn(f'advisor_scoring_seconds_total{{{view}}}', body)
+        self.assertIn('advisor_scoring_duration_seconds_count{function="generate_recommendations"} 1', body)
+        self.assertIn('advisor_db_queries_per_request_count{view="advisor-profile"} 1', body)
+        self.assertNotIn('advisor_scoring_seconds_total{view="advisor-profile"}', body)
+
+    def test_exports_cache_statistics(self):
+        get_token_cache().clear()
+        with override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'DEPTH': 0}):
+            for _ in range(2):
+                self.client.get(reverse('advisor-recommendations'), **self.headers)
+        body = self.scrape()
+        token = get_token_cache().stats()
+        self.assertIn('# TYPE advisor_cache_entries gauge', body)
+        self.assertIn(f'advisor_cache_hits_total{{cache="token"}} {token["hits"]}', body)
+        self.assertIn(f'advisor_cache_misses_total{{cache="token"}} {token["misses"]}', body)
+        self.assertIn('advisor_cache_invalidations_total{cache="token"} 0', body)
+        self.assertIn(f'advisor_cache_entries{{cache="token"}} {token["size"]}', body)
+        self.assertIn('advisor_cache_hits_total{cache="recommendations"} 1', body)
+        self.assertIn('advisor_cache_misses_total{cache="recommendations"} 1', body)
+        self.assertIn('advisor_cache_entries{cache="recommendations"} 1', body)
+
+    def test_unknown_methods_share_one_label(self):
+        for method in ('BOGUS0', 'BOGUS1'):
+            self.client.generic(method, reverse('advisor-health'))
+        body = self.scrape()
+        self.assertNotIn('BOGUS', body)
+        self.assertIn('advisor_http_request_duration_seconds_count{view="advisor-health",method="other",status="405"} 2', body)
+
+    def test_scrape_sums_values_published_by_other_workers(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(ADVISOR_METRICS={'DIR': str(directory), 'FLUSH_INTERVAL': 0}):
+            self.client.get(reverse('advisor-health'))
+            self.assertTrue((directory / f'metrics-{os.getpid()}.json').exists())
+            labels = [['view', 'advisor-health'], ['method', 'GET'], ['status', '200']]
+            histogram = [0.0] * (len(metrics.LATENCY_BUCKETS) + 1) + [0.5, 2.0]
+            (directory / 'metrics-1.json').write_text(json.dumps([['advisor_http_request_duration_seconds', labels, histogram]]))
+            body = self.scrape()
+        self.assertIn('advisor_http_request_duration_seconds_count{view="advisor-health",method="GET",status="200"} 3', body)
+
+    def test_exited_workers_stay_in_the_totals(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        labels = [['view', 'advisor-health']]
+        for pid, queries in ((1, 2.0), (2, 3.0)):
+            (directory / f'metrics-{pid}.json').write_text(json.dumps([
+                ['advisor_db_query_seconds_total', labels, [queries]],
+                ['advisor_cache_entries', [['cache', 'token']], [queries]],
+            ]))
+        metrics.retire_worker(str(directory), 1)
+        metrics.retire_worker(str(directory), 2)
+        metrics.retire_worker(str(directory), 3)
+        self.assertEqual(sorted(path.name for path in directory.iterdir()), ['metrics-exited.json'])
+        self.assertNotIn('advisor_cache_entries', (directory / 'metrics-exited.json').read_text())
+        with override_settings(ADVISOR_METRICS={'DIR': str(directory)}):
+            self.assertIn('advisor_db_query_seconds_total{view="advisor-health"} 5', self.scrape())
+
+    @override_settings(ADVISOR_METRICS={'TOKEN': 'scrape-secret'})
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get(reverse('advisor-metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('# TYPE advisor_http_request_duration_seconds histogram', self.scrape(HTTP_AUTHORIZATION='Bearer scrape-secret'))
+
+
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        get_recommendation_cache().clear()
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(ADVISOR_PROFILING={'TRACE_DIR': str(directory), 'SAMPLE_INTERVAL': 0.001, 'MAX_TRACES': 2})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.directory = directory
+
+    def login(self, is_staff):
+        email = f'{"staff" if is_staff else "member"}@example.com'
+        user = get_user_model().objects.create_user(username=email, email=email, password='testpass123', is_staff=is_staff)
+        update_profile(user, skills=['python'], interests=['data'])
+        return {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=user).key}'}
+
+    def test_staff_header_returns_server_timing_and_trace(self):
+        headers = self.login(is_staff=True)
+        original = services._top_positions
+        with override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'DEPTH': 0}):
+            response = self.client.get(reverse('advisor-recommendations'), HTTP_X_ADVISOR_PROFILE='1', **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertIn('normalize;dur=', timing)
+        self.assertIn('ranking;dur=', timing)
+        self.assertIn('result-dicts;dur=', timing)
+        self.assertIn('total;dur=', timing)
+        self.assertNotIn('education;dur=', timing)
+        self.assertIs(services._top_positions, original)
+
+        trace = json.loads(self.client.get(response['X-Advisor-Trace'], **headers).content)
+        self.assertEqual(trace['view'], 'advisor-recommendations')
+        self.assertEqual(trace['stages']['result-dicts']['calls'], 3)
+        self.assertIn('stacks', trace['samples'])
+        folded = self.client.get(response['X-Advisor-Trace'], {'output': 'folded'}, **headers)
+        self.assertTrue(folded['Content-Disposition'].endswith('.folded"'))
+
+    def test_header_is_ignored_for_non_staff_and_traces_are_staff_only(self):
+        headers = self.login(is_staff=False)
+        response = self.client.get(reverse('advisor-profile'), HTTP_X_ADVISOR_PROFILE='1', **headers)
+        self.assertNotIn('Server-Timing', response)
+        trace_url = reverse('advisor-profiling-trace', args=['0' * 32])
+        self.assertEqual(self.client.get(trace_url, **headers).status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_async_requests_without_the_header_stay_on_the_event_loop(self):
+        async def view(request):
+            return HttpResponse('view')
+
+        middleware = ProfilingMiddleware(view)
+        with mock.patch.object(profiling, 'sync_to_async', side_effect=AssertionError('thread switch')):
+            response = await middleware(AsyncRequestFactory().get('/api/health/'))
+        self.assertEqual(response.content, b'view')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_keeps_only_the_newest_traces(self):
+        headers = self.login(is_staff=True)
+        for _ in range(3):
+            self.client.get(reverse('advisor-health'), HTTP_X_ADVISOR_PROFILE='1', **headers)
+        self.assertEqual(len(list(self.directory.glob('*.json'))), 2)
+
+
+class ProfilePatchTests(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(username='patch@example.com', email='patch@example.com', password='testpass123')
+        self.profile = update_profile(self.user, skills=['python', 'sql'], interests=['data'], education_level='bachelors')
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+
+    def patch(self, payload):
+        return self.client.patch(reverse('advisor-profile'), payload, format='json', **self.headers)
+
+    def test_add_and_remove_terms(self):
+        response = self.patch({'skills': {'add': ['Docker', 'PYTHON'], 'remove': ['SQL']}, 'interests': {'add': ['people']}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['changed'], ['skills', 'interests'])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.skills, ['python', 'Docker'])
+        self.assertEqual(self.profile.interests, ['data', 'people'])
+
+    def test_saves_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch({'currentRole': 'Analyst', 'educationLevel': 'bachelors'})
+        self.assertEqual(response.data['changed'], ['currentRole'])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "advisor_userprofile"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"current_role"', updates[0])
+        self.assertNotIn('"skills"', updates[0])
+
+    def test_noop_skips_the_write(self):
+        refresh_snapshot(self.profile)
+        updated_at = self.profile.updated_at
+        with self.assertNumQueries(1):
+            response = self.patch({'skills': {'add': ['Python'], 'remove': ['rust']}, 'interests': ['data']})
+        self.assertEqual(response.data['changed'], [])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.updated_at, updated_at)
+        self.assertTrue(RecommendationSnapshot.objects.filter(user=self.user).exists())
+
+    def test_rejects_malformed_payloads(self):
+        response = self.patch({'skills': {'append': ['go']}, 'interests': 'data', 'currentRole': 7})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['errors']), {'skills', 'interests', 'currentRole'})
+        post = self.client.post(reverse('advisor-profile'), {'skills': {'add': ['go']}}, format='json', **self.headers)
+        self.assertEqual(post.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecommendationsStreamTests(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='analyst@example.com', email='analyst@example.com', password='testpass123')
+        self.profile = update_profile(user, skills=['sql', 'python'], interests=['data'], education_level='bachelors')
+        self.token = Token.objects.create(user=user)
+
+    def stream(self, **extra):
+        return self.client.get(reverse('advisor-recommendations-stream'), HTTP_AUTHORIZATION=f'Token {self.token.key}', **extra)
+
+    def test_ndjson_stream_yields_full_ranking_in_order(self):
+        response = self.stream()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([line['rank'] for line in lines], list(range(1, len(services.CAREER_LIBRARY) + 1)))
+        self.assertEqual(
+            [line['id'] for line in lines],
+            [item['id'] for item in full_scan_recommendations(self.profile, limit=None)],
+        )
+
+    def test_event_stream_honours_limit(self):
+        response = self.stream(HTTP_ACCEPT='text/event-stream', data={'k': 5})
+        self.assertTrue(response['Content-Type'].startswith('text/event-stream'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('event: recommendation'), 5)
+        self.assertTrue(body.endswith('event: end\ndata: {"count": 5}\n\n'))
+
+    async def test_asgi_stream_is_an_async_iterator(self):
+        response = await self.async_client.get(
+            reverse('advisor-recommendations-stream'), {'k': 60}, headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertTrue(response.is_async)
+        lines = [json.loads(chunk) async for chunk in response.streaming_content]
+        expected = await sync_to_async(full_scan_recommendations)(self.profile, limit=60)
+        self.assertEqual([line['id'] for line in lines], [item['id'] for item in expected])
+
+    def test_stream_requires_auth(self):
+        response = self.client.get(reverse('advisor-recommendations-stream'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(username='cached@example.com', email='cached@example.com', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+
+    def session(self, token=None):
+        return self.client.get(reverse('advisor-session'), HTTP_AUTHORIZATION=f'Token {(token or self.token).key}')
+
+    def test_repeat_requests_skip_token_lookup(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        stats = get_token_cache().stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hitRate'], 0.5)
+
+    def test_logout_invalidates_cached_token(self):
+        self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        logout = self.client.post(reverse('advisor-logout'), HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(logout.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.session().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_changes_invalidate_cached_token(self):
+        self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.session().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_reaches_other_workers_through_the_shared_alias(self):
+        other_worker = TokenCache()
+        other_worker.set(self.token.key, self.user, self.token)
+        self.assertIsNotNone(other_worker.get(self.token.key))
+        get_token_cache().invalidate_user(self.user.pk)
+        self.assertIsNone(other_worker.get(self.token.key))
+
+    @override_settings(ADVISOR_TOKEN_CACHE={'ALIAS': 'default'})
+    def test_per_process_alias_disables_the_cache(self):
+        self.assertFalse(get_token_cache().enabled)
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        self.assertEqual(get_token_cache().stats()['size'], 0)
+
+    def test_entries_expire_after_ttl(self):
+        self.assertEqual(self.session().status_code, status.HTTP_200_OK)
+        with mock.patch('advisor.authentication.time.monotonic', return_value=time.monotonic() + 3600):
+            with self.assertNumQueries(1):
+                self.session()
+
+
+class QueryBudgetTests(APITestCase):
+    """Round trips per authenticated request, with a cold token cache."""
+
+    def setUp(self):
+        get_token_cache().clear()
+        get_recommendation_cache().clear()
+        user = get_user_model().objects.create_user(username='budget@example.com', email='budget@example.com', password='testpass123')
+        update_profile(user, skills=['python'], interests=['data'])
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=user).key}'}
+
+    def test_session_costs_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('advisor-session'), **self.headers)
+
+    def test_profile_read_costs_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('advisor-profile'), **self.headers)
+
+    def test_profile_update_costs_three_queries(self):
+        # Token lookup, profile update and dropping the stale recommendation snapshot.
+        with self.assertNumQueries(3):
+            self.client.post(reverse('advisor-profile'), {'skills': ['sql']}, format='json', **self.headers)
+
+    def test_recommendations_read_one_snapshot_row(self):
+        self.client.get(reverse('advisor-recommendations'), **self.headers)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('advisor-recommendations'), **self.headers)
+
+    def test_profile_is_created_at_signup(self):
+        user = get_user_model().objects.create_user(username='eager@example.com', password='testpass123')
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+
+class RecommendationSnapshotTests(APITestCase):
+    def setUp(self):
+        get_recommendation_cache().clear()
+        self.user = get_user_model().objects.create_user(username='snap@example.com', email='snap@example.com', password='testpass123')
+        self.profile = update_profile(self.user, skills=['python'], interests=['data'])
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+
+    def get_recommendations(self, **params):
+        return self.client.get(reverse('advisor-recommendations'), params, **self.headers)
+
+    def test_profile_update_queues_refresh_after_commit(self):
+        executor = mock.Mock()
+        with mock.patch('advisor.snapshots._get_executor', return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('advisor-profile'), {'skills': ['sql']}, format='json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(RecommendationSnapshot.objects.filter(user=self.user).exists())
+        executor.submit.assert_called_once_with(snapshots._refresh_in_background, self.profile.pk)
+
+    @override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'REFRESH': 'inline'})
+    def test_profile_update_refreshes_snapshot_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('advisor-profile'), {'skills': ['communication']}, format='json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        snapshot = RecommendationSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.catalog_version, services.catalog_version())
+        self.profile.refresh_from_db()
+        self.assertEqual(snapshot.recommendations[:3], full_scan_recommendations(self.profile))
+
+    def test_read_serves_snapshot_rows(self):
+        snapshot = refresh_snapshot(self.profile)
+        RecommendationSnapshot.objects.filter(pk=snapshot.pk).update(recommendations=[{'id': 'materialized'}])
+        self.assertEqual(self.get_recommendations(k=1).data['recommendations'], [{'id': 'materialized'}])
+
+    def test_snapshot_of_an_older_profile_is_recomputed_on_read(self):
+        snapshot = refresh_snapshot(self.profile)
+        RecommendationSnapshot.objects.filter(pk=snapshot.pk).update(recommendations=[{'id': 'materialized'}])
+        UserProfile.objects.filter(pk=self.profile.pk).update(
+            skills=['communication'], updated_at=self.profile.updated_at + timedelta(seconds=1)
+        )
+        self.profile.refresh_from_db()
+        self.assertEqual(self.get_recommendations().data['recommendations'], full_scan_recommendations(self.profile))
+
+    def test_refresh_of_a_superseded_profile_is_not_stored(self):
+        snapshot = refresh_snapshot(self.profile)
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+        stale.updated_at -= timedelta(seconds=1)
+        refreshed = refresh_snapshot(stale)
+        self.assertEqual(refreshed.profile_updated_at, stale.updated_at)
+        self.assertEqual(RecommendationSnapshot.objects.get(pk=snapshot.pk).profile_updated_at, self.profile.updated_at)
+
+    def test_stale_catalog_version_is_recomputed_on_read(self):
+        RecommendationSnapshot.objects.create(user=self.user, catalog_version='outdated', recommendations=[])
+        response = self.get_recommendations()
+        self.assertEqual(response.data['recommendations'], full_scan_recommendations(self.profile))
+        self.assertEqual(RecommendationSnapshot.objects.get(user=self.user).catalog_version, services.catalog_version())
+
+    @override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'DEPTH': 5})
+    def test_pages_past_snapshot_depth_are_scored_directly(self):
+        response = self.get_recommendations(k=3, offset=4)
+        self.assertEqual(response.data['recommendations'], full_scan_recommendations(self.profile, limit=7)[4:])
+        self.assertFalse(RecommendationSnapshot.objects.filter(user=self.user).exists())
+
+
+class RecomputeRecommendationsCommandTests(APITestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.profiles = []
+        for index, skills in enumerate((['python', 'sql'], ['communication'], ['design', 'research'])):
+            user = user_model.objects.create_user(username=f'bulk{index}@example.com', password='testpass123')
+            self.profiles.append(update_profile(user, skills=skills, interests=['data']))
+
+    def recompute(self, **options):
+        output = io.StringIO()
+        call_command('recompute_recommendations', stdout=output, **options)
+        return output.getvalue()
+
+    def test_rebuilds_stale_snapshots_only(self):
+        RecommendationSnapshot.objects.create(user=self.profiles[0].user, catalog_version='outdated', recommendations=[])
+        refresh_snapshot(self.profiles[1])
+
+        output = self.recompute(workers=0, chunk_size=1)
+        self.assertIn('Recomputed 2 snapshots', output)
+        for profile in self.profiles:
+            snapshot = RecommendationSnapshot.objects.get(user=profile.user)
+            self.assertEqual(snapshot.catalog_version, services.catalog_version())
+            self.assertEqual(snapshot.recommendations[:3], full_scan_recommendations(profile))
+        self.assertIn('Recomputing 0 snapshots', self.recompute(workers=0))
+
+    def test_worker_processes_match_in_process_scoring(self):
+        self.recompute(workers=1, chunk_size=2)
+        pooled = list(RecommendationSnapshot.objects.order_by('user_id').values_list('recommendations', flat=True))
+        self.recompute(workers=0, all=True)
+        inline = list(RecommendationSnapshot.objects.order_by('user_id').values_list('recommendations', flat=True))
+        self.assertEqual(len(pooled), len(self.profiles))
+        self.assertEqual(pooled, inline)
+
+
+class ImportExportProfilesCommandTests(APITestCase):
+    def import_lines(self, rows, **options):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        path = directory / 'profiles.jsonl'
+        path.write_text(''.join((row if isinstance(row, str) else json.dumps(row)) + '\n' for row in rows), encoding='utf-8')
+        output, errors = io.StringIO(), io.StringIO()
+        call_command('import_profiles', str(path), stdout=output, stderr=errors, **options)
+        return output.getvalue(), errors.getvalue()
+
+    def test_imports_accounts_profiles_and_tokens_in_batches(self):
+        get_user_model().objects.create_user(username='taken@example.com', email='taken@example.com', password='testpass123')
+        output, errors = self.import_lines(
+            [
+                {'name': 'Ada Lovelace', 'email': 'Ada@Example.com', 'password': 'engines1', 'skills': ['python'], 'currentRole': 'Analyst'},
+                {'name': 'Grace Hopper', 'email': 'grace@example.com', 'password': 'compilers'},
+                {'name': 'Taken', 'email': 'taken@example.com', 'password': 'testpass123'},
+                {'name': 'Ada Again', 'email': 'ada@example.com', 'password': 'engines1'},
+                {'name': 'Short', 'email': 'short@example.com', 'password': '123'},
+                'not json',
+            ],
+            batch_size=2,
+        )
+        self.assertIn('Imported 2 accounts and skipped 4 lines', output)
+        self.assertIn('rows/s', output)
+        self.assertEqual(len(errors.splitlines()), 4)
+
+        user = get_user_model().objects.get(username='ada@example.com')
+        self.assertEqual((user.first_name, user.last_name), ('Ada', 'Lovelace'))
+        self.assertTrue(user.check_password('engines1'))
+        self.assertEqual((user.profile.skills, user.profile.current_role), (['python'], 'Analyst'))
+        self.assertTrue(Token.objects.filter(user=user).exists())
+        response = self.client.post(reverse('advisor-login'), {'email': 'grace@example.com', 'password': 'compilers'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_parallel_hashing_matches_in_process_hashing(self):
+        events = []
+        original_submit, original_close_all = ProcessPoolExecutor.submit, connections.close_all
+
+        def submit(executor, *args, **kwargs):
+            # The pool forks its workers on the first task.
+            events.append('fork')
+            return original_submit(executor, *args, **kwargs)
+
+        def query(execute, *args):
+            events.append('query')
+            return execute(*args)
+
+        with (
+            mock.patch.object(ProcessPoolExecutor, 'submit', submit),
+            mock.patch.object(connections, 'close_all', lambda: events.append('close') or original_close_all()),
+            connection.execute_wrapper(query),
+        ):
+            self.import_lines([{'name': 'Pooled', 'email': f'pooled{index}@example.com', 'password': f'secret{index}'} for index in range(3)], hash_workers=1)
+        self.assertEqual(events[:2], ['close', 'fork'])
+        for index in range(3):
+            self.assertTrue(get_user_model().objects.get(username=f'pooled{index}@example.com').check_password(f'secret{index}'))
+
+    def test_export_round_trips_through_import(self):
+        user = get_user_model().objects.create_user(
+            username='export@example.com', email='export@example.com', password='testpass123', first_name='Ex', last_name='Port'
+        )
+        update_profile(user, skills=['sql'], interests=['data'], education_level='masters', years_experience='3')
+        output = io.StringIO()
+        call_command('export_profiles', '--with-password-hashes', stdout=output, stderr=io.StringIO())
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(
+            rows,
+            [
+                {
+                    'email': 'export@example.com',
+                    'name': 'Ex Port',
+                    'passwordHash': user.password,
+                    'skills': ['sql'],
+                    'interests': ['data'],
+                    'educationLevel': 'masters',
+                    'yearsExperience': '3',
+                    'currentRole': '',
+                }
+            ],
+        )
+
+        user.delete()
+        self.import_lines(rows)
+        imported = get_user_model().objects.get(username='export@example.com')
+        self.assertTrue(imported.check_password('testpass123'))
+        self.assertEqual((imported.profile.skills, imported.profile.education_level), (['sql'], 'masters'))
+
+
+class SerializedLiveServerHandler(LiveServerTestCase.static_handler):
+    """Serves one request at a time: the live server threads share the test database's single
+    SQLite connection, so overlapping transactions would fail with "cannot start a transaction
+    within a transaction"."""
+
+    lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            return super().__call__(environ, start_response)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    # A snapshot thread would open a second connection to the in-memory test database.
+    ADVISOR_RECOMMENDATION_SNAPSHOTS={'REFRESH': 'inline'},
+)
+class LoadTestCommandTests(LiveServerTestCase):
+    static_handler = SerializedLiveServerHandler
+
+    def test_reports_every_operation_in_the_mix(self):
+        output = io.StringIO()
+        results = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, results)
+        mix = ','.join(f'{name}=1' for name in loadtest.OPERATIONS)
+        call_command(
+            'loadtest', '--url', f'{self.live_server_url}/api', '--users', '2', '--duration', '1.5', '--mix', mix,
+            '--json', str(results / 'run.json'), stdout=output,
+        )
+        self.assertIn('2/2 clients signed up', output.getvalue())
+        endpoints = json.loads((results / 'run.json').read_text())[0]['endpoints']
+        self.assertEqual(endpoints['total']['errors'], 0)
+        self.assertLessEqual(set(endpoints) - {'total'}, set(loadtest.OPERATIONS))
+        self.assertGreater(endpoints['recommendations']['requests'], 0)
+
+    def test_serve_boots_gunicorn_with_two_workers(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        environ = {
+            'DATABASE_URL': f'sqlite:///{directory / "db.sqlite3"}',
+            'ADVISOR_SHARED_CACHE_DIR': settings.CACHES['advisor-shared']['LOCATION'],
+        }
+        with mock.patch.dict(os.environ, environ):
+            for name in ('ADVISOR_METRICS_DIR', 'WEB_CONCURRENCY'):
+                os.environ.pop(name, None)
+            subprocess.run([sys.executable, 'manage.py', 'migrate', '--no-input', '-v', '0'], cwd=settings.BASE_DIR, check=True)
+            output = io.StringIO()
+            call_command(
+                'loadtest', '--serve', 'wsgi', '--workers', '2', '--port', str(port), '--users', '2', '--duration', '1',
+                '--mix', 'health=1,recommendations=1', '--json', str(directory / 'run.json'), stdout=output,
+            )
+        self.assertIn('Healthy after', output.getvalue())
+        run = json.loads((directory / 'run.json').read_text())[0]
+        self.assertEqual((run['workers'], run['endpoints']['total']['errors']), (2, 0))
+
+    def test_rejects_unknown_operations(self):
+        with self.assertRaisesMessage(CommandError, "Unknown operation 'checkout'"):
+            call_command('loadtest', '--mix', 'recommendations=80,checkout=20')
+
+
+class PreloadTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_prepare_fork_warms_and_freezes_the_master(self):
+        self.addCleanup(gc.unfreeze)
+        self.addCleanup(gc.enable)
+        gc.disable()
+        with override_settings(ADVISOR_SCORING_ENGINE='numpy'):
+            timings = preload.prepare_fork()
+            if engine.np is not None:
+                self.assertIsNotNone(services._vector_engine)
+        self.assertEqual(set(timings), {'catalog', 'connections'})
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertTrue(gc.isenabled())
+
+    def test_after_fork_only_opens_persistent_connections(self):
+        self.addCleanup(gc.enable)
+        gc.disable()
+        with mock.patch.object(connection, 'ensure_connection') as ensure_connection:
+            preload.after_fork()
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(ensure_connection.called, connection.settings_dict['CONN_MAX_AGE'] != 0)
+
+    @skipIf(not Path('/proc/self/smaps_rollup').exists(), 'needs /proc/<pid>/smaps_rollup')
+    def test_worker_memory_reports_child_processes(self):
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        time.sleep(0.2)
+        workers = {row['pid']: row for row in loadtest.worker_memory(os.getpid())}
+        self.assertIn(child.pid, workers)
+        self.assertGreater(workers[child.pid]['rss_mib'], 0)
+        self.assertLessEqual(workers[child.pid]['uss_mib'], workers[child.pid]['rss_mib'])
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        get_recommendation_cache().clear()
+        self.user = get_user_model().objects.create_user(username='async@example.com', email='async@example.com', password='testpass123')
+        self.profile = update_profile(self.user, skills=['python', 'sql'], interests=['data'])
+        self.token = Token.objects.create(user=self.user)
+        self.factory = AsyncRequestFactory()
+
+    async def call(self, view, method='get', path='/', token=None, **kwargs):
+        headers = {'Authorization': f'Token {token or self.token.key}'} if token != '' else {}
+        request = getattr(self.factory, method)(path, headers=headers, **kwargs)
+        response = await view.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_asgi_middleware_chain_is_async(self):
+        self.assertTrue(iscoroutinefunction(ASGIHandler()._middleware_chain))
+
+    async def test_static_files_are_streamed_asynchronously(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        (directory / 'app.css').write_text('body {}')
+
+        async def view(request):
+            return HttpResponse('view')
+
+        with override_settings(STATIC_ROOT=str(directory)):
+            middleware = StaticFilesMiddleware(view)
+        response = await middleware(self.factory.get('/static/app.css'))
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'body {}')
+        self.assertEqual((await middleware(self.factory.get('/api/health/'))).content, b'view')
+
+    async def test_session_matches_sync_view(self):
+        status_code, body = await self.call(AsyncSessionView)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        sync_body = (await sync_to_async(self.client.get)(reverse('advisor-session'), HTTP_AUTHORIZATION=f'Token {self.token.key}')).json()
+        self.assertEqual(body, sync_body)
+
+    async def test_profile_update_saves_and_drops_snapshot(self):
+        await sync_to_async(refresh_snapshot)(self.profile)
+        status_code, body = await self.call(
+            AsyncProfileView, 'post', data={'skills': ['communication']}, content_type='application/json'
+        )
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(body['profile']['skills'], ['communication'])
+        profile = await UserProfile.objects.aget(user=self.user)
+        self.assertEqual(profile.skills, ['communication'])
+        self.assertFalse(await RecommendationSnapshot.objects.filter(user=self.user).aexists())
+
+    async def test_token_cache_is_used_without_blocking_calls(self):
+        with mock.patch.object(TokenCache, '_stamp', side_effect=AssertionError('blocking cache call')):
+            for _ in range(2):
+                status_code, _ = await self.call(AsyncSessionView)
+                self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(get_token_cache().stats()['hits'], 1)
+
+    async def test_recommendations_match_full_scan(self):
+        status_code, body = await self.call(AsyncRecommendationsView, data={'k': 5, 'offset': 2})
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(body['recommendations'], full_scan_recommendations(self.profile, limit=7)[2:])
+        status_code, body = await self.call(AsyncRecommendationsView, data={'k': 'all'})
+        self.assertEqual(status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_conditional_get_matches_sync_view(self):
+        sync_response = await sync_to_async(self.client.get)(reverse('advisor-recommendations'), HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        request = self.factory.get('/', headers={'Authorization': f'Token {self.token.key}', 'If-None-Match': sync_response['ETag']})
+        response = await AsyncRecommendationsView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_rejects_missing_and_invalid_tokens(self):
+        self.assertEqual((await self.call(AsyncSessionView, token=''))[0], status.HTTP_401_UNAUTHORIZED)
+        status_code, body = await self.call(AsyncSessionView, token='not-a-token')
+        self.assertEqual((status_code, body), (status.HTTP_401_UNAUTHORIZED, {'detail': 'Invalid token.'}))
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(username='poll@example.com', email='poll@example.com', password='testpass123')
+        self.profile = update_profile(self.user, skills=['python'], interests=['data'])
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+
+    def get(self, name, etag=None, **params):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse(name), params, **self.headers, **extra)
+
+    def test_unchanged_resources_return_not_modified(self):
+        for name in ('advisor-session', 'advisor-profile', 'advisor-recommendations'):
+            first = self.get(name)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            self.assertNotIn('Last-Modified', first)
+            self.assertIn('private', first['Cache-Control'])
+            repeat = self.get(name, first['ETag'])
+            self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(repeat.content, b'')
+            self.assertEqual(repeat['ETag'], first['ETag'])
+
+    def test_not_modified_skips_the_scorer(self):
+        etag = self.get('advisor-recommendations')['ETag']
+        with mock.patch.object(services, 'generate_recommendations') as scorer:
+            self.assertEqual(self.get('advisor-recommendations', etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        scorer.assert_not_called()
+
+    def test_etags_follow_profile_page_and_catalog(self):
+        etag = self.get('advisor-recommendations')['ETag']
+        self.assertNotEqual(self.get('advisor-recommendations', k=5)['ETag'], etag)
+
+        self.client.post(reverse('advisor-profile'), {'skills': ['sql']}, format='json', **self.headers)
+        changed = self.get('advisor-recommendations', etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+        with override_settings(ADVISOR_RETRIEVAL_MODE='tfidf', ADVISOR_RETRIEVAL_INDEX_DIR=''):
+            self.assertEqual(self.get('advisor-recommendations', changed['ETag']).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since_alone_never_hides_a_catalog_change(self):
+        first = self.get('advisor-recommendations')
+        since = {'HTTP_IF_MODIFIED_SINCE': 'Fri, 01 Jan 2100 00:00:00 GMT'}
+        with override_settings(ADVISOR_RETRIEVAL_MODE='tfidf', ADVISOR_RETRIEVAL_INDEX_DIR=''):
+            changed = self.client.get(reverse('advisor-recommendations'), **self.headers, **since)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(reverse('advisor-session'), **self.headers, **since).status_code, status.HTTP_200_OK)
+
+    def test_session_etag_tracks_user_fields(self):
+        etag = self.get('advisor-session')['ETag']
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.get('advisor-session', etag).status_code, status.HTTP_200_OK)
+
+
+class BatchRecommendationsTests(APITestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.staff = user_model.objects.create_user(
+            username='counselor@example.com',
+            email='counselor@example.com',
+            password='testpass123',
+            is_staff=True,
+        )
+        self.student = user_model.objects.create_user(
+            username='student@example.com',
+            email='student@example.com',
+            password='testpass123',
+        )
+        update_profile(self.student, skills=['sql', 'python'], interests=['data'])
+        self.token = Token.objects.create(user=self.staff)
+
+    def post_batch(self, payload, token=None):
+        return self.client.post(
+            reverse('advisor-recommendations-batch'),
+            payload,
+            format='json',
+            HTTP_AUTHORIZATION=f'Token {(token or self.token).key}',
+        )
+
+    def test_batch_matches_single_profile_scoring(self):
+        profiles = [
+            {'skills': ['python', 'analytics'], 'interests': ['data'], 'educationLevel': 'bachelors'},
+            {'skills': ['communication'], 'interests': ['people'], 'currentRole': 'Nurse'},
+        ]
+        response = self.post_batch({'profiles': profiles})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for position, result in enumerate(response.data['results']):
+            self.assertEqual(result['index'], position)
+            expected = services.generate_recommendations(UserProfile(**{
+                'skills': profiles[position].get('skills', []),
+                'interests': profiles[position].get('interests', []),
+                'education_level': profiles[position].get('educationLevel', ''),
+                'current_role': profiles[position].get('currentRole', ''),
+            }))
+            self.assertEqual(result['recommendations'], expected)
+
+    def test_batch_by_user_ids(self):
+        response = self.post_batch({'userIds': [self.student.id, self.staff.id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['userId'] for result in response.data['results']], [str(self.student.id), str(self.staff.id)])
+        self.assertEqual(
+            response.data['results'][0]['recommendations'],
+            services.generate_recommendations(self.student.profile),
+        )
+
+    def test_batch_rejects_malformed_profiles_with_their_index(self):
+        response = self.post_batch([{'skills': ['python']}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'error': 'Expected an object.'})
+
+        for entry, field in [
+            ({'skills': None}, 'skills'),
+            ({'skills': 'python'}, 'skills'),
+            ({'skills': [1, 2]}, 'skills'),
+            ({'interests': {'add': ['data']}}, 'interests'),
+            ({'yearsExperience': ['3']}, 'yearsExperience'),
+        ]:
+            response = self.post_batch({'profiles': [{'skills': ['python']}, entry]})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, entry)
+            self.assertEqual(response.data['index'], 1)
+            self.assertEqual(set(response.data['errors']), {field})
+
+        response = self.post_batch({'profiles': [{'skills': ['python']}, 'python']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['index'], 1)
+
+    def test_batch_rejects_unknown_user_ids(self):
+        response = self.post_batch({'userIds': [self.student.id, 999999]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_requires_staff(self):
+        response = self.post_batch({'profiles': []}, token=Token.objects.create(user=self.student))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RecommendationCacheTests(APITestCase):
+    def setUp(self):
+        get_recommendation_cache().clear()
+        user_model = get_user_model()
+        self.tokens = []
+        for email in ('first@example.com', 'second@example.com'):
+            user = user_model.objects.create_user(username=email, email=email, password='testpass123')
+            update_profile(user, skills=['SQL', 'python'], interests=['data'], education_level='bachelors')
+            self.tokens.append(Token.objects.create(user=user))
+
+    def get_recommendations(self, token):
+        return self.client.get(reverse('advisor-recommendations'), HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_identical_profiles_share_an_entry(self):
+        first = self.get_recommendations(self.tokens[0])
+        second = self.get_recommendations(self.tokens[1])
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(get_recommendation_cache().stats()['misses'], 1)
+        self.assertEqual(get_recommendation_cache().stats()['hits'], 1)
+
+    def test_profile_save_invalidates_entry(self):
+        self.get_recommendations(self.tokens[0])
+        profile = UserProfile.objects.get(user=self.tokens[0].user)
+        self.assertIsNotNone(get_recommendation_cache().backend.get(profile_cache_key(profile)))
+
+        self.client.post(
+            reverse('advisor-profile'),
+            {'skills': ['nursing']},
+            format='json',
+            HTTP_AUTHORIZATION=f'Token {self.tokens[0].key}',
+        )
+        self.assertIsNone(get_recommendation_cache().backend.get(profile_cache_key(profile)))
+        response = self.get_recommendations(self.tokens[0])
+        profile.refresh_from_db()
+        self.assertEqual(response.data['recommendations'], services.generate_recommendations(profile))
+
+    def test_key_ignores_case_and_order(self):
+        first = UserProfile(skills=['Python', 'SQL'], interests=['Data'])
+        second = UserProfile(skills=['sql', 'python', 'python'], interests=['data'])
+        self.assertEqual(profile_cache_key(first), profile_cache_key(second))
+
+    def test_local_backend_evicts_least_recently_used(self):
+        cache = RecommendationCache(LocalLRUBackend(max_entries=2))
+        profiles = [UserProfile(skills=[skill]) for skill in ('sql', 'python', 'excel')]
+        cache.get_recommendations(profiles[0])
+        cache.get_recommendations(profiles[1])
+        cache.get_recommendations(profiles[0])
+        cache.get_recommendations(profiles[2])
+        self.assertIsNone(cache.backend.get(profile_cache_key(profiles[1])))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'size': 2, 'evictions': 1})
+
+    def test_deeper_pages_recompute_and_shallower_pages_hit(self):
+        cache = RecommendationCache(LocalLRUBackend())
+        profile = UserProfile(skills=['sql'])
+        self.assertEqual(cache.get_recommendations(profile, limit=3), services.generate_recommendations(profile))
+        self.assertEqual(
+            cache.get_recommendations(profile, limit=5, offset=2),
+            services.generate_recommendations(profile, limit=5, offset=2),
+        )
+        self.assertEqual(cache.get_recommendations(profile, limit=2, offset=1), services.generate_recommendations(profile, limit=2, offset=1))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_django_backend_clear_keeps_other_keys_in_the_alias(self):
+        backend = DjangoCacheBackend('default')
+        caches['default'].set('unrelated', 'kept')
+        self.addCleanup(caches['default'].delete, 'unrelated')
+        backend.set('entry', (3, []))
+        self.assertEqual(backend.get('entry'), (3, []))
+        backend.clear()
+        self.assertIsNone(backend.get('entry'))
+        self.assertEqual(caches['default'].get('unrelated'), 'kept')
+
+
+class CareerJSONRendererTests(SimpleTestCase):
+    def render_both(self, data):
+        return JSONRenderer().render(data), CareerJSONRenderer().render(data)
+
+    def test_matches_json_renderer_bytes(self):
+        profile = UserProfile(skills=['python', 'SQL', 'communication'], interests=['data'], current_role='Analyst')
+        recommendations = services.generate_recommendations(profile, limit=len(services.CAREER_LIBRARY))
+        for data in (
+            {'recommendations': recommendations},
+            {'recommendations': json.loads(json.dumps(recommendations))},
+            {'results': [{'index': 0, 'recommendations': recommendations[:3]}], 'note': 'caf\u00e9 \u2028'},
+        ):
+            expected, actual = self.render_both(data)
+            self.assertEqual(actual, expected)
+
+    def test_changed_static_fields_are_encoded_normally(self):
+        recommendation = services.generate_recommendations(UserProfile(skills=['python']), limit=1)[0]
+        stale = {**recommendation, 'title': 'Renamed career'}
+        expected, actual = self.render_both({'recommendations': [stale]})
+        self.assertEqual(actual, expected)
+        self.assertIn(b'Renamed career', actual)
+
+    def test_indented_output_falls_back(self):
+        data = {'recommendations': services.generate_recommendations(UserProfile(skills=['python']))}
+        context = {'indent': 2}
+        self.assertEqual(
+            CareerJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context),
+        )
+
+
+class ScoringBenchmarkTests(SimpleTestCase):
+    def benchmark(self, *args):
+        output = io.StringIO()
+        call_command('benchmark_scoring', '--careers', '53', '--skills', '0', '20', '--calls', '3', *args, stdout=output)
+        return output.getvalue()
+
+    def test_synthetic_data_is_seeded(self):
+        self.assertEqual(benchmarks.synthetic_catalog(200, seed=3), benchmarks.synthetic_catalog(200, seed=3))
+        self.assertNotEqual(benchmarks.synthetic_catalog(200, seed=3), benchmarks.synthetic_catalog(200, seed=4))
+        profiles = benchmarks.synthetic_profiles(4, 500, 1000)
+        self.assertEqual([len(profile.skills) for profile in profiles], [500] * 4)
+
+    def test_percentiles_use_nearest_rank(self):
+        ordered = list(range(1, 101))
+        self.assertEqual([benchmarks.percentile(ordered, rank) for rank in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(benchmarks.percentile([7.0], 99), 7.0)
+
+    def test_baseline_round_trip_and_regression_check(self):
+        library = services.CAREER_LIBRARY
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        baseline = directory / 'baseline.json'
+        output = self.benchmark('--save-baseline', str(baseline))
+        self.assertIn('python/careers=53/skills=20', output)
+        self.assertIs(services.CAREER_LIBRARY.__class__, library.__class__)
+        self.assertEqual(len(services.CAREER_LIBRARY), len(library))
+
+        saved = json.loads(baseline.read_text())
+        self.assertEqual(set(saved['cases']), {'python/careers=53/skills=0', 'python/careers=53/skills=20'})
+        self.assertIn('No case is more than 1000% slower', self.benchmark('--baseline', str(baseline), '--max-regression', '10'))
+
+        for case in saved['cases'].values():
+            case['p50_ms'] = 1e-6
+        baseline.write_text(json.dumps(saved))
+        with self.assertRaisesMessage(CommandError, 'Regressions against the baseline'):
+            self.benchmark('--baseline', str(baseline))
+
+
+class CatalogLoadingTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_snapshot_round_trips_careers(self):
+        snapshot_path = self.directory / 'careers.snapshot'
+        version = write_snapshot(services.CAREER_LIBRARY, snapshot_path)
+        snapshot = CatalogSnapshot(snapshot_path)
+        self.assertEqual(version, catalog_hash(services.CAREER_LIBRARY))
+        self.assertEqual(snapshot.version, version)
+        self.assertEqual(list(snapshot.careers), list(services.CAREER_LIBRARY))
+        self.assertEqual(snapshot.careers[-1], services.CAREER_LIBRARY[-1])
+
+    def test_snapshot_columns_match_source_columns(self):
+        careers, _ = synthetic_catalog_and_profiles(careers=50, profiles=0)
+        snapshot_path = self.directory / 'synthetic.snapshot'
+        write_snapshot(careers, snapshot_path)
+        expected = build_columns(careers)
+        columns = CatalogSnapshot(snapshot_path).columns()
+        for name in ('skills', 'interests', 'education', 'title_keywords'):
+            for part in ('vocabulary', 'indptr', 'indices', 'data'):
+                self.assertEqual(list(getattr(getattr(columns, name), part)), list(getattr(getattr(expected, name), part)))
+        self.assertEqual(list(columns.min_experience), list(expected.min_experience))
+
+    def test_snapshot_catalog_compiles_careers_lazily_and_ranks_the_same(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        snapshot_path = self.directory / 'synthetic.snapshot'
+        write_snapshot(careers, snapshot_path)
+        snapshot = CatalogSnapshot(snapshot_path)
+        source = services.CompiledCatalog(careers)
+        catalog = services.CompiledCatalog(snapshot.careers, snapshot.version, columns=snapshot.columns())
+        self.assertIsInstance(catalog.careers, services.LazyCompiledCareers)
+        self.assertEqual(sum(career is not None for career in catalog.careers._compiled), 0)
+        for profile in profiles:
+            expected, normalized = services.normalize_profile(profile, source), services.normalize_profile(profile, catalog)
+            ranking = services._top_positions(normalized, 10, catalog)
+            self.assertEqual(ranking, services._top_positions(expected, 10, source))
+            self.assertEqual(
+                [services._score_career(normalized, catalog.careers[position]) for position in ranking],
+                [services._score_career(expected, source.careers[position]) for position in ranking],
+            )
+        self.assertLess(sum(career is not None for career in catalog.careers._compiled), len(careers))
+
+    def test_csv_source(self):
+        source = self.directory / 'careers.csv'
+        source.write_text(
+            'slug,title,description,required_skills,interests,education_levels,average_salary,growth_rate,demand_index,min_experience\n'
+            'nurse,Nurse,Care for patients.,patient care; triage,healthcare,bachelors,$80k,6% CAGR,4,1\n',
+            encoding='utf-8',
+        )
+        (career,) = load_source(source)
+        self.assertEqual(career.required_skills, ['patient care', 'triage'])
+        self.assertEqual(career.demand_index, 4)
+
+    def test_catalog_loads_from_snapshot_setting(self):
+        snapshot_path = self.directory / 'careers.snapshot'
+        call_command('compile_catalog', output=str(snapshot_path), stdout=io.StringIO())
+        profile = UserProfile(skills=['python', 'sql'], interests=['data'])
+        expected = services.generate_recommendations(profile, limit=10)
+        try:
+            with override_settings(ADVISOR_CATALOG_SNAPSHOT=str(snapshot_path)):
+                services.load_catalog()
+                self.assertIsInstance(services.CAREER_LIBRARY, SnapshotCareers)
+                self.assertEqual(services.generate_recommendations(profile, limit=10), expected)
+        finally:
+            services.load_catalog()
+
+
+class TermMatchingTests(SimpleTestCase):
+    def setUp(self):
+        self.resolver = TermResolver(
+            {'python': 0, 'user research': 1, 'dashboards': 2, 'data analysis': 3, 'analytics': 4},
+            synonyms={'python': ['py'], 'user research': ['UX research'], 'missing': ['gone']},
+            fuzzy_threshold=0.8,
+        )
+
+    def test_exact_canonical_and_synonym_lookups(self):
+        self.assertEqual(self.resolver.resolve('Python'), 0)
+        self.assertEqual(self.resolver.resolve('Python-3.11'), 0)
+        self.assertEqual(self.resolver.resolve('python v3'), 0)
+        self.assertEqual(self.resolver.resolve('py'), 0)
+        self.assertEqual(self.resolver.resolve('ux-research'), 1)
+        self.assertEqual(self.resolver.resolve('Data_Analysis'), 3)
+        self.assertIsNone(self.resolver.resolve('gone'))
+
+    def test_fuzzy_lookup_respects_threshold(self):
+        self.assertEqual(self.resolver.resolve('dashboard'), 2)
+        self.assertEqual(self.resolver.resolve('analytic'), 4)
+        self.assertIsNone(self.resolver.resolve('nursing'))
+        exact_only = TermResolver({'dashboards': 0})
+        self.assertIsNone(exact_only.resolve('dashboard'))
+
+    def test_versions_are_stripped_only_from_profile_input(self):
+        resolver = TermResolver(
+            {'web3': 0, 'design': 1, 'javascript': 2, 'python': 3},
+            synonyms={'javascript': ['es6'], 'design': ['ux design']},
+        )
+        self.assertEqual(resolver.resolve('es6'), 2)
+        self.assertEqual(resolver.resolve('Web3'), 0)
+        self.assertEqual(resolver.resolve('python_3'), 3)
+        for term in ('Web 2', 'web', 'design 2', 'es', 'ux', 'python3'):
+            self.assertIsNone(resolver.resolve(term), term)
+
+    def test_default_matching_has_no_broad_aliases_or_fuzzy_step(self):
+        catalog = services.CATALOG
+        self.assertIsNone(catalog.skill_resolver.fuzzy_threshold)
+        for term in ('typescript', 'pandas', 'tableau', 'dashboard', 'Web 2', 'es'):
+            self.assertIsNone(catalog.skill_resolver.resolve(term), term)
+        for term in ('machine learning', 'ux', 'design 2', 'Web 2'):
+            self.assertIsNone(catalog.interest_resolver.resolve(term), term)
+        self.assertEqual(catalog.term_names[catalog.skill_resolver.resolve('JS')], 'javascript')
+
+    def test_aliases_score_like_catalog_terms(self):
+        aliased = UserProfile(skills=['Python-3.11', 'SQL queries', 'Analytics'], interests=['data science'])
+        canonical = UserProfile(skills=['python', 'sql', 'analytics'], interests=['data'])
+        self.assertEqual(services.generate_recommendations(aliased), services.generate_recommendations(canonical))
+
+
+class RetrievalTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_shortlist_ranks_matching_descriptions_first(self):
+        index = TfidfIndex.build(services.CAREER_LIBRARY, 'test')
+        shortlist = index.shortlist(['machine learning', 'models', 'production'], 3)
+        slugs = [services.CAREER_LIBRARY[position].slug for position in shortlist]
+        self.assertEqual(slugs[0], 'machine-learning-engineer')
+        self.assertEqual(index.shortlist(['zzz'], 3), [])
+
+    def test_index_is_persisted_per_catalog_version(self):
+        built = load_or_build(services.CAREER_LIBRARY, 'v1', self.directory)
+        self.assertTrue((self.directory / 'tfidf-v1.json').exists())
+        loaded = load_or_build(services.CAREER_LIBRARY, 'v1', self.directory)
+        query = ['data', 'sql', 'analyst']
+        self.assertEqual(loaded.shortlist(query, 10), built.shortlist(query, 10))
+        self.assertEqual(tokenize('The Data-Analyst, for SQL'), ['data', 'analyst', 'sql'])
+
+    def test_damaged_index_is_rebuilt(self):
+        (self.directory / 'tfidf-v1.json').write_text('{"version": "v1", "idf": {')
+        index = load_or_build(services.CAREER_LIBRARY, 'v1', self.directory)
+        self.assertEqual(TfidfIndex.load(self.directory / 'tfidf-v1.json').idf, index.idf)
+
+    def test_concurrent_saves_do_not_collide(self):
+        index = TfidfIndex.build(services.CAREER_LIBRARY, 'v1')
+        path = self.directory / 'tfidf-v1.json'
+        threads = [threading.Thread(target=index.save, args=(path,)) for _ in range(8)]
+        errors = []
+        with mock.patch.object(threading, 'excepthook', lambda args: errors.append(args.exc_value)):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ['tfidf-v1.json'])
+        self.assertEqual(TfidfIndex.load(path).idf, index.idf)
+
+    def test_retrieval_mode_scores_shortlist_with_weighted_scorer(self):
+        profile = RecommendationEngineTests.profiles[0]
+        version = services.catalog_version()
+        with override_settings(ADVISOR_RETRIEVAL_MODE='tfidf', ADVISOR_RETRIEVAL_SHORTLIST=5, ADVISOR_RETRIEVAL_INDEX_DIR=str(self.directory)):
+            self.assertNotEqual(services.catalog_version(), version)
+            normalized = services.normalize_profile(profile)
+            candidates = services._retrieval_candidates(profile, normalized, 3, services.CATALOG)
+            self.assertLess(len(candidates), len(services.CAREER_LIBRARY))
+            recommendations = services.generate_recommendations(profile)
+        self.assertEqual(recommendations, full_scan_recommendations(profile))
+        self.assertTrue(
+            {item['id'] for item in recommendations}
+            <= {services.CAREER_LIBRARY[position].slug for position in candidates}
+        )
+
+
+def reference_score_career(profile, career):
+    """The original string-based scorer, kept as the oracle for the compiled and vector paths."""
+    normalized_skills = {skill.lower() for skill in profile.skills}
+    normalized_interests = {interest.lower() for interest in profile.interests}
+    matched_skills = sorted({skill for skill in career.required_skills if skill.lower() in normalized_skills})
+    matched_interests = sorted({interest for interest in career.interests if interest.lower() in normalized_interests})
+
+    skill_score = len(matched_skills) / len(career.required_skills) if career.required_skills else 0.0
+    interest_score = len(matched_interests) / len(career.interests) if career.interests else 0.0
+    if not career.education_levels:
+        education_score = 1.0
+    elif not profile.education_level:
+        education_score = 0.4
+    else:
+        education_score = 1.0 if profile.education_level in career.education_levels else 0.6
+    user_years = services.EXPERIENCE_BUCKETS.get(profile.years_experience, 2)
+    if career.min_experience <= 0 or user_years >= career.min_experience:
+        experience_score = 1.0
+    else:
+        experience_score = max(0.3, 1 - ((career.min_experience - user_years) / 10))
+    role_bonus = 0.0
+    if profile.current_role:
+        keywords = {career.title.lower(), *career.title.lower().split()}
+        role_bonus = 0.05 if any(keyword in profile.current_role.lower() for keyword in keywords) else 0.0
+
+    weighted_score = (
+        (skill_score * 0.5)
+        + (interest_score * 0.2)
+        + (education_score * 0.1)
+        + (experience_score * 0.1)
+        + ((career.demand_index / 5) * 0.1)
+        + role_bonus
+    )
+    variance = (len(matched_skills) * 1.7) + (len(matched_interests) * 1.1)
+    return {
+        'id': career.slug,
+        'title': career.title,
+        'description': career.description,
+        'requiredSkills': list(career.required_skills),
+        'interests': list(career.interests),
+        'educationLevel': list(career.education_levels),
+        'averageSalary': career.average_salary,
+        'growthRate': career.growth_rate,
+        'matchScore': max(28, min(98, int((weighted_score * 100) + variance))),
+        'matchedSkills': matched_skills,
+        'matchedInterests': matched_interests,
+    }
+
+
+def synthetic_catalog_and_profiles(careers=300, profiles=50):
+    rng = random.Random(7)
+    vocabulary = [f'skill {index}' for index in range(40)] + ['Python', 'python']
+    topics = [f'topic {index}' for index in range(12)]
+    levels = ['associates', 'bachelors', 'masters', 'mba']
+    catalog = [
+        services.CareerDefinition(
+            slug=f'career-{index}',
+            title=rng.choice(['Data Analyst', 'Nurse', 'Product Manager', 'Chef', '']),
+            description='',
+            required_skills=rng.sample(vocabulary, rng.randint(0, 5)),
+            interests=rng.sample(topics, rng.randint(0, 3)),
+            education_levels=rng.sample(levels, rng.randint(0, 2)),
+            average_salary='',
+            growth_rate='',
+            demand_index=rng.randint(1, 5),
+            min_experience=rng.randint(0, 12),
+        )
+        for index in range(careers)
+    ]
+    users = [
+        UserProfile(
+            skills=rng.sample(vocabulary, rng.randint(0, 10)),
+            interests=rng.sample(topics, rng.randint(0, 4)),
+            education_level=rng.choice(levels + ['', 'phd']),
+            years_experience=rng.choice(list(services.EXPERIENCE_BUCKETS) + ['']),
+            current_role=rng.choice(['', 'Senior Data Analyst', 'chef de partie', 'Teacher']),
+        )
+        for _ in range(profiles)
+    ]
+    return catalog, users
+
+
+def full_scan_recommendations(profile, limit=3):
+    scored = [reference_score_career(profile, career) for career in services.CAREER_LIBRARY]
+    scored.sort(key=lambda item: item['matchScore'], reverse=True)
+    return scored[:limit]
+
+
+class RecommendationEngineTests(SimpleTestCase):
+    profiles = [
+        UserProfile(skills=['Python', 'SQL', 'analytics'], interests=['data'], education_level='bachelors', years_experience='3'),
+        UserProfile(skills=[], interests=[], education_level='', years_experience=''),
+        UserProfile(skills=['communication'], interests=['people', 'finance'], current_role='Financial Advisor'),
+        UserProfile(skills=['unknown skill'], interests=['unknown interest'], education_level='masters', years_experience='11'),
+    ]
+
+    def test_indexed_recommendations_match_full_scan(self):
+        for profile in self.profiles:
+            self.assertEqual(services.generate_recommendations(profile), full_scan_recommendations(profile))
+
+    def test_limit_and_offset_page_through_full_ranking(self):
+        profile = self.profiles[0]
+        scored = full_scan_recommendations(profile, limit=None)
+        self.assertEqual(services.generate_recommendations(profile, limit=10, offset=5), scored[5:15])
+        self.assertEqual(services.generate_recommendations(profile, limit=5, offset=len(scored) - 2), scored[-2:])
+
+    def test_postings_cover_every_career_term(self):
+        catalog = services.CATALOG
+        for position, career in enumerate(services.CAREER_LIBRARY):
+            for skill in career.required_skills:
+                self.assertIn(position, catalog.skill_postings[catalog.terms[skill.lower()]])
+            for interest in career.interests:
+                self.assertIn(position, catalog.interest_postings[catalog.terms[interest.lower()]])
+
+    def test_baseline_merge_matches_full_ranking_on_synthetic_catalog(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        catalog = services.CompiledCatalog(careers)
+        for profile in profiles:
+            normalized = services.normalize_profile(profile, catalog)
+            ranking = [position for _, position in sorted((-score, position) for position, score in services._catalog_scores(normalized, catalog))]
+            for limit in (0, 1, 10, len(careers)):
+                self.assertEqual(services._top_positions(normalized, limit, catalog), ranking[:limit])
+
+    def test_compiled_scores_match_reference_on_synthetic_catalog(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        catalog = services.CompiledCatalog(careers)
+        for profile in profiles:
+            normalized = services.normalize_profile(profile, catalog)
+            self.assertEqual(
+                [services._score_career(normalized, career) for career in catalog.careers],
+                [reference_score_career(profile, career) for career in careers],
+            )
+
+
+class ScoreComponentsTests(SimpleTestCase):
+    def test_components_match_reference_scorer(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        catalog = services.CompiledCatalog(careers)
+        for profile in profiles:
+            components = services.ScoreComponents(services.normalize_profile(profile, catalog), catalog)
+            expected = [reference_score_career(profile, career) for career in careers]
+            self.assertEqual([int(score) for score in components.scores], [item['matchScore'] for item in expected])
+            expected.sort(key=lambda item: item['matchScore'], reverse=True)
+            self.assertEqual(components.recommendations(10, 3), expected[3:13])
+
+    def test_update_recomputes_only_changed_components(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        catalog = services.CompiledCatalog(careers)
+        before, after = profiles[0], profiles[1]
+        edited = UserProfile(
+            skills=before.skills,
+            interests=after.interests,
+            education_level=before.education_level,
+            years_experience=before.years_experience,
+            current_role=before.current_role,
+        )
+        components = services.ScoreComponents(services.normalize_profile(before, catalog), catalog)
+        updated, changed = components.updated(services.normalize_profile(edited, catalog))
+        self.assertEqual(changed, ['interests'])
+        self.assertIs(updated.columns['skills'], components.columns['skills'])
+        self.assertIsNot(updated.columns['interests'], components.columns['interests'])
+        fresh = services.ScoreComponents(services.normalize_profile(edited, catalog), catalog)
+        self.assertEqual(list(updated.scores), list(fresh.scores))
+        self.assertEqual(updated.updated(updated.normalized), (updated, []))
+
+
+class RecommendationPreviewTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='preview@example.com', email='preview@example.com', password='testpass123')
+        self.profile = update_profile(self.user, skills=['python', 'sql'], interests=['data'])
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.user).key}'}
+
+    def preview(self, payload, **params):
+        url = reverse('advisor-recommendations-preview')
+        return self.client.post(f'{url}?k={params.get("k", 3)}', payload, format='json', **self.headers)
+
+    def test_preview_ranks_edited_profile_without_saving(self):
+        updated_at = self.profile.updated_at
+        for payload in ({'interests': {'add': ['people']}}, {'skills': ['communication'], 'currentRole': 'Nurse'}):
+            response = self.preview(payload, k=5)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            edited = UserProfile(skills=self.profile.skills, interests=self.profile.interests)
+            for name, value in payload.items():
+                value = ['data', 'people'] if isinstance(value, dict) else value
+                setattr(edited, {'currentRole': 'current_role'}.get(name, name), value)
+            self.assertEqual(response.data['recommendations'], full_scan_recommendations(edited, limit=5))
+            self.assertEqual(response.data['changed'], list(payload))
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.skills, self.profile.interests), (['python', 'sql'], ['data']))
+        self.assertEqual(self.profile.updated_at, updated_at)
+
+    @override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'REFRESH': 'inline'})
+    def test_save_after_preview_rescores_from_components(self):
+        self.preview({'interests': ['people']})
+        with mock.patch.object(services, 'generate_recommendations') as generate, self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('advisor-profile'), {'interests': ['people']}, format='json', **self.headers)
+        generate.assert_not_called()
+        self.profile.refresh_from_db()
+        self.assertEqual(RecommendationSnapshot.objects.get(user=self.user).recommendations[:3], full_scan_recommendations(self.profile))
+
+    def test_component_cache_is_bounded_by_bytes(self):
+        per_user = len(services.CATALOG.careers) * services.ScoreComponents.BYTES_PER_CAREER
+        users = [self.user] + [
+            get_user_model().objects.create_user(username=f'preview{index}@example.com', password='testpass123')
+            for index in range(2)
+        ]
+        with override_settings(ADVISOR_RECOMMENDATION_SNAPSHOTS={'COMPONENT_CACHE_BYTES': 2 * per_user + 1}):
+            for user in users:
+                snapshots.rescore(update_profile(user, skills=['python']), limit=3)
+            components = snapshots._get_components()
+            self.assertEqual(len(components), 2)
+            self.assertIsNone(components.get(self.user.id))
+
+    def test_rejects_malformed_payloads(self):
+        response = self.preview({'skills': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('skills', response.data['errors'])
+
+
+@skipIf(engine.np is None, 'numpy is not installed')
+class VectorEngineTests(SimpleTestCase):
+    def test_scores_match_reference_scorer(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        vector_engine = engine.VectorEngine.from_careers(careers, services.EXPERIENCE_BUCKETS)
+        for profile in profiles:
+            scores = vector_engine.score(
+                {skill.lower() for skill in profile.skills},
+                {interest.lower() for interest in profile.interests},
+                profile.education_level,
+                profile.years_experience,
+                profile.current_role,
+            )
+            expected = [reference_score_career(profile, career)['matchScore'] for career in careers]
+            self.assertEqual(scores.tolist(), expected)
+
+    def test_snapshot_backed_engine_matches_source_engine(self):
+        careers, profiles = synthetic_catalog_and_profiles()
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        write_snapshot(careers, directory / 'careers.snapshot')
+        source_engine = engine.VectorEngine.from_careers(careers, services.EXPERIENCE_BUCKETS)
+        snapshot_engine = engine.VectorEngine(CatalogSnapshot(directory / 'careers.snapshot').columns(), services.EXPERIENCE_BUCKETS)
+        queries = [
+            (set(map(str.lower, p.skills)), set(map(str.lower, p.interests)), p.education_level, p.years_experience, p.current_role)
+            for p in profiles
+        ]
+        self.assertEqual(snapshot_engine.score_many(queries).tolist(), source_engine.score_many(queries).tolist())
+
+    @override_settings(ADVISOR_SCORING_ENGINE='numpy')
+    def test_recommendations_match_python_engine(self):
+        for profile in RecommendationEngineTests.profiles:
+            self.assertIsNotNone(services.get_vector_engine())
+            self.assertEqual(services.generate_recommendations(profile), full_scan_recommendations(profile))
+
+    @override_settings(ADVISOR_SCORING_ENGINE='numpy')
+    def test_batch_matches_single_profile_engine(self):
+        profiles = RecommendationEngineTests.profiles
+        expected = [full_scan_recommendations(profile) for profile in profiles]
+        self.assertEqual(services.generate_batch_recommendations(profiles), expected)
+        with mock.patch.object(engine, 'MAX_BATCH_CELLS', len(services.CAREER_LIBRARY) * 2):
+            self.assertEqual(services.generate_batch_recommendations(profiles), expected)
+
+    @override_settings(ADVISOR_SCORING_ENGINE='numpy')
+    def test_engine_limit_and_offset(self):
+        profile = RecommendationEngineTests.profiles[2]
+        with override_settings(ADVISOR_SCORING_ENGINE='python'):
+            expected = services.generate_recommendations(profile, limit=20, offset=7)
+        self.assertEqual(services.generate_recommendations(profile, limit=20, offset=7), expected)
+
+    @override_settings(ADVISOR_SCORING_ENGINE='numpy')
+    def test_engine_streaming_order(self):
+        profile = RecommendationEngineTests.profiles[0]
+        self.assertEqual(list(services.iter_recommendations(profile)), full_scan_recommendations(profile, limit=None))
@@ -1,22 +1,37 @@
+from django.conf import settings
 from django.urls import path
 
+from .async_views import AsyncProfileView, AsyncRecommendationsView, AsyncSessionView
 from .views import (
+    BatchRecommendationsView,
     HealthView,
     LoginView,
     LogoutView,
+    MetricsView,
+    ProfilingTraceView,
     ProfileView,
+    RecommendationsPreviewView,
+    RecommendationsStreamView,
     RecommendationsView,
     SessionView,
     SignupView,
 )
 
+if getattr(settings, 'ADVISOR_ASYNC_VIEWS', False):
+    SessionView, ProfileView, RecommendationsView = AsyncSessionView, AsyncProfileView, AsyncRecommendationsView
+
 urlpatterns = [
     path('health/', HealthView.as_view(), name='advisor-health'),
+    path('metrics/', MetricsView.as_view(), name='advisor-metrics'),
+    path('profiling/traces/<slug:trace_id>/', ProfilingTraceView.as_view(), name='advisor-profiling-trace'),
     path('auth/signup/', SignupView.as_view(), name='advisor-signup'),
     path('auth/login/', LoginView.as_view(), name='advisor-login'),
     path('auth/logout/', LogoutView.as_view(), name='advisor-logout'),
     path('auth/session/', SessionView.as_view(), name='advisor-session'),
     path('profile/', ProfileView.as_view(), name='advisor-profile'),
     path('recommendations/', RecommendationsView.as_view(), name='advisor-recommendations'),
+    path('recommendations/preview/', RecommendationsPreviewView.as_view(), name='advisor-recommendations-preview'),
+    path('recommendations/stream/', RecommendationsStreamView.as_view(), name='advisor-recommendations-stream'),
+    path('recommendations/batch/', BatchRecommendationsView.as_view(), name='advisor-recommendations-batch'),
 ]
 
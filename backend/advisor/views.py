@@ -1,22 +1,44 @@
 from __future__ import annotations
 
-from typing import Dict
-
+import copy
+import hashlib
+import itertools
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.models import update_last_login
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
+from django.http import HttpResponse, HttpResponseBase, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.crypto import constant_time_compare
+from django.views import View
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .authentication import CachedTokenAuthentication
+from .cache import get_recommendation_cache
+from .metrics import get_registry, render
 from .models import UserProfile
-from .services import generate_recommendations
+from .profiling import load_trace
+from .renderers import EventStreamRenderer, NDJSONRenderer
+from .services import catalog_version, generate_batch_recommendations, iter_recommendations
+from .snapshots import current_snapshot, rescore, snapshot_depth
 
 User = get_user_model()
 
+MAX_BATCH_SIZE = 1000
+MAX_RECOMMENDATIONS = 100
+# Stream chunks produced per hop to a worker thread when serving over ASGI.
+STREAM_BATCH_SIZE = 50
+
 
 def serialize_user(user: User) -> Dict[str, str]:
     name = user.get_full_name() or user.first_name or user.email.split('@')[0]
@@ -38,6 +60,124 @@ def serialize_profile(profile: UserProfile) -> Dict[str, object]:
     }
 
 
+PROFILE_FIELDS = {
+    'skills': 'skills',
+    'interests': 'interests',
+    'educationLevel': 'education_level',
+    'yearsExperience': 'years_experience',
+    'currentRole': 'current_role',
+}
+TERM_FIELDS = ('skills', 'interests')
+
+
+def profile_changes(profile: UserProfile, data: Mapping[str, object], allow_operations: bool = False) -> Dict[str, object]:
+    """New values for the profile fields ``data`` actually changes, keyed by API field name.
+
+    Term lists are replaced by a list, or (with ``allow_operations``) edited in place by an
+    ``{"add": [...], "remove": [...]}`` object; terms compare case-insensitively. Raises
+    ValueError carrying a field -> message dict when the payload is malformed.
+    """
+    changes: Dict[str, object] = {}
+    errors: Dict[str, str] = {}
+    for name, attribute in PROFILE_FIELDS.items():
+        if name not in data:
+            continue
+        current, value = getattr(profile, attribute), data[name]
+        if name in TERM_FIELDS:
+            if allow_operations and isinstance(value, dict):
+                value = _apply_term_operations(current, value, name, errors)
+            elif not _is_term_list(value):
+                errors[name] = f'{name} must be a list of strings' + (' or an add/remove object.' if allow_operations else '.')
+                continue
+        elif not isinstance(value, str):
+            errors[name] = f'{name} must be a string.'
+            continue
+        if value is not None and value != current:
+            changes[name] = value
+    if errors:
+        raise ValueError(errors)
+    return changes
+
+
+def _apply_term_operations(current: List[str], operations: Dict[str, object], name: str, errors: Dict[str, str]):
+    unknown = set(operations) - {'add', 'remove'}
+    additions, removals = operations.get('add', []), operations.get('remove', [])
+    if unknown or not _is_term_list(additions) or not _is_term_list(removals):
+        errors[name] = f'{name} operations must be an object with "add" and/or "remove" lists of strings.'
+        return None
+    removed = {term.lower() for term in removals}
+    terms = [term for term in current if term.lower() not in removed]
+    present = {term.lower() for term in terms}
+    for term in additions:
+        if term.lower() not in present:
+            terms.append(term)
+            present.add(term.lower())
+    return terms
+
+
+def _is_term_list(value: object) -> bool:
+    return isinstance(value, list) and all(isinstance(term, str) for term in value)
+
+
+def save_profile_changes(profile: UserProfile, changes: Dict[str, object]) -> None:
+    """Apply ``changes`` and write only those columns; a no-op skips the write and cache drop."""
+    if not changes:
+        return
+    get_recommendation_cache().invalidate(profile)
+    for name, value in changes.items():
+        setattr(profile, PROFILE_FIELDS[name], value)
+    profile.save(update_fields=[*(PROFILE_FIELDS[name] for name in changes), 'updated_at'])
+
+
+def parse_page(params: Mapping[str, str]) -> Tuple[int, int]:
+    """``k`` and ``offset`` query parameters; raises ValueError with a client-facing message."""
+    try:
+        limit = int(params.get('k', 3))
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        raise ValueError('k and offset must be integers.')
+    if not 1 <= limit <= MAX_RECOMMENDATIONS or offset < 0:
+        raise ValueError(f'k must be between 1 and {MAX_RECOMMENDATIONS} and offset must not be negative.')
+    return limit, offset
+
+
+def conditional_response(request, validators: Sequence[object], build: Callable[[], HttpResponseBase]) -> HttpResponseBase:
+    """Answer If-None-Match with a 304 before ``build`` runs.
+
+    ``validators`` must determine the representation completely; the strong ETag is
+    their hash, so it changes exactly when the response body can. No Last-Modified is
+    sent: the body also depends on the user row and the catalog, which have no change
+    time, so If-Modified-Since alone could not tell when it changed.
+    """
+    etag = entity_tag(validators)
+    response = get_conditional_response(request, etag=etag) or build()
+    return apply_validators(response, etag)
+
+
+def entity_tag(validators: Sequence[object]) -> str:
+    return quote_etag(hashlib.sha256(json.dumps(validators, default=str).encode()).hexdigest()[:32])
+
+
+def apply_validators(response: HttpResponseBase, etag: str) -> HttpResponseBase:
+    response['ETag'] = etag
+    # Per-user data: browsers may keep it but must revalidate, shared caches must not.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def session_validators(user: User, profile: UserProfile) -> Tuple:
+    return ('session', user.pk, user.email, user.first_name, user.last_name, profile.updated_at)
+
+
+def profile_validators(profile: UserProfile) -> Tuple:
+    return ('profile', profile.user_id, profile.updated_at)
+
+
+def recommendation_validators(user_id: int, profile_updated_at: datetime, limit: int, offset: int) -> Tuple:
+    return ('recommendations', user_id, profile_updated_at, catalog_version(), limit, offset)
+
+
 class HealthView(APIView):
     permission_classes = [AllowAny]
 
@@ -45,6 +185,39 @@ class HealthView(APIView):
         return Response({'status': 'ok'}, status=status.HTTP_200_OK)
 
 
+class MetricsView(View):
+    """Prometheus scrape target. With ADVISOR_METRICS['TOKEN'] set, scrapes must send it as a bearer token."""
+
+    http_method_names = ['get']
+
+    def get(self, request):
+        token = getattr(settings, 'ADVISOR_METRICS', {}).get('TOKEN')
+        if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Invalid metrics token.\n', status=status.HTTP_403_FORBIDDEN, content_type='text/plain')
+        return HttpResponse(render(get_registry().collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfilingTraceView(APIView):
+    """Download a stored request profile as JSON, or its sampled stacks in folded format (``?output=folded``)."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, trace_id):
+        trace = load_trace(trace_id)
+        if trace is None:
+            return Response({'error': 'Trace not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get('output') == 'folded':
+            stacks = ''.join(f'{stack} {count}\n' for stack, count in trace['samples']['stacks'].items())
+            response = HttpResponse(stacks, content_type='text/plain; charset=utf-8')
+            filename = f'advisor-trace-{trace_id}.folded'
+        else:
+            response = HttpResponse(json.dumps(trace, indent=2), content_type='application/json')
+            filename = f'advisor-trace-{trace_id}.json'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class SignupView(APIView):
     permission_classes = [AllowAny]
 
@@ -76,7 +249,7 @@ class SignupView(APIView):
                 first_name=first_name,
                 last_name=last_name,
             )
-            profile, _ = UserProfile.objects.get_or_create(user=user)
+            profile = user.profile
             token, _ = Token.objects.get_or_create(user=user)
 
         return Response(
@@ -113,7 +286,7 @@ class LoginView(APIView):
 
 
 class LogoutView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -122,41 +295,222 @@ class LogoutView(APIView):
 
 
 class SessionView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        return Response({'user': serialize_user(request.user), 'profile': serialize_profile(profile)})
+        user, profile = request.user, request.profile
+        return conditional_response(
+            request,
+            session_validators(user, profile),
+            lambda: Response({'user': serialize_user(user), 'profile': serialize_profile(profile)}),
+        )
 
 
 class ProfileView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        return Response({'profile': serialize_profile(profile)})
+        profile = request.profile
+        return conditional_response(
+            request,
+            profile_validators(profile),
+            lambda: Response({'profile': serialize_profile(profile)}),
+        )
 
     def post(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        return self.update(request, allow_operations=False)
+
+    def patch(self, request):
+        return self.update(request, allow_operations=True)
 
+    def update(self, request, allow_operations: bool):
+        profile = request.profile
         data = request.data or {}
-        profile.skills = data.get('skills', profile.skills)
-        profile.interests = data.get('interests', profile.interests)
-        profile.education_level = data.get('educationLevel', profile.education_level)
-        profile.years_experience = data.get('yearsExperience', profile.years_experience)
-        profile.current_role = data.get('currentRole', profile.current_role)
-        profile.save()
+        if not isinstance(data, dict):
+            return Response({'error': 'Expected an object.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            changes = profile_changes(profile, data, allow_operations)
+        except ValueError as exc:
+            return Response({'errors': exc.args[0]}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({'profile': serialize_profile(profile)})
+        save_profile_changes(profile, changes)
+        return Response({'profile': serialize_profile(profile), 'changed': list(changes)})
 
 
 class RecommendationsView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit, offset = parse_page(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        depth = offset + limit
+        if depth <= snapshot_depth():
+            snapshot = current_snapshot(request.user.pk, request.profile)
+            updated_at = snapshot.profile_updated_at
+
+            def recommendations():
+                return snapshot.recommendations[offset:depth]
+        else:
+            profile = request.profile
+            updated_at = profile.updated_at
+
+            def recommendations():
+                return get_recommendation_cache().get_recommendations(profile, limit=limit, offset=offset)
+
+        return conditional_response(
+            request,
+            recommendation_validators(request.user.pk, updated_at, limit, offset),
+            lambda: Response({'recommendations': recommendations()}),
+        )
+
+
+class RecommendationsPreviewView(APIView):
+    """Recommendations for the profile with PATCH-style edits applied, without saving them."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            limit, offset = parse_page(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        data = request.data or {}
+        if not isinstance(data, dict):
+            return Response({'error': 'Expected an object.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = copy.copy(request.profile)
+        try:
+            changes = profile_changes(profile, data, allow_operations=True)
+        except ValueError as exc:
+            return Response({'errors': exc.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+        for name, value in changes.items():
+            setattr(profile, PROFILE_FIELDS[name], value)
+        return Response({'recommendations': rescore(profile, limit=limit, offset=offset), 'changed': list(changes)})
+
+
+class RecommendationsStreamView(APIView):
+    """Full ranking streamed as NDJSON (default) or server-sent events (``Accept: text/event-stream``)."""
+
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, EventStreamRenderer]
 
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        recommendations = generate_recommendations(profile)
-        return Response({'recommendations': recommendations})
+        limit = request.query_params.get('k')
+        try:
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            return Response({'error': 'k must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit is not None and limit < 1:
+            return Response({'error': 'k must be at least 1.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = request.profile
+        renderer = request.accepted_renderer
+        events = _stream_events if isinstance(renderer, EventStreamRenderer) else _stream_lines
+        content = events(iter_recommendations(profile, limit))
+        if isinstance(request._request, ASGIRequest):
+            # Under ASGI Django drains a sync iterator into a list before sending anything.
+            content = _aiterate(content)
+        response = StreamingHttpResponse(content, content_type=f'{renderer.media_type}; charset=utf-8')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def _stream_lines(recommendations):
+    for rank, recommendation in enumerate(recommendations, start=1):
+        yield json.dumps({'rank': rank, **recommendation}) + '\n'
+
+
+def _stream_events(recommendations):
+    rank = 0
+    for rank, recommendation in enumerate(recommendations, start=1):
+        yield f'id: {rank}\nevent: recommendation\ndata: {json.dumps(recommendation)}\n\n'
+    yield f'event: end\ndata: {json.dumps({"count": rank})}\n\n'
+
+
+async def _aiterate(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """Drive a sync iterator from the event loop, STREAM_BATCH_SIZE chunks per thread hop.
+
+    Batches run in the thread that serves sync views, where the lazy profile can query.
+    """
+    next_batch = sync_to_async(lambda: list(itertools.islice(chunks, STREAM_BATCH_SIZE)))
+    while True:
+        batch = await next_batch()
+        if not batch:
+            return
+        for chunk in batch:
+            yield chunk
+
+
+class BatchRecommendationsView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        data = request.data or {}
+        if not isinstance(data, dict):
+            return Response({'error': 'Expected an object.'}, status=status.HTTP_400_BAD_REQUEST)
+        profiles_data = data.get('profiles')
+        user_ids = data.get('userIds')
+
+        if (profiles_data is None) == (user_ids is None):
+            return Response({'error': 'Provide either profiles or userIds.'}, status=status.HTTP_400_BAD_REQUEST)
+        entries = profiles_data if profiles_data is not None else user_ids
+        if not isinstance(entries, list):
+            return Response({'error': 'Expected a list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(entries) > MAX_BATCH_SIZE:
+            return Response(
+                {'error': f'At most {MAX_BATCH_SIZE} profiles can be scored per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if profiles_data is not None:
+            profiles = []
+            for position, entry in enumerate(profiles_data):
+                if not isinstance(entry, dict):
+                    return Response(
+                        {'index': position, 'error': 'Each profile must be an object.'}, status=status.HTTP_400_BAD_REQUEST
+                    )
+                profile = UserProfile()
+                try:
+                    changes = profile_changes(profile, entry)
+                except ValueError as exc:
+                    return Response({'index': position, 'errors': exc.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+                for name, value in changes.items():
+                    setattr(profile, PROFILE_FIELDS[name], value)
+                profiles.append(profile)
+            labels = [{'index': position} for position in range(len(profiles))]
+        else:
+            parsed_ids = [_parse_id(user_id) for user_id in user_ids]
+            users = User.objects.select_related('profile').in_bulk([user_id for user_id in parsed_ids if user_id is not None])
+            missing = [user_id for user_id, parsed in zip(user_ids, parsed_ids) if parsed not in users]
+            if missing:
+                return Response({'errors': {'userIds': f'Unknown user ids: {missing}'}}, status=status.HTTP_400_BAD_REQUEST)
+            profiles = [_profile_or_default(users[user_id]) for user_id in parsed_ids]
+            labels = [{'userId': str(user_id)} for user_id in parsed_ids]
+
+        recommendations = generate_batch_recommendations(profiles)
+        results = [{**label, 'recommendations': ranked} for label, ranked in zip(labels, recommendations)]
+        return Response({'results': results})
+
+
+def _parse_id(value: object) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _profile_or_default(user: User) -> UserProfile:
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        return UserProfile(user=user)
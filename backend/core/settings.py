@@ -47,8 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'advisor.metrics.MetricsMiddleware',
+    'advisor.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'advisor.static.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,15 +85,25 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 DATABASES = {}
 
-# Use DATABASE_URL if provided (Railway/Postgres), otherwise fall back to SQLite for local dev
+# Use DATABASE_URL if provided (Railway/Postgres), otherwise fall back to SQLite for local dev.
+# DATABASE_CONN_MAX_AGE keeps connections open across requests for that many seconds; with
+# ADVISOR_PRELOAD each worker then opens its connection right after the fork.
 if os.environ.get('DATABASE_URL'):
-    DATABASES['default'] = dj_database_url.parse(os.environ.get('DATABASE_URL'))
+    DATABASES['default'] = dj_database_url.parse(
+        os.environ.get('DATABASE_URL'), conn_max_age=int(os.environ.get('DATABASE_CONN_MAX_AGE', '0'))
+    )
 else:
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 
+# With several workers (and their snapshot threads) writing to one SQLite file, a deferred
+# transaction that upgrades its read lock fails at once with "database is locked"; IMMEDIATE
+# transactions take the write lock when they begin and wait for it instead.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -152,10 +164,112 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'advisor.authentication.CachedTokenAuthentication',
     ],
 }
 
+# Opt-in renderer that emits the same bytes as JSONRenderer but splices pre-encoded career
+# fragments into recommendation payloads instead of re-encoding them on every response.
+if os.environ.get('ADVISOR_FAST_JSON_RENDERER', 'False') == 'True':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['advisor.renderers.CareerJSONRenderer']
+
+# Career catalog: a JSON or CSV source file, optionally compiled into a memory-mapped
+# snapshot with `manage.py compile_catalog`. Workers use the snapshot when it exists.
+ADVISOR_CATALOG_SOURCE = os.environ.get('ADVISOR_CATALOG_SOURCE', str(BASE_DIR / 'advisor' / 'data' / 'careers.json'))
+ADVISOR_CATALOG_SNAPSHOT = os.environ.get('ADVISOR_CATALOG_SNAPSHOT', '')
+
+# Profile term matching: synonyms map aliases ("py", "UX research") onto catalog terms;
+# with ADVISOR_FUZZY_MATCH_THRESHOLD set (e.g. 0.8), unmatched terms fall back to the closest
+# catalog term by trigram similarity when it reaches the threshold. Off by default: near
+# spellings are often different skills ("communication" / "crisis communication" score 0.8).
+ADVISOR_SKILL_SYNONYMS = os.environ.get('ADVISOR_SKILL_SYNONYMS', str(BASE_DIR / 'advisor' / 'data' / 'synonyms.json'))
+ADVISOR_FUZZY_MATCH_THRESHOLD = float(os.environ.get('ADVISOR_FUZZY_MATCH_THRESHOLD', '0')) or None
+
+# Optional retrieval stage for the Python scorer: 'tfidf' shortlists careers whose title and
+# description best match the profile's skills, interests and role (plus every career with
+# a skill or interest overlap) before weighted scoring. The index is persisted per catalog
+# version in ADVISOR_RETRIEVAL_INDEX_DIR.
+ADVISOR_RETRIEVAL_MODE = os.environ.get('ADVISOR_RETRIEVAL_MODE', 'off')
+ADVISOR_RETRIEVAL_SHORTLIST = int(os.environ.get('ADVISOR_RETRIEVAL_SHORTLIST', '200'))
+ADVISOR_RETRIEVAL_INDEX_DIR = os.environ.get('ADVISOR_RETRIEVAL_INDEX_DIR', str(BASE_DIR / '.advisor_cache'))
+
+# Career scoring engine: 'python' (default) or 'numpy' for the vectorized engine in
+# advisor/engine.py. Falls back to 'python' when numpy is not installed.
+ADVISOR_SCORING_ENGINE = os.environ.get('ADVISOR_SCORING_ENGINE', 'python')
+
+# Caches: 'default' is per-process. 'advisor-shared' is a file-based cache every worker on the
+# host reads, holding the token revocation stamps (see ADVISOR_TOKEN_CACHE). Point it at
+# Redis or memcached when workers run on more than one host.
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'advisor-shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('ADVISOR_SHARED_CACHE_DIR', str(BASE_DIR / '.advisor_cache' / 'shared')),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Recommendation cache: 'local' keeps a bounded per-process LRU, 'django' stores entries
+# in the Django cache named by ALIAS so all workers share them.
+ADVISOR_RECOMMENDATION_CACHE = {
+    'BACKEND': os.environ.get('ADVISOR_RECOMMENDATION_CACHE_BACKEND', 'local'),
+    'MAX_ENTRIES': int(os.environ.get('ADVISOR_RECOMMENDATION_CACHE_SIZE', '2048')),
+    'ALIAS': 'default',
+    'TIMEOUT': None,
+}
+
+# Server mode, read by entrypoint.sh: 'wsgi' runs sync gunicorn workers, 'asgi' runs gunicorn
+# with uvicorn workers. ASGI serves the session, profile and recommendations routes from
+# the async views in advisor/async_views.py unless ADVISOR_ASYNC_VIEWS=False. The preload
+# mode (ADVISOR_PRELOAD) is read by gunicorn.conf.py, see advisor/preload.py.
+ADVISOR_SERVER_MODE = os.environ.get('ADVISOR_SERVER_MODE', 'wsgi')
+ADVISOR_ASYNC_VIEWS = os.environ.get('ADVISOR_ASYNC_VIEWS', str(ADVISOR_SERVER_MODE == 'asgi')) == 'True'
+
+# Materialized per-user rankings (advisor.RecommendationSnapshot) holding the top DEPTH
+# careers. Profile saves queue a rebuild on the worker's snapshot thread once the transaction
+# commits ('background'), or run it in the request after the commit ('inline'). Reads
+# recompute snapshots of an older catalog or an older version of the profile.
+# Per-career score components of the users who last previewed a profile edit are kept in
+# process, up to COMPONENT_CACHE_BYTES per worker, so later edits and the save that follows
+# rescore only the changed fields. Each user costs 72 bytes per career (6.9 MiB at 100,000
+# careers), so the default 64 MiB holds about 9 users of such a catalog.
+ADVISOR_RECOMMENDATION_SNAPSHOTS = {
+    'DEPTH': int(os.environ.get('ADVISOR_RECOMMENDATION_SNAPSHOT_DEPTH', '100')),
+    'REFRESH': os.environ.get('ADVISOR_RECOMMENDATION_SNAPSHOT_REFRESH', 'background'),
+    'COMPONENT_CACHE_BYTES': int(os.environ.get('ADVISOR_COMPONENT_CACHE_BYTES', str(64 * 2**20))),
+}
+
+# Request metrics served in Prometheus format at /api/metrics/. Each worker keeps its own
+# counters; with DIR set (ideally on tmpfs, emptied at server start) workers publish them
+# there every FLUSH_INTERVAL seconds and a scrape of any worker reports the sum.
+# gunicorn.conf.py creates a DIR when WEB_CONCURRENCY is above 1 and none is set. A TOKEN
+# makes scrapes authenticate with "Authorization: Bearer <token>".
+ADVISOR_METRICS = {
+    'DIR': os.environ.get('ADVISOR_METRICS_DIR', ''),
+    'FLUSH_INTERVAL': float(os.environ.get('ADVISOR_METRICS_FLUSH_INTERVAL', '1')),
+    'TOKEN': os.environ.get('ADVISOR_METRICS_TOKEN', ''),
+}
+
+# Opt-in request profiling: staff requests sending an X-Advisor-Profile header (or every
+# request with ALWAYS) get per-stage scoring timings in a Server-Timing header and a link to
+# a trace, with stacks sampled every SAMPLE_INTERVAL seconds, stored in TRACE_DIR.
+ADVISOR_PROFILING = {
+    'ALWAYS': os.environ.get('ADVISOR_PROFILING_ALWAYS', 'False') == 'True',
+    'SAMPLE_INTERVAL': float(os.environ.get('ADVISOR_PROFILING_SAMPLE_INTERVAL', '0.005')),
+    'TRACE_DIR': os.environ.get('ADVISOR_PROFILING_TRACE_DIR', str(BASE_DIR / '.advisor_cache' / 'traces')),
+    'MAX_TRACES': int(os.environ.get('ADVISOR_PROFILING_MAX_TRACES', '100')),
+}
+
+# In-process token -> user cache used by CachedTokenAuthentication. Logouts replace a per-user
+# version stamp in the Django cache named by ALIAS, which every worker must share; with a
+# per-process alias (LocMemCache, DummyCache) the in-process cache is turned off.
+ADVISOR_TOKEN_CACHE = {
+    'TTL': int(os.environ.get('ADVISOR_TOKEN_CACHE_TTL', '60')),
+    'MAX_ENTRIES': int(os.environ.get('ADVISOR_TOKEN_CACHE_SIZE', '10000')),
+    'ALIAS': 'advisor-shared',
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -3,8 +3,22 @@ set -e
 
 # Run database migrations and collect static files, then start Gunicorn.
 # Railway provides $PORT automatically.
+# ADVISOR_SERVER_MODE=asgi runs uvicorn workers (and the async advisor views) instead of
+# sync workers; WEB_CONCURRENCY sets the worker count in both modes. Gunicorn also reads
+# gunicorn.conf.py from this directory: ADVISOR_PRELOAD=True builds the application once in
+# the master and forks the workers from it.
 
 python manage.py migrate --no-input
 python manage.py collectstatic --no-input --clear
 
+# Per-worker metric files from a previous run would otherwise be summed into the new one.
+if [ -n "${ADVISOR_METRICS_DIR:-}" ]; then
+    mkdir -p "$ADVISOR_METRICS_DIR"
+    rm -f "$ADVISOR_METRICS_DIR"/metrics-*.json
+fi
+
+if [ "${ADVISOR_SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec gunicorn core.asgi:application --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:${PORT:-8000}
+fi
+
 exec gunicorn core.wsgi:application --bind 0.0.0.0:${PORT:-8000}
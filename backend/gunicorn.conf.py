@@ -0,0 +1,71 @@
+# Gunicorn reads this file from the working directory (entrypoint.sh runs from backend/).
+#
+# ADVISOR_PRELOAD=True imports the application once in the master, builds the catalog
+# structures and checks the databases there, then forks the workers, which share those pages
+# copy-on-write instead of each building its own copy. Code changes then need a full restart
+# (SIGHUP reloads the workers but not the preloaded application).
+#
+# Each worker counts its own request metrics, and /api/metrics/ can only report all of them
+# through a shared ADVISOR_METRICS_DIR. With WEB_CONCURRENCY above 1 and no directory set, a
+# fresh one is created for this server; the master folds the file of every exited worker
+# into the totals.
+import gc
+import os
+import tempfile
+import time
+
+preload_app = os.environ.get('ADVISOR_PRELOAD', 'False') == 'True'
+
+if int(os.environ.get('WEB_CONCURRENCY', '1')) > 1 and not os.environ.get('ADVISOR_METRICS_DIR'):
+    # Set before the application (and its settings) is imported, in the master or the workers.
+    os.environ['ADVISOR_METRICS_DIR'] = tempfile.mkdtemp(prefix='advisor-metrics-')
+
+_started = time.perf_counter()
+if preload_app:
+    # Collections while the application is imported would leave freed holes in pages that
+    # are about to be shared; advisor.preload.prepare_fork freezes the heap and re-enables it.
+    gc.disable()
+
+
+def on_starting(server):
+    # child_exit runs in the master's SIGCHLD handler, where the first import of the metrics
+    # module can be interrupted by the next worker's exit and seen half-initialized.
+    import advisor.metrics  # noqa: F401
+
+    if server.cfg.workers > 1 and not os.environ.get('ADVISOR_METRICS_DIR'):
+        # The worker count came from the command line, after the default directory was chosen.
+        server.log.warning(
+            'ADVISOR_METRICS_DIR is not set: with %d workers, /api/metrics/ reports only the worker '
+            'that answers the scrape.',
+            server.cfg.workers,
+        )
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from advisor import preload
+
+    timings = preload.prepare_fork()
+    server.log.info(
+        'Preloaded in %.2fs (catalog warm-up %.3fs, database check %.3fs, %d objects frozen).',
+        time.perf_counter() - _started,
+        timings['catalog'],
+        timings['connections'],
+        gc.get_freeze_count(),
+    )
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from advisor import preload
+
+        preload.after_fork()
+
+
+def child_exit(server, worker):
+    directory = os.environ.get('ADVISOR_METRICS_DIR')
+    if directory:
+        from advisor import metrics
+
+        metrics.retire_worker(directory, worker.pid)